@@ -0,0 +1 @@
+"""Benchmarks for the video player, run with python3 -m benchmarks.<name>."""
@@ -0,0 +1,91 @@
+"""Measures how many commands per second a script runs at.
+
+    python3 -m benchmarks.batch_mode [--rows N] [--commands N]
+
+The script mixes playback, search (answered with ANSWER lines), playlist
+and flag commands over a synthetic catalog, and its output goes to a pipe.
+"""
+
+import argparse
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.command_parser import CommandParser
+from src.script_runner import Script, ScriptSink, run_script
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+from .synthetic import write_catalog
+
+
+def make_script(video_ids, count, seed=0):
+    """Returns the text of a script of count commands."""
+    generator = random.Random(seed)
+    lines = ["CREATE_PLAYLIST nightly"]
+    for _ in range(count - 1):
+        video_id = generator.choice(video_ids)
+        kind = generator.randrange(8)
+        if kind == 0:
+            lines.append(f"SEARCH_VIDEOS {generator.choice(['guitar', 'top ten', 'cats'])} LIMIT 10")
+            lines.append("ANSWER 1")
+        elif kind == 1:
+            lines.append(f"FLAG_VIDEO {video_id} nightly")
+        elif kind == 2:
+            lines.append(f"ALLOW_VIDEO {video_id}")
+        elif kind == 3:
+            lines.append(f"ADD_TO_PLAYLIST nightly {video_id}")
+        elif kind == 4:
+            lines.append("SHOW_PLAYING")
+        elif kind == 5:
+            lines.append("PLAY_RANDOM")
+        else:
+            lines.append(f"PLAY {video_id}")
+    return "\n".join(lines)
+
+
+def _drain(fd):
+    while os.read(fd, 1 << 16):
+        pass
+
+
+def measure(library, text, commands_per_write):
+    """Returns the commands per second of running a script into a pipe."""
+    read_fd, write_fd = os.pipe()
+    reader = threading.Thread(target=_drain, args=(read_fd,))
+    reader.start()
+    stream = io.TextIOWrapper(io.FileIO(write_fd, "w"), write_through=True)
+    script = Script(text)
+    parser = CommandParser(VideoPlayer(library, ScriptSink(script, stream)))
+    start = time.perf_counter()
+    count = run_script(script, parser, commands_per_write)
+    elapsed = time.perf_counter() - start
+    stream.close()
+    reader.join()
+    os.close(read_fd)
+    return count / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--commands", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        library = VideoLibrary(videos_path)
+        # Build the lazy indexes up front, they are not what is measured.
+        library.videos_by_title(library.search_bitmap("cats"))
+        text = make_script(library.video_ids(), args.commands)
+        for commands_per_write in (1, 1024):
+            rate = measure(library, text, commands_per_write)
+            print(f"{commands_per_write:>5} commands per write: {rate:,.0f} commands/s")
+
+
+if __name__ == "__main__":
+    main()
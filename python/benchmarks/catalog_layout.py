@@ -0,0 +1,47 @@
+"""Reports the memory held per video by each VideoLibrary storage layout.
+
+    python3 -m benchmarks.catalog_layout [--rows N]
+"""
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.video_library import VideoLibrary
+
+from .synthetic import write_catalog
+
+
+def measure(videos_path, storage):
+    """Returns (bytes held, seconds) for loading a library with storage."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    library = VideoLibrary(videos_path, storage=storage)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del library
+    return held, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        print(f"{args.rows} videos")
+        for storage in ("memory", "columnar"):
+            held, elapsed = measure(videos_path, storage)
+            print(f"{storage:>10}: {held / args.rows:8.1f} bytes/video, "
+                  f"loaded in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
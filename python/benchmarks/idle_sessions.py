@@ -0,0 +1,97 @@
+"""Measures the server memory held by idle sessions.
+
+    python3 -m benchmarks.idle_sessions [--rows N] [--sessions N]
+
+A child process opens the sessions, runs a few commands on each (a play,
+a playlist, a tag search) and leaves them idle. The memory the server process
+allocated for them is traced with tracemalloc, so the kernel socket
+buffers are not counted.
+"""
+
+import argparse
+import asyncio
+import gc
+import multiprocessing
+import socket
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.catalog_service import CatalogService
+from src.server import serve
+from src.video_library import VideoLibrary
+
+from .synthetic import write_catalog
+
+
+def _recv_until(connection, end):
+    """Reads until the data received ends with end."""
+    received = b""
+    while not received.endswith(end):
+        data = connection.recv(1 << 16)
+        if not data:
+            raise ConnectionError("session closed")
+        received += data
+
+
+def _open_sessions(port, sessions, video_id, ready, done):
+    """Opens the sessions and keeps them until done is set."""
+    connections = []
+    for _ in range(sessions):
+        connection = socket.create_connection(("127.0.0.1", port))
+        _recv_until(connection, b"terminate.\n")
+        connection.sendall(
+            f"PLAY {video_id}\nCREATE_PLAYLIST mine\n"
+            f"ADD_TO_PLAYLIST mine {video_id}\n"
+            f"SEARCH_VIDEOS_WITH_TAG #cats LIMIT 5\nNUMBER_OF_VIDEOS\n".encode())
+        _recv_until(connection, b" videos in the library\n")
+        connections.append(connection)
+    ready.set()
+    done.wait()
+
+
+async def measure(library, sessions):
+    """Returns the bytes the server holds per idle session."""
+    server = await serve(CatalogService(library, reloadable=False), port=0)
+    port = server.sockets[0].getsockname()[1]
+    context = multiprocessing.get_context("spawn")
+    ready, done = context.Event(), context.Event()
+    clients = context.Process(
+        target=_open_sessions,
+        args=(port, sessions, library.video_ids()[0], ready, done))
+
+    gc.collect()
+    tracemalloc.start()
+    clients.start()
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, ready.wait)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    done.set()
+    await loop.run_in_executor(None, clients.join)
+    server.close()
+    await server.wait_closed()
+    print(f"{sessions} sessions opened and used in {elapsed:.2f}s")
+    return held / sessions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        library = VideoLibrary(videos_path)
+        per_session = asyncio.run(measure(library, args.sessions))
+        print(f"{per_session / 1024:.1f} KiB per idle session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Times SHOW_ALL_VIDEOS written to a pipe, line by line and batched.
+
+    python3 -m benchmarks.output_sink [--rows N]
+
+The pipe is written through, one write per call, as an interactive or
+line-buffered stdout is.
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.command_parser import CommandParser
+from src.output_sink import StreamSink
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+from .synthetic import write_catalog
+
+
+def _drain(fd):
+    while os.read(fd, 1 << 16):
+        pass
+
+
+def measure(library, batched):
+    """Returns the seconds SHOW_ALL_VIDEOS takes to write into a pipe."""
+    read_fd, write_fd = os.pipe()
+    reader = threading.Thread(target=_drain, args=(read_fd,))
+    reader.start()
+    stream = io.TextIOWrapper(io.FileIO(write_fd, "w"), write_through=True)
+    player = VideoPlayer(library, StreamSink(stream))
+    start = time.perf_counter()
+    if batched:
+        CommandParser(player).execute_command(["SHOW_ALL_VIDEOS"])
+    else:
+        player.show_all_videos()
+    elapsed = time.perf_counter() - start
+    stream.close()
+    reader.join()
+    os.close(read_fd)
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        library = VideoLibrary(videos_path)
+        library.videos_by_title()
+        per_line = measure(library, batched=False)
+        batched = measure(library, batched=True)
+        print(f"{args.rows} videos")
+        print(f"per line: {per_line:.2f}s")
+        print(f" batched: {batched:.2f}s")
+        print(f" speedup: {per_line / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compares cold-start time of the text loader across worker counts.
+
+    python3 -m benchmarks.parallel_load [--rows N] [--workers 1 2 4 ...]
+
+"rows" is the parse alone, in the workers plus the merge in this process,
+"library" the whole VideoLibrary load built on it. Parsing can only get
+faster with more workers than there are cores to run them; "serial" is the
+CPU time this process spent on the rows, the part no worker takes over.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.parallel_loader import read_rows_parallel
+from src.video_library import VideoLibrary
+
+from .synthetic import write_catalog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        print(f"{args.rows} videos, {os.path.getsize(videos_path)} bytes, "
+              f"{os.cpu_count()} cores")
+        for workers in args.workers:
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            rows = read_rows_parallel(videos_path, workers, pause_gc=True)
+            serial = time.process_time() - cpu_start
+            parsed = time.perf_counter() - start
+            assert len(rows) == args.rows
+            del rows
+            start = time.perf_counter()
+            library = VideoLibrary(videos_path, workers=workers)
+            loaded = time.perf_counter() - start
+            assert len(library) == args.rows
+            del library
+            print(f"{workers:>3} workers: rows {parsed:6.2f}s "
+                  f"(serial {serial:5.2f}s), library {loaded:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compares the memory of workers loading the catalog with workers
+attached to a shared copy.
+
+    python3 -m benchmarks.shared_catalog [--rows N] [--workers N] [--lookups N]
+
+Each worker opens the library, looks videos up by id, searches titles and
+lists a page in title order. The memory only that worker holds (private
+pages, from /proc/self/smaps_rollup, so Linux only) is what adding one
+more worker costs.
+"""
+
+import argparse
+import multiprocessing
+import random
+import tempfile
+from pathlib import Path
+
+from src.shared_catalog import SharedCatalog
+from src.video_library import VideoLibrary
+
+from .synthetic import write_catalog
+
+SEARCH_TERMS = ("cat", "funny dogs", "python guitar", "a")
+
+
+def _private_bytes():
+    """Returns the bytes of the pages only this process maps."""
+    total = 0
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def _worker(videos_path, storage, video_ids):
+    """Returns the private bytes a worker gained using the library."""
+    before = _private_bytes()
+    library = VideoLibrary(videos_path, storage=storage)
+    for video_id in video_ids:
+        library.get_video(video_id)
+    for term in SEARCH_TERMS:
+        library.search_bitmap(term)
+    library.videos_by_title(start=0, stop=20)
+    return _private_bytes() - before
+
+
+def measure(videos_path, storage, workers, video_ids):
+    """Returns the mean private bytes of a worker."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers) as pool:
+        gained = pool.starmap(
+            _worker, [(videos_path, storage, video_ids)] * workers)
+    return sum(gained) / workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        all_ids = VideoLibrary(videos_path).video_ids()
+        video_ids = random.Random(1).sample(
+            all_ids, min(args.lookups, len(all_ids)))
+        memory = measure(videos_path, "memory", args.workers, video_ids)
+        print(f"  memory: {memory / 2**20:6.1f} MiB per worker, "
+              f"{args.workers * memory / 2**20:6.1f} MiB for {args.workers}")
+        with SharedCatalog(videos_path) as catalog:
+            shared = measure(videos_path, "shared", args.workers, video_ids)
+            print(f"  shared: {shared / 2**20:6.1f} MiB per worker, "
+                  f"{(catalog.nbytes + args.workers * shared) / 2**20:6.1f} MiB "
+                  f"for {args.workers} with the {catalog.nbytes / 2**20:.1f} MiB "
+                  f"published once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compares the sqlite storage with the in-memory one.
+
+    python3 -m benchmarks.sqlite_backend [--rows N] [--lookups N]
+
+Reports the memory held after opening, the cold (database import) and warm
+open times, and the latency of id lookups, title searches and tag queries.
+"""
+
+import argparse
+import gc
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.video_library import VideoLibrary
+
+from .synthetic import write_catalog
+
+_TERMS = ("cat", "guitar", "top ten", "how to make", "zz")
+_QUERIES = ("#cats", "#cats AND #dogs", "#music OR #travel NOT #live")
+
+
+def _per_call(function, arguments):
+    """Returns the mean seconds of calling function on every argument."""
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def measure(videos_path, storage, lookups):
+    """Prints the measurements of one storage."""
+    if storage == "sqlite":
+        start = time.perf_counter()
+        VideoLibrary(videos_path, storage=storage).close()
+        print(f"{storage:>8}: imported in {time.perf_counter() - start:.2f}s")
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    library = VideoLibrary(videos_path, storage=storage)
+    opened = time.perf_counter() - start
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ids = random.Random(1).sample(library.video_ids(), lookups)
+    # The first search and tag query build the in-memory indexes.
+    start = time.perf_counter()
+    library.search_videos(_TERMS[0])
+    library.query_tags(_QUERIES[0])
+    first_query = time.perf_counter() - start
+    get_video = _per_call(library.get_video, ids)
+    search = _per_call(library.search_videos, _TERMS)
+    query = _per_call(library.query_tags, _QUERIES)
+    print(f"{storage:>8}: opened in {opened:.2f}s holding {held / 2**20:.1f} MiB, "
+          f"first query {first_query:.2f}s, get_video {get_video * 1e6:.1f}us, "
+          f"search {search * 1e3:.1f}ms, tag query {query * 1e3:.1f}ms")
+    library.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        print(f"{args.rows} videos")
+        for storage in ("memory", "sqlite"):
+            measure(videos_path, storage, min(args.lookups, args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Synthetic videos.txt catalogs for benchmarks."""
+
+import random
+
+_WORDS = (
+    "amazing funny cats dogs life google video about nothing cooking music "
+    "travel review tutorial live stream highlights best worst top ten how to "
+    "make build learn python guitar piano football news weather space"
+).split()
+_TAGS = [f"#{word}" for word in _WORDS[:40]]
+
+
+def rows(count, seed=0):
+    """Yields count (title, video_id, tags) rows with unique video ids."""
+    generator = random.Random(seed)
+    for i in range(count):
+        title = " ".join(generator.choice(_WORDS) for _ in range(generator.randint(2, 6)))
+        tags = generator.sample(_TAGS, generator.randint(0, 4))
+        yield title.title(), f"video_{i:08d}_id", tags
+
+
+def write_catalog(path, count, seed=0):
+    """Writes a synthetic catalog of count rows to path."""
+    with open(path, "w") as video_file:
+        for title, video_id, tags in rows(count, seed):
+            video_file.write(f"{title} | {video_id} | {' , '.join(tags)}\n")
+    return path
@@ -0,0 +1,45 @@
+"""Compares the csv based text loader with the bytes-level fast path.
+
+    python3 -m benchmarks.text_parser [--rows N]
+
+Both loaders run with the garbage collector on, as reloads do, and paused,
+as the first load of a library does, so that each speedup compares them
+under the same setting.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.bytes_parser import paused_gc, read_rows_fast
+from src.video_library import read_text_rows
+
+from .synthetic import write_catalog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        videos_path = write_catalog(Path(directory) / "videos.txt", args.rows)
+        for gc_setting, pause in (("gc on", False), ("gc paused", True)):
+            timings = {}
+            for name, read in (("csv", lambda: list(read_text_rows(videos_path))),
+                               ("bytes", lambda: read_rows_fast(videos_path))):
+                with paused_gc(pause):
+                    start = time.perf_counter()
+                    rows = read()
+                    timings[name] = time.perf_counter() - start
+                assert len(rows) == args.rows
+                del rows
+                print(f"{gc_setting:>9} {name:>6}: {timings[name]:6.2f}s "
+                      f"({args.rows / timings[name]:,.0f} rows/s)")
+            print(f"{gc_setting:>9} speedup: "
+                  f"{timings['csv'] / timings['bytes']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""A set of video ordinals supporting uniform random picks in O(1)."""
+
+import random
+from array import array
+
+# Marks ordinals that are not in the set.
+_ABSENT = 0xFFFFFFFF
+
+
+class AllowedVideos:
+    """A class used to represent the videos random playback picks from.
+
+    The ordinals are kept densely packed in one array, in no particular
+    order, and a second array indexed by ordinal holds each one's position
+    in the first. Adding appends, removing moves the last ordinal into the
+    freed slot, and a random pick is a single random index.
+    """
+
+    def __init__(self, ordinals=()):
+        """The AllowedVideos class is initialized.
+
+        Args:
+            ordinals: The distinct ordinals initially in the set.
+        """
+        self._ordinals = array("I", ordinals)
+        self._positions = array("I")
+        for position, ordinal in enumerate(self._ordinals):
+            self._reserve(ordinal)
+            self._positions[ordinal] = position
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def __contains__(self, ordinal):
+        return (ordinal < len(self._positions)
+                and self._positions[ordinal] != _ABSENT)
+
+    def _reserve(self, ordinal):
+        missing = ordinal + 1 - len(self._positions)
+        if missing > 0:
+            self._positions.extend(array("I", [_ABSENT]) * missing)
+
+    def add(self, ordinal):
+        """Adds an ordinal, if it is not in the set yet."""
+        if ordinal in self:
+            return
+        self._reserve(ordinal)
+        self._positions[ordinal] = len(self._ordinals)
+        self._ordinals.append(ordinal)
+
+    def discard(self, ordinal):
+        """Removes an ordinal, if it is in the set."""
+        if ordinal not in self:
+            return
+        position = self._positions[ordinal]
+        last = self._ordinals.pop()
+        if last != ordinal:
+            self._ordinals[position] = last
+            self._positions[last] = position
+        self._positions[ordinal] = _ABSENT
+
+    def choice(self):
+        """Returns a uniformly random ordinal of the set.
+
+        Raises:
+            IndexError: The set is empty.
+        """
+        return self._ordinals[random.randrange(len(self._ordinals))]
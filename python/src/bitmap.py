@@ -0,0 +1,43 @@
+"""Helpers for video sets stored as integer bitmaps.
+
+Bit i of a bitmap is set when the video with ordinal i belongs to the set,
+so unions, intersections and differences are single integer operations.
+"""
+
+
+def bit_count(bits):
+    """Returns the number of set bits of a non-negative bitmap."""
+    return bin(bits).count("1")
+
+
+def from_positions(positions):
+    """Returns the bitmap with exactly the given bits set.
+
+    Builds the bitmap in one pass over a byte buffer, ORing bits into an
+    integer one at a time would copy the whole integer for each position.
+
+    Args:
+        positions: An iterable of non-negative bit positions.
+    """
+    positions = list(positions)
+    if not positions:
+        return 0
+    buffer = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def iter_bits(bits):
+    """Yields the positions of the set bits of a bitmap in ascending order.
+
+    Args:
+        bits: A non-negative integer bitmap.
+    """
+    # The reversed binary string puts bit i at index i, and str.find skips
+    # the runs of clear bits without a python level loop per position.
+    digits = bin(bits)[:1:-1]
+    position = digits.find("1")
+    while position != -1:
+        yield position
+        position = digits.find("1", position + 1)
@@ -0,0 +1,115 @@
+"""A bytes-level fast path for parsing text catalogs.
+
+The raw file contents are scanned with bytes.find for the characters that
+need the csv module, a quote or a bare carriage return. Everything before
+the first line containing one is decoded in a single pass and split on
+"\\n", "|" and "," directly; from that line on the rest of the data is
+handed to the csv based parse_text_rows, since a quoted field may span
+lines. Quoting, escapes and line endings thus behave exactly as with the
+regular loader.
+
+On 1M synthetic rows it is about 1.2x faster than the csv loader with the
+garbage collector on and 1.6x with it paused (benchmarks/text_parser.py).
+Pausing the collector, see paused_gc, saves more than either loader.
+"""
+
+import gc
+import io
+import locale
+from contextlib import contextmanager
+
+from .video_library import parse_text_rows
+
+
+@contextmanager
+def paused_gc(pause=True):
+    """Disables the garbage collector for the block if pause is true.
+
+    Parsed rows cannot form reference cycles, and the collector would
+    otherwise walk the growing list of rows over and over again. It is
+    disabled for the whole process, so only loads that no other thread
+    runs alongside, such as the first one, pause it.
+    """
+    was_enabled = pause and gc.isenabled()
+    if was_enabled:
+        gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _fallback_offset(data):
+    """Returns where the lines needing the csv module start in data."""
+    first = data.find(b'"')
+    if data.count(b"\r") != data.count(b"\r\n"):
+        bare_cr = data.find(b"\r")
+        while data[bare_cr + 1:bare_cr + 2] == b"\n":
+            bare_cr = data.find(b"\r", bare_cr + 1)
+        first = bare_cr if first == -1 else min(first, bare_cr)
+    if first == -1:
+        return len(data)
+    return data.rfind(b"\n", 0, first) + 1
+
+
+def parse_bytes(data, encoding=None, pause_gc=False):
+    """Returns the rows parsed from the raw contents of a text catalog.
+
+    Args:
+        data: The bytes of videos.txt style lines.
+        encoding: The text encoding, the one open() uses if None.
+        pause_gc: Whether to disable the garbage collector while parsing,
+            see paused_gc.
+
+    Returns:
+        A list of (title, video_id, tags) tuples in file order.
+
+    Raises:
+        ValueError: A line does not hold exactly three fields.
+    """
+    encoding = encoding or locale.getpreferredencoding(False)
+    cut = _fallback_offset(data)
+    with memoryview(data) as view:
+        lines = str(view[:cut], encoding).split("\n")
+        rest = bytes(view[cut:])
+    if lines[-1] == "":
+        lines.pop()
+
+    strip = str.strip
+    rows = []
+    append = rows.append
+    with paused_gc(pause_gc):
+        for line in lines:
+            fields = line.split("|")
+            if len(fields) != 3:
+                # Let the csv parser fail the way the regular loader does,
+                # blank lines included.
+                rows.extend(parse_text_rows([line]))
+                continue
+            title, url, tags = fields
+            tags = tags.strip()
+            append((title.strip(), url.strip(),
+                    list(map(strip, tags.split(","))) if tags else []))
+
+    if rest:
+        rows.extend(parse_text_rows(
+            io.TextIOWrapper(io.BytesIO(rest), encoding=encoding)))
+    return rows
+
+
+def read_rows_fast(videos_path, encoding=None, pause_gc=False):
+    """Returns the rows of a text catalog, read with a single read.
+
+    Args:
+        videos_path: The path of a videos.txt style file.
+        encoding: The text encoding, the one open() uses if None.
+        pause_gc: Whether to disable the garbage collector while parsing,
+            see paused_gc.
+
+    Returns:
+        A list of (title, video_id, tags) tuples in file order.
+    """
+    with open(videos_path, "rb") as video_file:
+        data = video_file.read()
+    return parse_bytes(data, encoding, pause_gc)
@@ -0,0 +1,130 @@
+"""The catalog state shared by every player of a library.
+
+A CatalogService holds what does not depend on who is watching: the
+VideoLibrary, the moderation flags and the caches built over them. What a
+single user does (the video playing, playlists, the last search) is kept
+in a PlayerSession, so a process hosting many users pays for the
+catalog once and for each user only a few hundred bytes.
+"""
+
+import sys
+import threading
+import weakref
+
+from .allowed_videos import AllowedVideos
+from .bitmap import iter_bits
+from .player_session import PlayerSession
+from .rw_lock import NullLock, ReadWriteLock
+from .video_library import VideoLibrary
+
+
+class CatalogService:
+    """A class used to represent a library and its moderation, shared by
+    all the sessions playing from it."""
+
+    def __init__(self, video_library=None, reloadable=True,
+                 line_cache_size=100_000, thread_safe=False):
+        """The CatalogService class is initialized.
+
+        Args:
+            video_library: The VideoLibrary to serve, a new one loaded from
+                the default catalog if None.
+            reloadable: Whether sessions may reload the library. Changes
+                picked up by its watcher are applied either way.
+            line_cache_size: How many rendered video lines to cache.
+            thread_safe: Whether sessions may run commands on several
+                threads at once. Commands then hold self.lock, for reading
+                unless they change the catalog or its flags.
+        """
+        if video_library is None:
+            video_library = VideoLibrary()
+        self.library = video_library
+        self.reloadable = reloadable
+        self.flagged = {}
+        # Bitmap over library ordinals mirroring the keys of self.flagged.
+        self.flagged_bits = 0
+        # Ordinals of the videos that are not flagged, built on the first
+        # PLAY_RANDOM and then kept in step with flags and reloads.
+        self._allowed = None
+        # video_id -> (flag reason or None, title, tags, rendered line),
+        # shared by the players rendering this catalog. Entries stay until a
+        # reload changes or removes their video, once full no more are added.
+        self.lines = {}
+        self.line_cache_size = line_cache_size
+        self.thread_safe = thread_safe
+        self.lock = ReadWriteLock() if thread_safe else NullLock()
+        self._sessions = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
+        self.library.add_listener(self._on_library_changed)
+
+    def open_session(self):
+        """Returns a new PlayerSession kept in step with catalog reloads."""
+        session = PlayerSession()
+        with self._sessions_lock:
+            self._sessions.add(session)
+        return session
+
+    def close_session(self, session):
+        """Stops following a session, it is dropped once unreferenced."""
+        with self._sessions_lock:
+            self._sessions.discard(session)
+
+    def __len__(self):
+        """Returns the number of open sessions."""
+        return len(self._sessions)
+
+    def _on_library_changed(self, delta):
+        """Keeps the shared and session state in step with a reload."""
+        for row in delta.updated:
+            self.lines.pop(row[1], None)
+        if self._allowed is not None:
+            for row in delta.inserted:
+                self._allowed.add(self.library.ordinal(row[1]))
+        if not delta.deleted:
+            return
+        # Removed videos no longer have ordinals to look up, the set is
+        # rebuilt on the next random pick instead.
+        self._allowed = None
+        deleted = set(delta.deleted)
+        for video_id in deleted:
+            self.lines.pop(video_id, None)
+        for video_id in deleted.intersection(self.flagged):
+            del self.flagged[video_id]
+        self.flagged_bits &= self.library.live_bitmap()
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.forget_videos(deleted)
+
+    def allowed(self):
+        """Returns the AllowedVideos, the live videos that are not flagged."""
+        if self._allowed is None:
+            self._allowed = AllowedVideos(iter_bits(
+                self.library.live_bitmap() & ~self.flagged_bits))
+        return self._allowed
+
+    def flag(self, video_id, flag_reason=""):
+        """Flags a video for every session, stopping it wherever it is
+        playing.
+
+        Args:
+            video_id: The video_id of a video of the library, not flagged.
+            flag_reason: Why the video is flagged, "" if not supplied.
+        """
+        self.flagged[video_id] = sys.intern(flag_reason)
+        ordinal = self.library.ordinal(video_id)
+        self.flagged_bits |= 1 << ordinal
+        if self._allowed is not None:
+            self._allowed.discard(ordinal)
+        with self._sessions_lock:
+            sessions = list(self._sessions)
+        for session in sessions:
+            session.stop(video_id)
+
+    def allow(self, video_id):
+        """Removes the flag of a flagged video."""
+        del self.flagged[video_id]
+        ordinal = self.library.ordinal(video_id)
+        self.flagged_bits &= ~(1 << ordinal)
+        if self._allowed is not None:
+            self._allowed.add(ordinal)
@@ -0,0 +1,403 @@
+"""A binary precompiled snapshot of a videos.txt catalog.
+
+The snapshot holds the videos of the text catalog, already deduplicated the
+way VideoLibrary does it, so that loading it needs no csv parsing. Strings
+are stored once in a string table, rows refer to them by id:
+
+    header
+    string_offsets  uint32[string_count + 1]  byte offsets into string_data
+    titles          uint32[row_count]          string id of each title
+    video_ids       uint32[row_count]          string id of each video_id
+    tag_starts      uint32[row_count + 1]      row i owns tag_refs[start:end]
+    tag_refs        uint32[tag_ref_count]      string id of each tag
+    id_order        uint32[row_count]          rows sorted by video_id
+    string_data     utf-8 bytes
+
+All integers are little endian. The header records the size and
+modification time of the source file, a snapshot that does not match its
+source is stale and ignored. A CRC32 of everything after the header guards
+against truncated or corrupt files.
+
+The same layout serves as the in-memory columnar representation of a
+catalog, see pack().
+
+Compile a snapshot next to the catalog with:
+
+    python3 -m src.catalog_snapshot [path/to/videos.txt]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+
+MAGIC = b"YTCATLG\0"
+VERSION = 2
+
+# magic, version, source size, source mtime_ns, body crc32, row count,
+# string count, tag ref count, string data size.
+_HEADER = struct.Struct("<8sIQqIIIII")
+
+
+def snapshot_path(source_path):
+    """Returns the snapshot path used for a text catalog."""
+    return Path(source_path).with_suffix(".snapshot")
+
+
+def _uint32_array(values=()):
+    """Returns an array of unsigned 32 bit integers."""
+    column = array("I", values)
+    if column.itemsize != 4:
+        column = array("L", values)
+    return column
+
+
+def _to_le_bytes(column):
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def deduplicate(rows):
+    """Returns rows with one entry per video_id.
+
+    A repeated video_id keeps the position of its first row and the data of
+    its last row, like assigning the rows into a dict in file order.
+
+    Args:
+        rows: An iterable of (title, video_id, tags) tuples.
+    """
+    positions = {}
+    unique = []
+    for row in rows:
+        position = positions.get(row[1])
+        if position is None:
+            positions[row[1]] = len(unique)
+            unique.append(row)
+        else:
+            unique[position] = row
+    return unique
+
+
+def pack(rows, source_stat=None):
+    """Returns the snapshot bytes for rows, header included.
+
+    Args:
+        rows: An iterable of (title, video_id, tags) tuples in file order.
+        source_stat: The os.stat_result of the text catalog the rows come
+            from, or None for a snapshot that is not tied to a file.
+    """
+    rows = deduplicate(rows)
+
+    string_ids = {}
+    string_data = bytearray()
+    string_offsets = _uint32_array([0])
+
+    def intern(text):
+        string_id = string_ids.get(text)
+        if string_id is None:
+            string_id = string_ids[text] = len(string_ids)
+            string_data.extend(text.encode("utf-8"))
+            string_offsets.append(len(string_data))
+        return string_id
+
+    titles = _uint32_array()
+    video_ids = _uint32_array()
+    tag_starts = _uint32_array([0])
+    tag_refs = _uint32_array()
+    for title, video_id, tags in rows:
+        titles.append(intern(title))
+        video_ids.append(intern(video_id))
+        tag_refs.extend(intern(tag) for tag in tags)
+        tag_starts.append(len(tag_refs))
+    # Code point order of str matches the byte order of their utf-8 encoding,
+    # which is what Snapshot.find compares.
+    id_order = _uint32_array(
+        sorted(range(len(rows)), key=lambda row: rows[row][1]))
+
+    columns = (string_offsets, titles, video_ids, tag_starts, tag_refs, id_order)
+    body = b"".join(
+        [_to_le_bytes(column) for column in columns] + [bytes(string_data)])
+    header = _HEADER.pack(
+        MAGIC, VERSION,
+        source_stat.st_size if source_stat else 0,
+        source_stat.st_mtime_ns if source_stat else 0,
+        zlib.crc32(body), len(rows), len(string_ids), len(tag_refs),
+        len(string_data),
+    )
+    return header + body
+
+
+def write_snapshot(source_path, rows, output_path=None):
+    """Writes a snapshot of rows parsed from a text catalog.
+
+    The file is written next to its final location and renamed into place,
+    so readers never see a partially written snapshot.
+
+    Args:
+        source_path: The text catalog the rows were parsed from.
+        rows: An iterable of (title, video_id, tags) tuples in file order.
+        output_path: Where to write the snapshot, defaults to snapshot_path.
+
+    Returns:
+        The path of the written snapshot.
+    """
+    data = pack(rows, os.stat(source_path))
+    output_path = Path(output_path or snapshot_path(source_path))
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.write(data)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+class Snapshot:
+    """A class used to represent an opened catalog snapshot.
+
+    Titles and ids are decoded from the underlying buffer on each access,
+    nothing is materialized up front. Tags repeat across many videos, so
+    each distinct tag is decoded once and the same str is handed out after.
+    """
+
+    def __init__(self, buffer, closer=None):
+        """The Snapshot class is initialized over a validated buffer.
+
+        Args:
+            buffer: The bytes, mmap or memoryview holding the whole
+                snapshot.
+            closer: An optional object whose close() releases the buffer.
+        """
+        (_, _, _, _, _, row_count, string_count, tag_ref_count,
+         _) = _HEADER.unpack_from(buffer)
+        # A memoryview passed in is owned, and released, by the snapshot.
+        self._buffer = buffer if isinstance(buffer, memoryview) else memoryview(buffer)
+        position = _HEADER.size
+        columns = []
+        for size in (string_count + 1, row_count, row_count, row_count + 1,
+                     tag_ref_count, row_count):
+            columns.append(self._column(position, size))
+            position += 4 * size
+        (self._string_offsets, self._titles, self._video_ids,
+         self._tag_starts, self._tag_refs, self._id_order) = columns
+        self._string_data = self._buffer[position:]
+        self._tag_strings = {}
+        # Set last so that, should the snapshot be dropped without close(),
+        # the views on the buffer go before the buffer can be released.
+        self._closer = closer
+
+    def _column(self, position, size):
+        view = self._buffer[position:position + 4 * size]
+        if sys.byteorder == "little" and array("I").itemsize == 4:
+            # Zero-copy: the column is read straight out of the buffer.
+            return view.cast("I")
+        column = _uint32_array()
+        column.frombytes(view)
+        if sys.byteorder != "little":
+            column.byteswap()
+        return column
+
+    def __len__(self):
+        return len(self._titles)
+
+    def _string_bytes(self, string_id):
+        return self._string_data[
+            self._string_offsets[string_id]:self._string_offsets[string_id + 1]]
+
+    def _string(self, string_id):
+        return str(self._string_bytes(string_id), "utf-8")
+
+    def title(self, row):
+        """Returns the title of a row."""
+        return self._string(self._titles[row])
+
+    def video_id(self, row):
+        """Returns the video_id of a row."""
+        return self._string(self._video_ids[row])
+
+    def tags(self, row):
+        """Returns the tags of a row as a list."""
+        tags = []
+        for ref in self._tag_refs[self._tag_starts[row]:self._tag_starts[row + 1]]:
+            tag = self._tag_strings.get(ref)
+            if tag is None:
+                tag = self._tag_strings[ref] = self._string(ref)
+            tags.append(tag)
+        return tags
+
+    def find(self, video_id):
+        """Returns the row of a video_id by binary search, None if absent."""
+        key = video_id.encode("utf-8")
+        low, high = 0, len(self._id_order)
+        while low < high:
+            middle = (low + high) // 2
+            row = self._id_order[middle]
+            if bytes(self._string_bytes(self._video_ids[row])) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._id_order):
+            row = self._id_order[low]
+            if self._string_bytes(self._video_ids[row]) == key:
+                return row
+        return None
+
+    def rows(self):
+        """Returns all rows as (title, video_id, tags) tuples."""
+        string_data = bytes(self._string_data)
+        offsets = self._string_offsets
+        strings = [
+            string_data[start:end].decode("utf-8")
+            for start, end in zip(offsets, offsets[1:])
+        ]
+        tag_refs = self._tag_refs
+        tag_starts = self._tag_starts
+        return [
+            (
+                strings[self._titles[row]],
+                strings[self._video_ids[row]],
+                [strings[ref] for ref in tag_refs[tag_starts[row]:tag_starts[row + 1]]],
+            )
+            for row in range(len(self))
+        ]
+
+    def nbytes(self):
+        """Returns the size of the snapshot buffer in bytes."""
+        return self._buffer.nbytes
+
+    def close(self):
+        """Releases the underlying buffer."""
+        for view in (self._string_offsets, self._titles, self._video_ids,
+                     self._tag_starts, self._tag_refs, self._id_order,
+                     self._string_data, self._buffer):
+            if isinstance(view, memoryview):
+                view.release()
+        if self._closer is not None:
+            self._closer.close()
+
+
+def _is_valid(buffer, source_stat, check_crc):
+    """Returns whether buffer holds a snapshot matching its source."""
+    if len(buffer) < _HEADER.size:
+        return False
+    (magic, version, source_size, source_mtime_ns, crc, row_count,
+     string_count, tag_ref_count, string_size) = _HEADER.unpack_from(buffer)
+    if (magic != MAGIC or version != VERSION
+            or source_size != source_stat.st_size
+            or source_mtime_ns != source_stat.st_mtime_ns):
+        return False
+    column_size = 4 * (string_count + 1 + 4 * row_count + 1 + tag_ref_count)
+    if len(buffer) != _HEADER.size + column_size + string_size:
+        return False
+    if check_crc:
+        with memoryview(buffer) as view:
+            return zlib.crc32(view[_HEADER.size:]) == crc
+    return True
+
+
+def snapshot_size(buffer):
+    """Returns the size the header of a snapshot buffer declares, None if
+    the buffer does not start with a snapshot header.
+
+    Buffers such as shared memory may be longer than the snapshot they
+    hold, it ends there.
+    """
+    if len(buffer) < _HEADER.size:
+        return None
+    (magic, version, _, _, _, row_count, string_count, tag_ref_count,
+     string_size) = _HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return (_HEADER.size + 4 * (string_count + 1 + 4 * row_count + 1 + tag_ref_count)
+            + string_size)
+
+
+def open_buffer(buffer, source_stat, closer=None):
+    """Opens a snapshot held in a buffer, without verifying its checksum.
+
+    Args:
+        buffer: A buffer starting with the snapshot, possibly longer.
+        source_stat: The os.stat_result of the text catalog the snapshot
+            must be up to date with.
+        closer: An optional object whose close() releases the buffer.
+
+    Returns:
+        A Snapshot, or None if the buffer holds no up to date snapshot.
+    """
+    size = snapshot_size(buffer)
+    if size is None or size > len(buffer):
+        return None
+    view = memoryview(buffer)[:size]
+    if not _is_valid(view, source_stat, check_crc=False):
+        view.release()
+        return None
+    return Snapshot(view, closer=closer)
+
+
+def open_snapshot(source_path, path=None, use_mmap=False):
+    """Opens the snapshot of a text catalog.
+
+    Args:
+        source_path: The text catalog the snapshot must be up to date with.
+        path: The snapshot to open, defaults to snapshot_path.
+        use_mmap: Map the file instead of reading it. The checksum is not
+            verified then, since that would page in the whole file.
+
+    Returns:
+        A Snapshot, or None if the snapshot is missing, stale or corrupt.
+    """
+    try:
+        source_stat = os.stat(source_path)
+        with open(path or snapshot_path(source_path), "rb") as snapshot_file:
+            if not use_mmap:
+                buffer = snapshot_file.read()
+                return (Snapshot(buffer)
+                        if _is_valid(buffer, source_stat, check_crc=True)
+                        else None)
+            buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # mmap raises ValueError for an empty file.
+        return None
+    if not _is_valid(buffer, source_stat, check_crc=False):
+        buffer.close()
+        return None
+    return Snapshot(buffer, closer=buffer)
+
+
+def read_rows(source_path, path=None):
+    """Returns the rows stored in the snapshot of a text catalog.
+
+    Args:
+        source_path: The text catalog the snapshot must be up to date with.
+        path: The snapshot to read, defaults to snapshot_path.
+
+    Returns:
+        A list of (title, video_id, tags) tuples, or None if the snapshot is
+        missing, stale or corrupt.
+    """
+    snapshot = open_snapshot(source_path, path)
+    return None if snapshot is None else snapshot.rows()
+
+
+def main(argv=None):
+    """Compiles a text catalog into its binary snapshot."""
+    from .video_library import DEFAULT_VIDEOS_PATH, read_text_rows
+
+    parser = argparse.ArgumentParser(
+        description="Compile videos.txt into a binary catalog snapshot.")
+    parser.add_argument("source", nargs="?", default=DEFAULT_VIDEOS_PATH,
+                        help="the text catalog (default: %(default)s)")
+    parser.add_argument("-o", "--output",
+                        help="the snapshot path (default: next to source)")
+    args = parser.parse_args(argv)
+    output_path = write_snapshot(
+        args.source, read_text_rows(args.source), args.output)
+    print(f"Wrote catalog snapshot: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""A background watcher for catalog file changes."""
+
+import os
+import threading
+
+
+class CatalogWatcher(threading.Thread):
+    """A class used to represent a thread polling a catalog file.
+
+    When the size or modification time of the file changes, the file is
+    parsed in the watcher thread and the rows are handed to a callback.
+    """
+
+    def __init__(self, videos_path, load_rows, on_change, interval=1.0):
+        """The CatalogWatcher class is initialized.
+
+        Args:
+            videos_path: The catalog file to watch.
+            load_rows: A callable returning the current rows of the file.
+            on_change: A callable taking the rows of a changed file.
+            interval: Seconds between two checks of the file.
+        """
+        super().__init__(name="CatalogWatcher", daemon=True)
+        self._videos_path = videos_path
+        self._load_rows = load_rows
+        self._on_change = on_change
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._last_seen = self._file_state()
+
+    def _file_state(self):
+        try:
+            stat = os.stat(self._videos_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def check(self):
+        """Checks the file once, returns whether it had changed."""
+        state = self._file_state()
+        if state is None or state == self._last_seen:
+            return False
+        self._last_seen = state
+        try:
+            rows = self._load_rows()
+        except (OSError, ValueError):
+            # Caught mid-write or malformed, the next change is retried.
+            return False
+        self._on_change(rows)
+        return True
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            self.check()
+
+    def stop(self):
+        """Stops the thread and waits for it to finish."""
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
@@ -1,163 +1,362 @@
-"""A command parser class."""
+"""A command parser class.
 
-import textwrap
+Commands are looked up in a registry mapping each command name to a
+Command, which declares the handler, the accepted number of arguments and
+the usage message given when they do not fit. Plugins add commands with
+register_command, or CommandParser.register for a single parser.
+
+Every command run is timed and recorded in a CommandStats, shown by STATS.
+"""
+
+import time
 from typing import Sequence
 
+from .command_stats import (
+    BUCKETS, DEFAULT_STATS, bucket_bound_us, percentile)
+
 
 class CommandException(Exception):
     """A class used to represent a wrong command exception."""
     pass
 
 
-class CommandParser:
-    """A class used to parse and execute a user Command."""
+def _split_page(words):
+    """Splits the trailing LIMIT <n> and OFFSET <n> options off arguments.
 
-    def __init__(self, video_player):
-        self._player = video_player
+    Args:
+        words: The words following the command name.
 
-    def execute_command(self, command: Sequence[str]):
-        """Executes the user command. Expects the command to be upper case.
-           Raises CommandException if a command cannot be parsed.
-        """
-        if not command:
+    Returns:
+        The remaining words and a dict of the options found, with the keys
+        "limit" and "offset".
+
+    Raises:
+        CommandException: An option is repeated or its value is invalid.
+    """
+    words = list(words)
+    page = {}
+    while len(words) >= 2 and words[-2].upper() in ("LIMIT", "OFFSET"):
+        option, value = words[-2].lower(), words[-1]
+        if option in page or not value.isdecimal() or (
+                option == "limit" and int(value) == 0):
             raise CommandException(
-                "Please enter a valid command, "
-                "type HELP for a list of available commands.")
+                "Please follow LIMIT with a positive number and OFFSET with a "
+                "number, at most once each.")
+        page[option] = int(value)
+        del words[-2:]
+    return words, page
 
-        if command[0].upper() == "NUMBER_OF_VIDEOS":
-            self._player.number_of_videos()
 
-        elif command[0].upper() == "SHOW_ALL_VIDEOS":
-            self._player.show_all_videos()
+class Command:
+    """A class used to represent a command the parser knows."""
 
-        elif command[0].upper() == "PLAY":
-            if len(command) != 2:
+    __slots__ = ("name", "handler", "min_args", "max_args", "usage",
+                 "joined", "paginated", "arguments", "help")
+
+    def __init__(self, name, handler, min_args=0, max_args=0, usage=None,
+                 joined=False, paginated=False, arguments="", help=""):
+        """The Command class is initialized.
+
+        Args:
+            name: The command name, matched case-insensitively.
+            handler: A callable taking the CommandParser and the arguments.
+            min_args: The fewest arguments the command takes.
+            max_args: The most arguments the command takes, None for no
+                limit.
+            usage: The CommandException message when the arguments do not
+                fit. Without one, extra arguments are ignored.
+            joined: Whether the arguments are passed joined by spaces as a
+                single one.
+            paginated: Whether the command takes LIMIT and OFFSET options,
+                passed to the handler as the limit and offset keywords.
+            arguments: The arguments as shown in HELP, e.g. "<video_id>".
+            help: What the command does, as shown in HELP.
+        """
+        self.name = name.upper()
+        self.handler = handler
+        self.min_args = min_args
+        self.max_args = max_args
+        self.usage = usage
+        self.joined = joined
+        self.paginated = paginated
+        self.arguments = arguments
+        self.help = help
+
+    def help_line(self):
+        """Returns the line describing the command in HELP."""
+        if self.arguments:
+            return f"{self.name} {self.arguments} - {self.help}"
+        return f"{self.name} - {self.help}"
+
+    def run(self, parser, words):
+        """Validates the words following the command name and runs it.
+
+        Raises:
+            CommandException: The arguments do not fit the command.
+        """
+        options = {}
+        if self.paginated:
+            words, options = _split_page(words)
+        if len(words) < self.min_args or (
+                self.max_args is not None and len(words) > self.max_args):
+            if self.paginated and any(
+                    word.upper() in ("LIMIT", "OFFSET")
+                    for word in words[self.max_args:]):
+                # Paging options followed by other words would be cut off
+                # below along with them.
                 raise CommandException(
-                    "Please enter PLAY command followed by video_id.")
-            self._player.play_video(command[1])
+                    self.usage or f"Please enter {self.name} followed only "
+                    "by the LIMIT <n> and OFFSET <n> options.")
+            if self.usage is not None or len(words) < self.min_args:
+                raise CommandException(
+                    self.usage or f"Please enter {self.help_line()}")
+            words = words[:self.max_args]
+        if self.joined:
+            words = [" ".join(words)]
+        self.handler(parser, *words, **options)
 
-        elif command[0].upper() == "PLAY_RANDOM":
-            self._player.play_random_video()
 
-        elif command[0].upper() == "STOP":
-            self._player.stop_video()
+# The commands every new CommandParser starts with, by name. Parsers share
+# the dict until they register a command of their own, so registering one
+# here replaces it instead of changing it.
+_COMMANDS = {}
 
-        elif command[0].upper() == "PAUSE":
-            self._player.pause_video()
 
-        elif command[0].upper() == "CONTINUE":
-            self._player.continue_video()
+def register_command(name, handler, **spec):
+    """Adds a command to every CommandParser created afterwards.
 
-        elif command[0].upper() == "SHOW_PLAYING":
-            self._player.show_playing()
+    Args:
+        name: The command name, matched case-insensitively.
+        handler: A callable taking the CommandParser and the arguments.
+        **spec: The other Command arguments.
+    """
+    global _COMMANDS
+    command = Command(name, handler, **spec)
+    _COMMANDS = {**_COMMANDS, command.name: command}
+    return command
 
-        elif command[0].upper() == "CREATE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CREATE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.create_playlist(command[1])
 
-        elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
+def _player_method(method_name):
+    """Returns a handler calling a method of the parser's player."""
+    def handler(parser, *args, **options):
+        getattr(parser.player, method_name)(*args, **options)
+    return handler
 
-        elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
 
-        elif command[0].upper() == "CLEAR_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CLEAR_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.clear_playlist(command[1])
+for _name, _method, _spec in (
+    ("NUMBER_OF_VIDEOS", "number_of_videos", dict(
+        help="Shows how many videos are in the library.")),
+    ("SHOW_ALL_VIDEOS", "show_all_videos", dict(
+        paginated=True, help="Lists all videos from the library.")),
+    ("PLAY", "play_video", dict(
+        min_args=1, max_args=1,
+        usage="Please enter PLAY command followed by video_id.",
+        arguments="<video_id>", help="Plays specified video.")),
+    ("PLAY_RANDOM", "play_random_video", dict(
+        help="Plays a random video from the library.")),
+    ("STOP", "stop_video", dict(help="Stop the current video.")),
+    ("PAUSE", "pause_video", dict(help="Pause the current video.")),
+    ("CONTINUE", "continue_video", dict(help="Resume the current paused video.")),
+    ("SHOW_PLAYING", "show_playing", dict(
+        help="Displays the title, url and paused status of the video that is "
+             "currently playing (or paused).")),
+    ("CREATE_PLAYLIST", "create_playlist", dict(
+        min_args=1, max_args=1,
+        usage="Please enter CREATE_PLAYLIST command followed by a playlist name.",
+        arguments="<playlist_name>",
+        help="Creates a new (empty) playlist with the provided name.")),
+    ("ADD_TO_PLAYLIST", "add_to_playlist", dict(
+        min_args=2, max_args=2,
+        usage="Please enter ADD_TO_PLAYLIST command followed by a playlist "
+              "name and video_id to add.",
+        arguments="<playlist_name> <video_id>",
+        help="Adds the requested video to the playlist.")),
+    ("REMOVE_FROM_PLAYLIST", "remove_from_playlist", dict(
+        min_args=2, max_args=2,
+        usage="Please enter REMOVE_FROM_PLAYLIST command followed by a "
+              "playlist name and video_id to remove.",
+        arguments="<playlist_name> <video_id>",
+        help="Removes the specified video from the specified playlist")),
+    ("CLEAR_PLAYLIST", "clear_playlist", dict(
+        min_args=1, max_args=1,
+        usage="Please enter CLEAR_PLAYLIST command followed by a playlist name.",
+        arguments="<playlist_name>",
+        help="Removes all the videos from the playlist.")),
+    ("DELETE_PLAYLIST", "delete_playlist", dict(
+        min_args=1, max_args=1,
+        usage="Please enter DELETE_PLAYLIST command followed by a playlist name.",
+        arguments="<playlist_name>", help="Deletes the playlist.")),
+    ("SHOW_PLAYLIST", "show_playlist", dict(
+        min_args=1, max_args=1, paginated=True,
+        usage="Please enter SHOW_PLAYLIST command followed by a playlist name.",
+        arguments="<playlist_name>",
+        help="List all the videos in this playlist.")),
+    ("SHOW_ALL_PLAYLISTS", "show_all_playlists", dict(
+        help="Display all the available playlists.")),
+    ("SEARCH_VIDEOS", "search_videos", dict(
+        min_args=1, max_args=1, paginated=True,
+        usage="Please enter SEARCH_VIDEOS command followed by a search term.",
+        arguments="<search_term>",
+        help="Display all the videos whose titles contain the search_term.")),
+    ("SEARCH_VIDEOS_WITH_TAG", "search_videos_tag", dict(
+        min_args=1, max_args=1, paginated=True,
+        usage="Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
+              "video tag.",
+        arguments="<tag_name>",
+        help="Display all videos whose tags contains the provided tag.")),
+    ("SEARCH_VIDEOS_WITH_TAGS", "search_videos_tags", dict(
+        min_args=1, max_args=None, joined=True,
+        usage="Please enter SEARCH_VIDEOS_WITH_TAGS command followed by a tag "
+              "query.",
+        arguments="<tag_query>",
+        help="Display all videos matching a query such as \"#cat AND #animal NOT #career\" (AND, OR, NOT, "
+             "parentheses).")),
+    ("PLAY_RESULT", "play_result", dict(
+        min_args=1, max_args=1,
+        usage="Please enter PLAY_RESULT command followed by the number of a "
+              "search result.",
+        arguments="<result_number>",
+        help="Plays one of the videos listed by the last search.")),
+    ("FLAG_VIDEO", "flag_video", dict(
+        min_args=1, max_args=2,
+        usage="Please enter FLAG_VIDEO command followed by a video_id and an "
+              "optional flag reason.",
+        arguments="<video_id> <flag_reason>",
+        help="Mark a video as flagged.")),
+    ("ALLOW_VIDEO", "allow_video", dict(
+        min_args=1, max_args=1,
+        usage="Please enter ALLOW_VIDEO command followed by a video_id.",
+        arguments="<video_id>", help="Removes a flag from a video.")),
+    ("RELOAD_LIBRARY", "reload_library", dict(
+        help="Re-reads the video catalog, keeping playlists and flags.")),
+):
+    register_command(_name, _player_method(_method), **_spec)
 
-        elif command[0].upper() == "DELETE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter DELETE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.delete_playlist(command[1])
+register_command(
+    "STATS", lambda parser: parser.show_stats(),
+    help="Shows how often each command ran, how often it failed and how long "
+         "it took.")
+register_command(
+    "HELP", lambda parser: parser.show_help(), help="Displays help.")
 
-        elif command[0].upper() == "SHOW_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SHOW_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.show_playlist(command[1])
+# The name unknown commands are recorded under, so that typos do not each
+# get statistics of their own.
+UNKNOWN_COMMAND = "UNKNOWN"
 
-        elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
 
-        elif command[0].upper() == "SEARCH_VIDEOS":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS command followed by a "
-                    "search term.")
-            self._player.search_videos(command[1])
+def _latency(bucket):
+    """Returns the latency range of a histogram bucket, as shown by STATS."""
+    bound = bucket_bound_us(bucket)
+    if bound is None:
+        return f">= {bucket_bound_us(BUCKETS - 2)} us"
+    return f"< {bound} us"
 
-        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAG":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
-                    "video tag.")
-            self._player.search_videos_tag(command[1])
-
-        elif command[0].upper() == "FLAG_VIDEO":
-            if len(command) == 3:
-                self._player.flag_video(command[1], command[2])
-            elif len(command) == 2:
-                self._player.flag_video(command[1])
-            else:
-                raise CommandException(
-                    "Please enter FLAG_VIDEO command followed by a "
-                    "video_id and an optional flag reason.")
 
-        elif command[0].upper() == "ALLOW_VIDEO":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter ALLOW_VIDEO command followed by a "
-                    "video_id.")
-            self._player.allow_video(command[1])
-
-        elif command[0].upper() == "HELP":
-            self._get_help()
-        else:
-            print(
-                "Please enter a valid command, type HELP for a list of "
-                "available commands.")
-
-    def _get_help(self):
+class CommandParser:
+    """A class used to parse and execute a user Command."""
+
+    __slots__ = ("_player", "_output", "_commands", "_stats")
+
+    def __init__(self, video_player, output=None, stats=None):
+        """The CommandParser class is initialized.
+
+        Args:
+            video_player: The VideoPlayer commands are run on.
+            output: The sink to write to, the player's if None.
+            stats: The CommandStats to record commands in, those shared by
+                the whole process if None.
+        """
+        self._player = video_player
+        self._output = video_player.output if output is None else output
+        self._commands = _COMMANDS
+        self._stats = DEFAULT_STATS if stats is None else stats
+
+    @property
+    def player(self):
+        """The player commands are run on."""
+        return self._player
+
+    @property
+    def output(self):
+        """The output sink of the parser."""
+        return self._output
+
+    @property
+    def stats(self):
+        """The CommandStats the parser records commands in."""
+        return self._stats
+
+    def register(self, name, handler, **spec):
+        """Adds a command to this parser only, see register_command."""
+        command = Command(name, handler, **spec)
+        self._commands = {**self._commands, command.name: command}
+        return command
+
+    def execute_command(self, command: Sequence[str]):
+        """Executes the user command. Expects the command to be upper case.
+           Raises CommandException if a command cannot be parsed.
+
+           The output of the command is written out in one go once it is
+           done, or before the user is asked for an answer.
+        """
+        if not command:
+            raise CommandException(
+                "Please enter a valid command, "
+                "type HELP for a list of available commands.")
+
+        with self._output.batch():
+            self._player.apply_library_updates()
+            handler = self._commands.get(command[0].upper())
+            # The results of a search can only be picked by the very next
+            # command.
+            if handler is None or handler.name != "PLAY_RESULT":
+                self._player.discard_choice()
+            start = time.perf_counter_ns()
+            if handler is None:
+                self._output.write_line(
+                    "Please enter a valid command, type HELP for a list of "
+                    "available commands.")
+                self._stats.record(
+                    UNKNOWN_COMMAND, time.perf_counter_ns() - start, failed=True)
+                return
+            failed = True
+            try:
+                handler.run(self, list(command[1:]))
+                failed = False
+            finally:
+                self._stats.record(
+                    handler.name, time.perf_counter_ns() - start, failed)
+
+    def show_help(self):
         """Displays all available commands to the user."""
-        help_text = textwrap.dedent("""
-        Available commands:
-            NUMBER_OF_VIDEOS - Shows how many videos are in the library.
-            SHOW_ALL_VIDEOS - Lists all videos from the library.
-            PLAY <video_id> - Plays specified video.
-            PLAY_RANDOM - Plays a random video from the library.
-            STOP - Stop the current video.
-            PAUSE - Pause the current video.
-            CONTINUE - Resume the current paused video.
-            SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
-            CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
-            ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
-            REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
-            CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
-            DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
-            SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
-            SHOW_ALL_PLAYLISTS - Display all the available playlists.
-            SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
-            SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
-            FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
-            ALLOW_VIDEO <video_id> - Removes a flag from a video.
-            HELP - Displays help.
-            EXIT - Terminates the program execution.
-        """)
-        print(help_text)
+        commands = self._commands.values()
+        paginated = [command.name for command in commands if command.paginated]
+        lines = ["", "Available commands:"]
+        lines.extend("    " + command.help_line() for command in commands)
+        lines.append("    EXIT - Terminates the program execution.")
+        if paginated:
+            lines.append(
+                ", ".join(paginated[:-1]) + " and " + paginated[-1]
+                if len(paginated) > 1 else paginated[0])
+            lines.append(
+                "take optional LIMIT <n> and OFFSET <n> options to show one "
+                "page at a time.")
+        lines.append("")
+        self._output.write_line("\n".join(lines))
+
+    def show_stats(self):
+        """Displays the statistics of the commands run so far."""
+        snapshot = self._stats.snapshot()
+        if not snapshot:
+            self._output.write_line("No commands have run yet")
+            return
+        lines = ["Command statistics:"]
+        for name in sorted(snapshot):
+            command = snapshot[name]
+            mean_us = command["total_ns"] / command["count"] / 1000
+            lines.append(
+                f"    {name}: {command['count']} runs, {command['errors']} "
+                f"errors, mean {mean_us:.0f} us, "
+                f"p50 {_latency(percentile(command['buckets'], 0.5))}, "
+                f"p99 {_latency(percentile(command['buckets'], 0.99))}")
+        self._output.write_line("\n".join(lines))
@@ -0,0 +1,142 @@
+"""Counts and latencies of the commands a parser runs.
+
+Each command name gets a count, an error count (commands that raised),
+the total time spent and a histogram of latencies in fixed log-scale
+buckets: bucket 0 holds commands faster than 1 microsecond, bucket k
+those taking [2 ** (k - 1), 2 ** k) microseconds, and the last bucket
+everything slower. Since the buckets never change, the statistics of
+several sessions or worker processes add up bucket by bucket; snapshot()
+returns them as plain dicts and lists that pickle or serialize to JSON.
+"""
+
+import threading
+
+# Number of histogram buckets, the last one starts at 2 ** 25 us (33 s).
+BUCKETS = 27
+
+
+def bucket_of(elapsed_ns):
+    """Returns the histogram bucket of a latency in nanoseconds."""
+    return min((elapsed_ns // 1000).bit_length(), BUCKETS - 1)
+
+
+def bucket_bound_us(bucket):
+    """Returns the latency in microseconds a bucket ends at, None for the
+    last bucket, which has no end."""
+    return None if bucket == BUCKETS - 1 else 1 << bucket
+
+
+def percentile(buckets, fraction):
+    """Returns the bucket holding a percentile of a histogram.
+
+    Args:
+        buckets: The counts of a histogram, by bucket.
+        fraction: The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        The bucket index, None for an empty histogram.
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = fraction * total
+    seen = 0
+    for bucket, count in enumerate(buckets):
+        seen += count
+        if seen >= rank:
+            return bucket
+    return BUCKETS - 1
+
+
+def merge_snapshots(snapshots):
+    """Returns the sum of several snapshots, e.g. one per worker process."""
+    stats = CommandStats()
+    for snapshot in snapshots:
+        stats.merge(snapshot)
+    return stats.snapshot()
+
+
+class _Counters:
+    """A class used to represent the statistics of one command."""
+
+    __slots__ = ("count", "errors", "total_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.buckets = [0] * BUCKETS
+
+
+class CommandStats:
+    """A class used to represent the statistics of the commands run.
+
+    It may be shared by the parsers of several sessions, on several
+    threads.
+    """
+
+    def __init__(self):
+        """The CommandStats class is initialized."""
+        self._commands = {}
+        self._lock = threading.Lock()
+
+    def _counters(self, name):
+        counters = self._commands.get(name)
+        if counters is None:
+            counters = self._commands[name] = _Counters()
+        return counters
+
+    def record(self, name, elapsed_ns, failed=False):
+        """Records one run of a command.
+
+        Args:
+            name: The command name.
+            elapsed_ns: How long the command took, in nanoseconds.
+            failed: Whether the command raised an exception.
+        """
+        bucket = bucket_of(elapsed_ns)
+        with self._lock:
+            counters = self._counters(name)
+            counters.count += 1
+            counters.errors += failed
+            counters.total_ns += elapsed_ns
+            counters.buckets[bucket] += 1
+
+    def snapshot(self):
+        """Returns the statistics so far, by command name.
+
+        Each command maps to a dict with the keys "count", "errors",
+        "total_ns" and "buckets", the histogram as a list of BUCKETS
+        counts. Later records do not change a returned snapshot.
+        """
+        with self._lock:
+            return {
+                name: {"count": counters.count, "errors": counters.errors,
+                       "total_ns": counters.total_ns,
+                       "buckets": list(counters.buckets)}
+                for name, counters in self._commands.items()
+            }
+
+    def merge(self, snapshot):
+        """Adds the statistics of a snapshot to these.
+
+        Raises:
+            ValueError: The snapshot has histograms of another size.
+        """
+        with self._lock:
+            for name, command in snapshot.items():
+                if len(command["buckets"]) != BUCKETS:
+                    raise ValueError(
+                        f"Cannot merge a histogram of {len(command['buckets'])} "
+                        f"buckets into one of {BUCKETS}")
+                counters = self._counters(name)
+                counters.count += command["count"]
+                counters.errors += command["errors"]
+                counters.total_ns += command["total_ns"]
+                for bucket, count in enumerate(command["buckets"]):
+                    counters.buckets[bucket] += count
+
+
+# The statistics every CommandParser records to unless given others, so
+# that all sessions of a process add up.
+DEFAULT_STATS = CommandStats()
@@ -0,0 +1,87 @@
+"""Output sinks the video player writes its lines to."""
+
+import sys
+from contextlib import contextmanager
+
+
+class StreamSink:
+    """A class used to represent output written to a text stream.
+
+    Outside of a batch every line is written as print() would. Inside one
+    lines are collected and written with a single write when the outermost
+    batch ends, or before the user is asked for an answer.
+    """
+
+    __slots__ = ("_stream", "_buffer", "_depth")
+
+    def __init__(self, stream=None):
+        """The StreamSink class is initialized.
+
+        Args:
+            stream: The text stream to write to, sys.stdout as it is at
+                write time if None.
+        """
+        self._stream = stream
+        self._buffer = []
+        self._depth = 0
+
+    def write_line(self, text=""):
+        """Writes one line of output."""
+        if self._depth:
+            self._buffer.append(str(text))
+        else:
+            (self._stream or sys.stdout).write(f"{text}\n")
+
+    @contextmanager
+    def batch(self):
+        """Buffers the lines written until the outermost batch ends."""
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.flush()
+
+    def flush(self):
+        """Writes the buffered lines out."""
+        stream = self._stream or sys.stdout
+        if self._buffer:
+            self._buffer.append("")
+            stream.write("\n".join(self._buffer))
+            self._buffer.clear()
+        stream.flush()
+
+    def ask(self):
+        """Returns a line read from the user, once the output is shown."""
+        self.flush()
+        return input()
+
+
+class ListSink:
+    """A class used to represent output collected in a list, for tests."""
+
+    def __init__(self, answers=()):
+        """The ListSink class is initialized.
+
+        Args:
+            answers: The answers ask returns in turn, "" once they run out.
+        """
+        self.lines = []
+        self._answers = list(answers)
+
+    def write_line(self, text=""):
+        """Collects one line of output."""
+        self.lines.extend(str(text).split("\n"))
+
+    @contextmanager
+    def batch(self):
+        """Does nothing special, lines are collected either way."""
+        yield self
+
+    def flush(self):
+        """Does nothing, lines are collected either way."""
+
+    def ask(self):
+        """Returns the next scripted answer."""
+        return self._answers.pop(0) if self._answers else ""
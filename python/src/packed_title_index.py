@@ -0,0 +1,202 @@
+"""Title search and title order packed into one flat buffer.
+
+The same data a TitleIndex and a TitleOrder build in memory, laid out so
+that it can be published in shared memory with a catalog snapshot and
+read by every worker in place:
+
+    header
+    title_order     uint32[row_count]          rows sorted by title
+    title_ranks     uint32[row_count]          position of each row there
+    lower_offsets   uint32[row_count + 1]      where each title starts
+    gram_offsets    uint32[gram_count + 1]     byte offsets into gram_data
+    posting_starts  uint32[gram_count + 1]     gram i owns postings[start:end]
+    postings        uint32[posting_count]      rows containing each gram
+    gram_data       utf-8 bytes of the trigrams, in code point order
+    lower_data      utf-8 bytes of the lowercased titles, each followed
+                    by a newline
+
+All integers are little endian. A search looks the grams of the term up
+in place and decodes the titles of the candidates. Only when most titles
+are candidates, as for terms too short to have grams, are all titles
+decoded at once, for the length of the search.
+"""
+
+import struct
+import sys
+from array import array
+
+from .catalog_snapshot import _to_le_bytes, _uint32_array
+from .title_index import GRAM_SIZE, _grams
+
+# row count, gram count, posting count, gram data size, lower data size.
+_HEADER = struct.Struct("<IIIII")
+
+
+def pack(rows):
+    """Returns the packed title index of rows.
+
+    Args:
+        rows: The (title, video_id, tags) tuples of a catalog, deduplicated,
+            so that their positions are the ordinals of the snapshot.
+    """
+    titles = [row[0] for row in rows]
+    order = _uint32_array(sorted(range(len(titles)), key=titles.__getitem__))
+    ranks = _uint32_array(bytes(4 * len(titles)))
+    for rank, row in enumerate(order):
+        ranks[row] = rank
+
+    lower_data = bytearray()
+    lower_offsets = _uint32_array([0])
+    postings_by_gram = {}
+    for row, title in enumerate(titles):
+        title = title.lower()
+        lower_data.extend(title.encode("utf-8"))
+        lower_data.extend(b"\n")
+        lower_offsets.append(len(lower_data))
+        for gram in _grams(title):
+            postings = postings_by_gram.get(gram)
+            if postings is None:
+                postings = postings_by_gram[gram] = _uint32_array()
+            postings.append(row)
+
+    gram_data = bytearray()
+    gram_offsets = _uint32_array([0])
+    posting_starts = _uint32_array([0])
+    postings = _uint32_array()
+    # Code point order of str matches the byte order of their utf-8
+    # encoding, which is what the lookup compares.
+    for gram in sorted(postings_by_gram):
+        gram_data.extend(gram.encode("utf-8"))
+        gram_offsets.append(len(gram_data))
+        postings.extend(postings_by_gram[gram])
+        posting_starts.append(len(postings))
+
+    columns = (order, ranks, lower_offsets, gram_offsets, posting_starts,
+               postings)
+    header = _HEADER.pack(len(titles), len(postings_by_gram), len(postings),
+                          len(gram_data), len(lower_data))
+    return b"".join([header] + [_to_le_bytes(column) for column in columns]
+                    + [bytes(gram_data), bytes(lower_data)])
+
+
+class PackedTitleIndex:
+    """A class used to represent a title index read from a packed buffer.
+
+    It searches like TitleIndex and its order and ranks columns serve a
+    TitleOrder as they are. It is read-only.
+    """
+
+    def __init__(self, buffer, owner=None):
+        """The PackedTitleIndex class is initialized.
+
+        Args:
+            buffer: A memoryview starting with the packed index, which the
+                index releases when closed.
+            owner: The object holding the memory under buffer, kept alive
+                as long as the index, e.g. a SharedMemory.
+        """
+        (row_count, gram_count, posting_count, gram_size,
+         _) = _HEADER.unpack_from(buffer)
+        self._buffer = buffer
+        position = _HEADER.size
+        columns = []
+        for size in (row_count, row_count, row_count + 1, gram_count + 1,
+                     gram_count + 1, posting_count):
+            columns.append(self._column(position, size))
+            position += 4 * size
+        (self.order, self.ranks, self._lower_offsets, self._gram_offsets,
+         self._posting_starts, self._postings) = columns
+        self._gram_data = buffer[position:position + gram_size]
+        self._lower_data = buffer[position + gram_size:]
+        # Set last so that, should the index be dropped without close(),
+        # the views go before the memory can be released.
+        self._owner = owner
+
+    def _column(self, position, size):
+        view = self._buffer[position:position + 4 * size]
+        if sys.byteorder == "little" and array("I").itemsize == 4:
+            return view.cast("I")
+        column = _uint32_array()
+        column.frombytes(view)
+        if sys.byteorder != "little":
+            column.byteswap()
+        return column
+
+    def _gram(self, index):
+        return bytes(self._gram_data[
+            self._gram_offsets[index]:self._gram_offsets[index + 1]])
+
+    def _posting(self, gram):
+        """Returns the rows containing a gram, None if there are none."""
+        key = gram.encode("utf-8")
+        low, high = 0, len(self._gram_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._gram(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(self._gram_offsets) - 1 or self._gram(low) != key:
+            return None
+        return self._postings[
+            self._posting_starts[low]:self._posting_starts[low + 1]]
+
+    def __len__(self):
+        return len(self.order)
+
+    def _title(self, row):
+        """Returns the lowercased title of a row."""
+        return str(self._lower_data[
+            self._lower_offsets[row]:self._lower_offsets[row + 1] - 1], "utf-8")
+
+    def _titles(self):
+        """Returns all lowercased titles, None if one holds a newline."""
+        titles = str(self._lower_data, "utf-8").split("\n")
+        if len(titles) != len(self) + 1:
+            return None
+        return titles
+
+    def search(self, search_term):
+        """Returns the ordinals of all titles containing search_term.
+
+        Args:
+            search_term: The query, matched case-insensitively.
+
+        Returns:
+            A list of ordinals in ascending order.
+        """
+        search_term = search_term.lower()
+        if len(search_term) < GRAM_SIZE:
+            candidates = range(len(self))
+        else:
+            postings = []
+            for gram in _grams(search_term):
+                posting = self._posting(gram)
+                if posting is None:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return []
+            candidates = sorted(candidates)
+
+        # Past a few candidates per title decoded one by one, decoding all
+        # titles in one go is cheaper.
+        if len(candidates) > len(self) // 8:
+            titles = self._titles()
+            if titles is not None:
+                return [row for row in candidates if search_term in titles[row]]
+        title = self._title
+        return [row for row in candidates if search_term in title(row)]
+
+    def close(self):
+        """Releases the views on the buffer, and the buffer."""
+        for view in (self.order, self.ranks, self._lower_offsets,
+                     self._gram_offsets, self._posting_starts, self._postings,
+                     self._gram_data, self._lower_data, self._buffer):
+            if isinstance(view, memoryview):
+                view.release()
+
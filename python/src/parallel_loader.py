@@ -0,0 +1,111 @@
+"""Parses a text catalog across several processes.
+
+The file is split into byte ranges that end on line boundaries, every range
+is parsed by a worker process and sent back as three columns (titles, ids
+and tags), and the chunks are zipped back into rows in file order. Columns
+of plain strings are the cheapest thing for the parent to unpickle, and
+interning the tags in the workers has pickle send each tag once per chunk.
+Only ids repeated across chunks need the parent to deduplicate the rows.
+
+Rows are split at newlines, so a quoted csv field spanning several lines
+is only parsed like the single process loader does when it does not cross
+a range boundary.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import itemgetter
+
+from . import catalog_snapshot
+from .bytes_parser import parse_bytes, paused_gc, read_rows_fast
+
+# Files smaller than this are not worth starting worker processes for.
+MIN_PARALLEL_SIZE = 1 << 20
+
+
+def split_ranges(videos_path, count):
+    """Splits a file into at most count byte ranges ending on newlines.
+
+    Args:
+        videos_path: The file to split.
+        count: The number of ranges to aim for.
+
+    Returns:
+        A list of (start, end) offsets covering the whole file in order.
+    """
+    size = os.path.getsize(videos_path)
+    ranges = []
+    start = 0
+    with open(videos_path, "rb") as video_file:
+        for i in range(1, count):
+            if start >= size:
+                break
+            video_file.seek(max(start, size * i // count))
+            video_file.readline()
+            end = video_file.tell()
+            if end > start:
+                ranges.append((start, end))
+                start = end
+    if start < size or not ranges:
+        ranges.append((start, size))
+    return ranges
+
+
+def _parse_range(videos_path, start, end):
+    """Parses the rows in a byte range and returns them as columns.
+
+    Returns:
+        A (titles, video_ids, tags) tuple of lists, one entry per video_id
+        of the range.
+    """
+    with open(videos_path, "rb") as video_file:
+        video_file.seek(start)
+        data = video_file.read(end - start)
+    # Each worker process only parses, pausing its collector is safe.
+    rows = catalog_snapshot.deduplicate(parse_bytes(data, pause_gc=True))
+    intern = sys.intern
+    return ([row[0] for row in rows], [row[1] for row in rows],
+            [[intern(tag) for tag in row[2]] for row in rows])
+
+
+def read_rows_parallel(videos_path, workers=None, chunks_per_worker=4,
+                       pause_gc=False):
+    """Returns the rows of a text catalog, parsed by worker processes.
+
+    Args:
+        videos_path: The path of a videos.txt style file.
+        workers: The number of worker processes, os.cpu_count() if None.
+        chunks_per_worker: How many ranges each worker gets on average,
+            more ranges even out workers that get slower ranges.
+        pause_gc: Whether to disable the garbage collector of this process
+            while it parses or merges the catalog, see paused_gc.
+
+    Returns:
+        A list of (title, video_id, tags) tuples, one per video_id, where a
+        repeated video_id keeps its first position and its last row's data.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or os.path.getsize(videos_path) < MIN_PARALLEL_SIZE:
+        return catalog_snapshot.deduplicate(
+            read_rows_fast(videos_path, pause_gc=pause_gc))
+
+    ranges = split_ranges(videos_path, workers * chunks_per_worker)
+    rows = []
+    # The chunks are unpickled as they arrive, by a thread of this process,
+    # so the collector is paused around the whole pool.
+    with paused_gc(pause_gc):
+        with ProcessPoolExecutor(workers) as executor:
+            chunks = executor.map(
+                _parse_range, repeat(videos_path),
+                [start for start, _ in ranges], [end for _, end in ranges])
+            for titles, video_ids, tags in chunks:
+                rows.extend(zip(titles, video_ids, tags))
+        # Every chunk is deduplicated already, merging them in file order
+        # with the same rule gives the result of deduplicating the whole
+        # file. Most catalogs have no id in two chunks, checking the ids is
+        # much cheaper than merging the rows.
+        if len(set(map(itemgetter(1), rows))) != len(rows):
+            rows = catalog_snapshot.deduplicate(rows)
+    return rows
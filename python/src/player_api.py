@@ -0,0 +1,447 @@
+"""The programmatic interface of the video player.
+
+PlayerAPI answers every command of one session with a result object
+instead of text, so a caller embedding the player neither parses output
+nor pays for formatting it. VideoPlayer renders these results for the
+command line. The catalog and its flags live in a CatalogService that
+many sessions can share.
+"""
+
+import functools
+import threading
+from contextlib import nullcontext
+
+from .bitmap import bit_count
+from .catalog_service import CatalogService
+from .tag_query import TagQueryError
+
+# Result statuses.
+OK = "ok"
+VIDEO_NOT_FOUND = "video_not_found"
+VIDEO_FLAGGED = "video_flagged"
+NO_VIDEOS = "no_videos"
+NOTHING_PLAYING = "nothing_playing"
+ALREADY_PAUSED = "already_paused"
+NOT_PAUSED = "not_paused"
+PLAYLIST_EXISTS = "playlist_exists"
+PLAYLIST_NOT_FOUND = "playlist_not_found"
+ALREADY_IN_PLAYLIST = "already_in_playlist"
+NOT_IN_PLAYLIST = "not_in_playlist"
+ALREADY_FLAGGED = "already_flagged"
+NOT_FLAGGED = "not_flagged"
+INVALID_QUERY = "invalid_query"
+NO_PENDING_CHOICE = "no_pending_choice"
+INVALID_CHOICE = "invalid_choice"
+RELOAD_FAILED = "reload_failed"
+
+
+class Result:
+    """A class used to represent the outcome of a player command."""
+
+    __slots__ = ("status", "detail")
+
+    def __init__(self, status=OK, detail=""):
+        """The Result class is initialized.
+
+        Args:
+            status: One of the status constants of this module.
+            detail: An explanation of a failure, when there is one.
+        """
+        self.status = status
+        self.detail = detail
+
+    @property
+    def ok(self):
+        """Whether the command succeeded."""
+        return self.status == OK
+
+
+class VideoResult(Result):
+    """A class used to represent the outcome of a command on one video."""
+
+    __slots__ = ("video", "stopped", "reason")
+
+    def __init__(self, status=OK, video=None, stopped=None, reason=None):
+        """The VideoResult class is initialized.
+
+        Args:
+            status: One of the status constants of this module.
+            video: The Video the command was about.
+            stopped: The Video the command stopped playing, if any.
+            reason: The flag reason involved, "" when none was supplied.
+        """
+        super().__init__(status)
+        self.video = video
+        self.stopped = stopped
+        self.reason = reason
+
+
+class ListResult(Result):
+    """A class used to represent one page of a listing."""
+
+    __slots__ = ("items", "offset", "total")
+
+    def __init__(self, status=OK, items=(), offset=0, total=0, detail=""):
+        """The ListResult class is initialized.
+
+        Args:
+            status: One of the status constants of this module.
+            items: The Video objects, or playlist names, of the page.
+            offset: The position of the first item among all of them.
+            total: The number of items in the whole listing.
+            detail: An explanation of a failure, when there is one.
+        """
+        super().__init__(status, detail)
+        self.items = list(items)
+        self.offset = offset
+        self.total = total
+
+
+class ReloadResult(Result):
+    """A class used to represent the outcome of a catalog reload."""
+
+    __slots__ = ("delta",)
+
+    def __init__(self, status=OK, delta=None, detail=""):
+        """The ReloadResult class is initialized.
+
+        Args:
+            status: OK or RELOAD_FAILED.
+            delta: The applied CatalogDelta.
+            detail: Why the reload failed.
+        """
+        super().__init__(status, detail)
+        self.delta = delta
+
+
+def _stop(limit, offset):
+    return None if limit is None else offset + limit
+
+
+_NO_LOCK = nullcontext()
+
+
+def _reading(method):
+    """Runs a command holding the catalog for reading and the session."""
+    @functools.wraps(method)
+    def command(self, *args, **kwargs):
+        with self.service.lock.read(), self._lock:
+            return method(self, *args, **kwargs)
+    return command
+
+
+def _writing(method):
+    """Runs a command holding the catalog, and so every session, alone."""
+    @functools.wraps(method)
+    def command(self, *args, **kwargs):
+        with self.service.lock.write():
+            return method(self, *args, **kwargs)
+    return command
+
+
+class PlayerAPI:
+    """A class used to represent the commands of one player session.
+
+    With a thread-safe CatalogService the commands may be called from
+    several threads; those of one session then run one at a time.
+    """
+
+    __slots__ = ("service", "session", "library", "_lock")
+
+    def __init__(self, video_library=None, service=None, session=None):
+        """The PlayerAPI class is initialized.
+
+        Args:
+            video_library: The VideoLibrary to play from, a new one loaded
+                from the default catalog if None. Ignored if service is
+                given.
+            service: The CatalogService shared with other sessions, a new
+                one on video_library if None.
+            session: The PlayerSession to run commands on, a new one of
+                service if None.
+        """
+        if service is None:
+            service = CatalogService(video_library)
+        self.service = service
+        self.session = service.open_session() if session is None else session
+        self.library = service.library
+        self._lock = threading.Lock() if service.thread_safe else _NO_LOCK
+
+    @property
+    def currently_playing(self):
+        """The video_id of the video playing, "" if none."""
+        return self.session.currently_playing
+
+    @property
+    def paused(self):
+        """Whether the video playing is paused."""
+        return self.session.paused
+
+    @property
+    def pending_choice(self):
+        """The ListResult of the last search until a result is picked."""
+        return self.session.pending_choice
+
+    @property
+    def flagged(self):
+        """The flag reasons of the flagged videos, by video_id."""
+        return self.service.flagged
+
+    def apply_library_updates(self):
+        """Applies catalog changes picked up by the library's watcher."""
+        if self.library.has_pending_reload():
+            with self.service.lock.write():
+                self.library.apply_pending_reload()
+
+    def close(self):
+        """Ends the session, the service may outlive it."""
+        self.service.close_session(self.session)
+
+    @_writing
+    def reload_library(self):
+        """Re-reads the video catalog and applies what changed."""
+        if not self.service.reloadable:
+            return ReloadResult(
+                RELOAD_FAILED,
+                detail="The library is shared by every session of the server")
+        try:
+            return ReloadResult(delta=self.library.reload())
+        except ValueError as e:
+            return ReloadResult(RELOAD_FAILED, detail=str(e))
+
+    @_reading
+    def number_of_videos(self):
+        """Returns the number of videos in the library."""
+        return len(self.library)
+
+    @_reading
+    def show_all_videos(self, offset=0, limit=None):
+        """Returns a page of all videos, in title order."""
+        return ListResult(
+            items=self.library.videos_by_title(None, offset, _stop(limit, offset)),
+            offset=offset, total=len(self.library))
+
+    @_reading
+    def play_video(self, video_id):
+        """Plays a video, stopping the one playing."""
+        return self._play(video_id)
+
+    def _play(self, video_id):
+        flagged = self.service.flagged
+        if video_id in flagged:
+            return VideoResult(VIDEO_FLAGGED, reason=flagged[video_id])
+        video = self.library.get_video(video_id)
+        if video is None:
+            return VideoResult(VIDEO_NOT_FOUND)
+        stopped = None
+        if self.session.currently_playing:
+            stopped = self._stop().video
+        self.session.currently_playing = video_id
+        return VideoResult(video=video, stopped=stopped)
+
+    @_reading
+    def stop_video(self):
+        """Stops the current video."""
+        return self._stop()
+
+    def _stop(self):
+        session = self.session
+        if session.currently_playing == "":
+            return VideoResult(NOTHING_PLAYING)
+        video = self.library.get_video(session.currently_playing)
+        session.currently_playing = ""
+        session.paused = False
+        return VideoResult(video=video)
+
+    @_reading
+    def play_random_video(self):
+        """Plays a random video that is not flagged."""
+        allowed = self.service.allowed()
+        if len(allowed) == 0:
+            return VideoResult(NO_VIDEOS)
+        return self._play(self.library.video_id(allowed.choice()))
+
+    @_reading
+    def pause_video(self):
+        """Pauses the current video."""
+        session = self.session
+        if not session.currently_playing:
+            return VideoResult(NOTHING_PLAYING)
+        video = self.library.get_video(session.currently_playing)
+        if session.paused:
+            return VideoResult(ALREADY_PAUSED, video)
+        session.paused = True
+        return VideoResult(video=video)
+
+    @_reading
+    def continue_video(self):
+        """Resumes playing the current video."""
+        session = self.session
+        if not session.currently_playing:
+            return VideoResult(NOTHING_PLAYING)
+        video = self.library.get_video(session.currently_playing)
+        if not session.paused:
+            return VideoResult(NOT_PAUSED, video)
+        session.paused = False
+        return VideoResult(video=video)
+
+    @_reading
+    def show_playing(self):
+        """Returns the video currently playing, see self.paused."""
+        if not self.session.currently_playing:
+            return VideoResult(NOTHING_PLAYING)
+        return VideoResult(
+            video=self.library.get_video(self.session.currently_playing))
+
+    @_reading
+    def create_playlist(self, playlist_name):
+        """Creates an empty playlist, names are case-insensitive."""
+        playlists_dict = self.session.playlists_dict
+        if playlist_name.lower() in playlists_dict:
+            return Result(PLAYLIST_EXISTS)
+        playlists_dict[playlist_name.lower()] = []
+        self.session.playlists.append(playlist_name)
+        return Result()
+
+    @_reading
+    def add_to_playlist(self, playlist_name, video_id):
+        """Adds a video to a playlist."""
+        video_ids = self.session.playlists_dict.get(playlist_name.lower())
+        if video_ids is None:
+            return VideoResult(PLAYLIST_NOT_FOUND)
+        video = self.library.get_video(video_id)
+        if video is None:
+            return VideoResult(VIDEO_NOT_FOUND)
+        if video_id in video_ids:
+            return VideoResult(ALREADY_IN_PLAYLIST, video)
+        flagged = self.service.flagged
+        if video_id in flagged:
+            return VideoResult(VIDEO_FLAGGED, video, reason=flagged[video_id])
+        video_ids.append(video_id)
+        return VideoResult(video=video)
+
+    @_reading
+    def show_all_playlists(self):
+        """Returns the names of all playlists, sorted."""
+        playlists = self.session.playlists
+        playlists.sort()
+        return ListResult(items=playlists, total=len(playlists))
+
+    @_reading
+    def show_playlist(self, playlist_name, offset=0, limit=None):
+        """Returns a page of the videos in a playlist, in playlist order."""
+        video_ids = self.session.playlists_dict.get(playlist_name.lower())
+        if video_ids is None:
+            return ListResult(PLAYLIST_NOT_FOUND)
+        return ListResult(
+            items=[self.library.get_video(video_id)
+                   for video_id in video_ids[offset:_stop(limit, offset)]],
+            offset=offset, total=len(video_ids))
+
+    @_reading
+    def remove_from_playlist(self, playlist_name, video_id):
+        """Removes a video from a playlist."""
+        video_ids = self.session.playlists_dict.get(playlist_name.lower())
+        if video_ids is None:
+            return VideoResult(PLAYLIST_NOT_FOUND)
+        video = self.library.get_video(video_id)
+        if video is None:
+            return VideoResult(VIDEO_NOT_FOUND)
+        if video_id not in video_ids:
+            return VideoResult(NOT_IN_PLAYLIST, video)
+        video_ids.remove(video_id)
+        return VideoResult(video=video)
+
+    @_reading
+    def clear_playlist(self, playlist_name):
+        """Removes all videos from a playlist."""
+        playlists_dict = self.session.playlists_dict
+        if playlist_name.lower() not in playlists_dict:
+            return Result(PLAYLIST_NOT_FOUND)
+        playlists_dict[playlist_name.lower()] = []
+        return Result()
+
+    @_reading
+    def delete_playlist(self, playlist_name):
+        """Deletes a playlist."""
+        playlists_dict = self.session.playlists_dict
+        if playlist_name.lower() not in playlists_dict:
+            return Result(PLAYLIST_NOT_FOUND)
+        del playlists_dict[playlist_name.lower()]
+        self.session.playlists.remove(playlist_name)
+        return Result()
+
+    def _search_page(self, bits, offset, limit):
+        bits &= ~self.service.flagged_bits
+        result = ListResult(
+            items=self.library.videos_by_title(bits, offset, _stop(limit, offset)),
+            offset=offset, total=bit_count(bits))
+        self.session.pending_choice = result if result.items else None
+        return result
+
+    @_reading
+    def play_result(self, number):
+        """Plays a result of the last search and resolves the choice.
+
+        Args:
+            number: The number the result was listed with.
+        """
+        choice = self.session.pending_choice
+        if choice is None:
+            return VideoResult(NO_PENDING_CHOICE)
+        if not choice.offset < number <= choice.offset + len(choice.items):
+            return VideoResult(INVALID_CHOICE)
+        self.session.pending_choice = None
+        return self._play(choice.items[number - choice.offset - 1].video_id)
+
+    @_reading
+    def discard_choice(self):
+        """Forgets the pending search results, as any other command does."""
+        self.session.pending_choice = None
+
+    @_reading
+    def search_videos(self, search_term, offset=0, limit=None):
+        """Returns a page of the unflagged videos whose titles contain
+        search_term, in title order."""
+        return self._search_page(
+            self.library.search_bitmap(search_term), offset, limit)
+
+    @_reading
+    def search_videos_tag(self, video_tag, offset=0, limit=None):
+        """Returns a page of the unflagged videos with a tag, in title order."""
+        return self._search_page(self.library.tag_bitmap(video_tag), offset, limit)
+
+    @_reading
+    def search_videos_tags(self, expression, offset=0, limit=None):
+        """Returns a page of the unflagged videos matching a tag query."""
+        try:
+            bits = self.library.query_tags(expression)
+        except TagQueryError as e:
+            return ListResult(INVALID_QUERY, detail=str(e))
+        return self._search_page(bits, offset, limit)
+
+    @_writing
+    def flag_video(self, video_id, flag_reason=""):
+        """Flags a video for every session, stopping it wherever it is
+        playing. The result only reports it stopped in this session."""
+        video = self.library.get_video(video_id)
+        if video is None:
+            return VideoResult(VIDEO_NOT_FOUND)
+        if video_id in self.service.flagged:
+            return VideoResult(ALREADY_FLAGGED, video)
+        stopped = None
+        if video_id == self.session.currently_playing:
+            stopped = self._stop().video
+        self.service.flag(video_id, flag_reason)
+        return VideoResult(video=video, stopped=stopped, reason=flag_reason)
+
+    @_writing
+    def allow_video(self, video_id):
+        """Removes the flag of a video."""
+        video = self.library.get_video(video_id)
+        if video is None:
+            return VideoResult(VIDEO_NOT_FOUND)
+        if video_id not in self.service.flagged:
+            return VideoResult(NOT_FLAGGED, video)
+        self.service.allow(video_id)
+        return VideoResult(video=video)
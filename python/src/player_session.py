@@ -0,0 +1,45 @@
+"""The state of one user of a player."""
+
+
+class PlayerSession:
+    """A class used to represent the state of one user of a player."""
+
+    __slots__ = ("currently_playing", "paused", "playlists_dict", "playlists",
+                 "pending_choice", "__weakref__")
+
+    def __init__(self):
+        """The PlayerSession class is initialized."""
+        self.currently_playing = ""
+        self.paused = False
+        # Lower-cased playlist name -> video_ids, in the order added.
+        self.playlists_dict = {}
+        # The playlist names as they were created.
+        self.playlists = []
+        # The last page of search results, until one is picked with
+        # play_result or the choice is discarded.
+        self.pending_choice = None
+
+    def stop(self, video_id):
+        """Stops a video if it is the one playing, as when it is flagged."""
+        if self.currently_playing == video_id:
+            self.currently_playing = ""
+            self.paused = False
+
+    def forget_videos(self, deleted):
+        """Drops videos removed from the catalog from the session.
+
+        Args:
+            deleted: A set of the removed video_ids.
+        """
+        if self.currently_playing in deleted:
+            self.currently_playing = ""
+            self.paused = False
+        for playlist_name, video_ids in self.playlists_dict.items():
+            if not deleted.isdisjoint(video_ids):
+                self.playlists_dict[playlist_name] = [
+                    video_id for video_id in video_ids if video_id not in deleted
+                ]
+        choice = self.pending_choice
+        if choice is not None and any(
+                video.video_id in deleted for video in choice.items):
+            self.pending_choice = None
@@ -1,13 +1,43 @@
 """A youtube terminal simulator."""
+import argparse
+import sys
+
+from .video_library import VideoLibrary
 from .video_player import VideoPlayer
 from .command_parser import CommandException
 from .command_parser import CommandParser
+from .script_runner import Script, ScriptSink, run_script
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--watch", action="store_true",
+        help="pick up changes to videos.txt while running")
+    arg_parser.add_argument(
+        "--script", metavar="FILE",
+        help="run the commands in FILE instead of prompting for them, "
+             "as is done when commands are piped in")
+    args = arg_parser.parse_args()
+
+    video_library = VideoLibrary()
+    if args.watch:
+        video_library.watch()
+
+    if args.script is not None or not sys.stdin.isatty():
+        if args.script is not None:
+            with open(args.script) as script_file:
+                script = Script(script_file.read())
+        else:
+            script = Script(sys.stdin.read())
+        video_player = VideoPlayer(video_library, ScriptSink(script))
+        run_script(script, CommandParser(video_player))
+        video_library.stop_watching()
+        sys.exit(0)
+
     print("""Hello and welcome to YouTube, what would you like to do?
     Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
+    video_player = VideoPlayer(video_library)
     parser = CommandParser(video_player)
     while True:
         command = input("YT> ")
@@ -0,0 +1,75 @@
+"""Locks letting many readers or one writer in.
+
+Commands reading the catalog, such as searches and listings, take the
+read side and never wait for each other. Commands changing it, such as
+flags and reloads, take the write side and run alone. A waiting writer
+keeps new readers out, so a steady flow of searches cannot starve it.
+"""
+
+import threading
+from contextlib import contextmanager, nullcontext
+
+
+class ReadWriteLock:
+    """A class used to represent a writer-preferring reader-writer lock.
+
+    Neither side is reentrant: a thread holding the lock must not take it
+    again.
+    """
+
+    __slots__ = ("_condition", "_readers", "_writing", "_writers_waiting")
+
+    def __init__(self):
+        """The ReadWriteLock class is initialized."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        """Holds the lock shared with other readers."""
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Holds the lock alone."""
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class NullLock:
+    """A class used to represent the lock of single-threaded use, which
+    does nothing."""
+
+    __slots__ = ()
+
+    _NO_LOCK = nullcontext()
+
+    def read(self):
+        """Returns a context manager doing nothing."""
+        return self._NO_LOCK
+
+    def write(self):
+        """Returns a context manager doing nothing."""
+        return self._NO_LOCK
@@ -0,0 +1,114 @@
+"""Runs a script of player commands without user interaction.
+
+A script holds one command per line, as typed at the YT> prompt. Blank
+lines and lines starting with "#" are skipped, and EXIT ends the script.
+A search asks which result to play; the line after the search answers it
+when it reads "ANSWER <n>", or just the number as typed at the prompt,
+otherwise the answer is no. ANSWER lines no search asked for, e.g. after
+a search that found nothing, are skipped. A "PLAY_RESULT <n>" line after
+the search works as well. Scripts never block
+waiting for input.
+"""
+
+from .command_parser import CommandException
+from .output_sink import StreamSink
+
+
+def _is_answer(line):
+    """Returns whether a script line answers a search."""
+    words = line.split(maxsplit=1)
+    return bool(words) and words[0].upper() == "ANSWER"
+
+
+class Script:
+    """A class used to represent the lines of a script."""
+
+    def __init__(self, text):
+        """The Script class is initialized.
+
+        Args:
+            text: The whole script.
+        """
+        self._lines = text.splitlines()
+        self._position = 0
+
+    def __iter__(self):
+        """Yields the command lines, the answers are read by answer."""
+        lines = self._lines
+        while self._position < len(lines):
+            line = lines[self._position].strip()
+            self._position += 1
+            if line and not line.startswith("#") and not _is_answer(line):
+                yield line
+
+    def answer(self):
+        """Consumes and returns the answer on the next line, "" if none."""
+        if self._position < len(self._lines):
+            line = self._lines[self._position]
+            if line.strip().isdecimal():
+                self._position += 1
+                return line.strip()
+            if _is_answer(line):
+                self._position += 1
+                words = line.split(maxsplit=1)
+                return words[1].strip() if len(words) > 1 else ""
+        return ""
+
+
+class ScriptSink(StreamSink):
+    """A class used to represent the output of a script run.
+
+    Questions are answered from the script instead of the user, so there
+    is no need to flush before asking.
+    """
+
+    __slots__ = ("_script",)
+
+    def __init__(self, script, stream=None):
+        """The ScriptSink class is initialized.
+
+        Args:
+            script: The Script answering questions.
+            stream: The text stream to write to, sys.stdout if None.
+        """
+        super().__init__(stream)
+        self._script = script
+
+    def ask(self):
+        """Returns the answer the script gives."""
+        return self._script.answer()
+
+
+def run_script(script, parser, commands_per_write=1024):
+    """Executes the commands of a script.
+
+    Args:
+        script: The Script to run.
+        parser: The CommandParser executing the commands, writing to a
+            ScriptSink on the same script.
+        commands_per_write: How many commands to buffer the output of
+            before writing it out.
+
+    Returns:
+        The number of commands executed.
+    """
+    output = parser.output
+    count = 0
+    lines = iter(script)
+    done = False
+    while not done:
+        with output.batch():
+            for line in lines:
+                if line.upper() == "EXIT":
+                    done = True
+                    break
+                try:
+                    parser.execute_command(line.split())
+                except CommandException as e:
+                    output.write_line(e)
+                count += 1
+                if count % commands_per_write == 0:
+                    break
+            else:
+                done = True
+    return count
@@ -0,0 +1,182 @@
+"""Serves the video player to many users over TCP.
+
+    python3 -m src.server [--host HOST] [--port PORT] [--watch]
+                          [--storage STORAGE]
+
+Every connection is a session taking the commands of the YT> prompt, one
+per line, and answering each with lines of text. All sessions play from
+one CatalogService: the library, loaded once and not reloadable by
+clients, the flags and the rendered lines. The playing video, the paused
+flag and the playlists belong to the session. A search never waits for an
+answer, the result to play is picked with PLAY_RESULT instead. EXIT, or
+closing the connection, ends the session.
+
+Sessions are asyncio protocols without a task of their own, so an idle
+one costs a PlayerSession, the objects rendering it and a transport.
+"""
+
+import argparse
+import asyncio
+
+from .catalog_service import CatalogService
+from .command_parser import CommandException, CommandParser
+from .output_sink import StreamSink
+from .player_api import PlayerAPI
+from .video_library import VideoLibrary
+from .video_player import VideoPlayer
+
+# Longest command line accepted, in bytes.
+MAX_LINE = 64 * 1024
+
+WELCOME = ("Hello and welcome to YouTube, what would you like to do?\n"
+           "    Enter HELP for list of available commands or EXIT to "
+           "terminate.")
+GOODBYE = "YouTube has now terminated its execution. Thank you and goodbye!"
+
+
+class _TransportStream:
+    """A class used to represent a transport as a text stream."""
+
+    __slots__ = ("_transport",)
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def write(self, text):
+        self._transport.write(text.encode())
+
+    def flush(self):
+        pass
+
+
+class SessionSink(StreamSink):
+    """A class used to represent the output of a session.
+
+    There is nobody to ask synchronously, questions are answered "".
+    """
+
+    __slots__ = ()
+
+    def ask(self):
+        """Returns no answer."""
+        return ""
+
+
+class Session(asyncio.Protocol):
+    """A class used to represent the connection of one user."""
+
+    __slots__ = ("_service", "_transport", "_parser", "_pending")
+
+    def __init__(self, service):
+        """The Session class is initialized.
+
+        Args:
+            service: The CatalogService shared by all sessions.
+        """
+        self._service = service
+        self._transport = None
+        self._parser = None
+        # The bytes received after the last complete line.
+        self._pending = b""
+
+    def connection_made(self, transport):
+        self._transport = transport
+        output = SessionSink(_TransportStream(transport))
+        player = VideoPlayer(output=output, api=PlayerAPI(service=self._service),
+                             prompt_choice=False)
+        self._parser = CommandParser(player)
+        output.write_line(WELCOME)
+        output.flush()
+
+    def data_received(self, data):
+        lines = (self._pending + data).split(b"\n")
+        self._pending = lines.pop()
+        if len(self._pending) > MAX_LINE:
+            self._transport.close()
+            return
+        output = self._parser.output
+        done = False
+        with output.batch():
+            for line in lines:
+                command = line.decode(errors="replace").split()
+                if command and command[0].upper() == "EXIT":
+                    output.write_line(GOODBYE)
+                    done = True
+                    break
+                try:
+                    self._parser.execute_command(command)
+                except CommandException as e:
+                    output.write_line(e)
+        if done:
+            self._transport.close()
+
+    def eof_received(self):
+        self._transport.close()
+
+    def pause_writing(self):
+        # The client is not reading its answers, stop reading commands.
+        self._transport.pause_reading()
+
+    def resume_writing(self):
+        self._transport.resume_reading()
+
+    def connection_lost(self, exc):
+        if self._parser is not None:
+            self._parser.player.close()
+            self._parser = None
+        self._transport = None
+
+
+async def serve(service, host="127.0.0.1", port=8023):
+    """Starts accepting sessions.
+
+    Args:
+        service: The CatalogService all sessions play from, usually not
+            reloadable.
+        host: The address to listen on.
+        port: The port to listen on, 0 for any free one.
+
+    Returns:
+        The asyncio Server.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(
+        lambda: Session(service), host, port, backlog=1024)
+
+
+async def _serve_forever(video_library, host, port):
+    service = CatalogService(video_library, reloadable=False)
+    server = await serve(service, host, port)
+    for socket in server.sockets:
+        print("Serving on {}:{}".format(*socket.getsockname()[:2]))
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8023)
+    arg_parser.add_argument(
+        "--watch", action="store_true",
+        help="pick up changes to videos.txt while running")
+    arg_parser.add_argument(
+        "--storage", default="memory",
+        choices=("memory", "columnar", "mmap", "sqlite", "shared"),
+        help="how the catalog is held, \"shared\" reads the one published "
+             "by python3 -m src.shared_catalog")
+    args = arg_parser.parse_args()
+    if args.watch and args.storage not in ("memory", "sqlite"):
+        arg_parser.error(
+            f"--watch needs a storage that can be reloaded, memory or "
+            f"sqlite, not {args.storage}")
+
+    video_library = VideoLibrary(storage=args.storage)
+    if args.watch:
+        video_library.watch()
+    try:
+        asyncio.run(_serve_forever(video_library, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        video_library.stop_watching()
@@ -0,0 +1,185 @@
+"""A catalog published in shared memory for worker processes.
+
+One loader process parses the catalog once and publishes it, in the flat
+columnar layout of catalog_snapshot, as a block of shared memory named
+after the catalog file. Workers open
+
+    VideoLibrary(videos_path, storage="shared")
+
+and read titles, ids and tags straight out of that block, so the catalog
+is held once however many workers there are. Reading it creates no Python
+objects inside the block, so no reference count is ever written to its
+pages and they stay shared. The title search index and the title order
+are published in the block as well, after the snapshot (see
+packed_title_index); only the tag index is built by each worker.
+
+Publish the default catalog until interrupted with:
+
+    python3 -m src.shared_catalog [path/to/videos.txt]
+
+Shared memory needs Python 3.8 or later.
+"""
+
+import argparse
+import hashlib
+import os
+import signal
+from pathlib import Path
+
+from . import catalog_snapshot, packed_title_index
+
+
+def _index_start(snapshot_size):
+    """Returns where the title index follows a snapshot, aligned for its
+    uint32 columns."""
+    return (snapshot_size + 3) // 4 * 4
+
+
+def shared_name(videos_path):
+    """Returns the shared memory name a catalog is published under."""
+    digest = hashlib.sha1(str(Path(videos_path).resolve()).encode()).hexdigest()
+    # Short enough for the 31 character limit of some platforms.
+    return f"ytcat_{digest[:16]}"
+
+
+def _attach(name):
+    """Opens existing shared memory without leaving it to the resource
+    tracker, which would otherwise unlink it when this process exits."""
+    import multiprocessing
+    from multiprocessing import resource_tracker, shared_memory
+
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:  # Before Python 3.13 there is no track argument.
+        memory = shared_memory.SharedMemory(name)
+        # Processes started by multiprocessing share the tracker of their
+        # parent, which may be the loader, so only a process with its own
+        # tracker takes the name back.
+        if multiprocessing.parent_process() is None:
+            resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
+
+
+class SharedCatalog:
+    """A class used to represent the published copy of a catalog.
+
+    It is owned by the loader, which unlinks it when closed. Workers that
+    are attached keep their mapping until they close their library.
+    """
+
+    def __init__(self, videos_path):
+        """The SharedCatalog class is initialized and the catalog published.
+
+        A block left behind by a loader that did not close it is replaced.
+
+        Args:
+            videos_path: The text catalog to publish. Its compiled snapshot
+                is read instead when it is up to date.
+        """
+        from multiprocessing import shared_memory
+        from .video_library import read_text_rows
+
+        rows = catalog_snapshot.read_rows(videos_path)
+        if rows is None:
+            rows = read_text_rows(videos_path)
+        rows = catalog_snapshot.deduplicate(rows)
+        snapshot = catalog_snapshot.pack(rows, os.stat(videos_path))
+        title_index = packed_title_index.pack(rows)
+        index_start = _index_start(len(snapshot))
+        size = index_start + len(title_index)
+        self.name = shared_name(videos_path)
+        try:
+            self._memory = shared_memory.SharedMemory(
+                self.name, create=True, size=size)
+        except FileExistsError:
+            stale = _attach(self.name)
+            stale.close()
+            stale.unlink()
+            self._memory = shared_memory.SharedMemory(
+                self.name, create=True, size=size)
+        self._memory.buf[:len(snapshot)] = snapshot
+        self._memory.buf[index_start:size] = title_index
+        self.nbytes = size
+
+    def close(self):
+        """Withdraws the catalog, new workers can no longer attach."""
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _Attachment:
+    """A class used to represent a worker's mapping of a shared catalog."""
+
+    __slots__ = ("_memory", "_title_index")
+
+    def __init__(self, memory, title_index):
+        self._memory = memory
+        self._title_index = title_index
+
+    def close(self):
+        self._title_index.close()
+        self._memory.close()
+
+
+def attach(videos_path, cache_size=1024):
+    """Opens the published copy of a catalog, read-only.
+
+    Args:
+        videos_path: The text catalog the copy must be up to date with.
+        cache_size: How many Video objects the store keeps cached.
+
+    Returns:
+        A ColumnarStore over the shared memory, searching with the shared
+        title index, or None if the catalog is not published or the copy
+        is stale.
+    """
+    from .video_store import ColumnarStore
+
+    try:
+        source_stat = os.stat(videos_path)
+        memory = _attach(shared_name(videos_path))
+    except (OSError, ImportError):
+        return None
+    view = memory.buf.toreadonly()
+    size = catalog_snapshot.snapshot_size(view)
+    snapshot = None
+    if size is not None and _index_start(size) < len(view):
+        title_index = packed_title_index.PackedTitleIndex(
+            view[_index_start(size):], owner=memory)
+        snapshot = catalog_snapshot.open_buffer(
+            view, source_stat, closer=_Attachment(memory, title_index))
+        if snapshot is None:
+            title_index.close()
+    if snapshot is None:
+        view.release()
+        memory.close()
+        return None
+    return ColumnarStore(snapshot, cache_size, title_index)
+
+
+def main(argv=None):
+    """Publishes a catalog until interrupted."""
+    from .video_library import DEFAULT_VIDEOS_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("videos_path", nargs="?", default=DEFAULT_VIDEOS_PATH)
+    args = parser.parse_args(argv)
+    with SharedCatalog(args.videos_path) as catalog:
+        print(f"Published {args.videos_path} as {catalog.name} "
+              f"({catalog.nbytes} bytes), interrupt to withdraw it")
+        try:
+            signal.pause()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
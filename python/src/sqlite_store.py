@@ -0,0 +1,324 @@
+"""A VideoLibrary store backed by a local SQLite database.
+
+The database is built from videos.txt next to it and rebuilt when the text
+catalog changes. Ordinals are the rowids of the videos table, which are
+AUTOINCREMENT so that a deleted video's ordinal is never reused. Titles are
+indexed with an FTS5 trigram table when SQLite supports it, tags with a
+join table indexed by tag, so neither the videos nor the indexes have to
+fit in memory.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+from .bitmap import from_positions
+from .video import Video
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE videos (
+    rowid INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL
+);
+CREATE INDEX videos_by_title ON videos (title);
+CREATE TABLE tags (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE video_tags (
+    video INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    tag INTEGER NOT NULL,
+    PRIMARY KEY (video, position)
+) WITHOUT ROWID;
+CREATE INDEX video_tags_by_tag ON video_tags (tag, video);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE videos_fts USING fts5(
+    title, content='videos', content_rowid='rowid', tokenize='trigram');
+INSERT INTO videos_fts (videos_fts) VALUES ('rebuild');
+CREATE TRIGGER videos_fts_insert AFTER INSERT ON videos BEGIN
+    INSERT INTO videos_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+CREATE TRIGGER videos_fts_delete AFTER DELETE ON videos BEGIN
+    INSERT INTO videos_fts (videos_fts, rowid, title)
+    VALUES ('delete', old.rowid, old.title);
+END;
+CREATE TRIGGER videos_fts_update AFTER UPDATE ON videos BEGIN
+    INSERT INTO videos_fts (videos_fts, rowid, title)
+    VALUES ('delete', old.rowid, old.title);
+    INSERT INTO videos_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+"""
+
+
+def database_path(source_path):
+    """Returns the database path used for a text catalog."""
+    return Path(source_path).with_suffix(".sqlite3")
+
+
+def _source_state(source_path):
+    stat = os.stat(source_path)
+    return {"version": SCHEMA_VERSION, "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns}
+
+
+def open_database(source_path, rows, path=None):
+    """Opens the database of a text catalog, building it when needed.
+
+    Args:
+        source_path: The text catalog the database must be up to date with.
+        rows: A callable returning the catalog rows, only called when the
+            database is missing or stale. The rows are streamed into the
+            database, so a generator keeps the import in constant memory.
+        path: The database file, defaults to database_path.
+
+    Returns:
+        An open sqlite3.Connection.
+    """
+    path = Path(path or database_path(source_path))
+    state = _source_state(source_path)
+    if path.exists():
+        connection = sqlite3.connect(path, check_same_thread=False)
+        try:
+            stored = dict(connection.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            stored = None
+        if stored == state:
+            return connection
+        connection.close()
+        path.unlink()
+
+    temp_path = path.with_name(path.name + ".tmp")
+    if temp_path.exists():
+        temp_path.unlink()
+    connection = sqlite3.connect(temp_path)
+    # The file only replaces the database once complete, a crash while
+    # importing just leaves a temporary file to start over from.
+    connection.execute("PRAGMA synchronous = OFF")
+    connection.executescript(_SCHEMA)
+    with connection:
+        store = SqliteStore(connection)
+        for row in rows():
+            store.upsert(row)
+        try:
+            connection.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            pass  # No FTS5 or no trigram tokenizer, titles are scanned.
+        connection.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)", state.items())
+    connection.close()
+    os.replace(temp_path, path)
+    # Players serving commands from a thread pool share the connection,
+    # SQLite serializes the calls itself.
+    return sqlite3.connect(path, check_same_thread=False)
+
+
+class SqliteStore:
+    """A class used to represent a store reading videos from SQLite."""
+
+    def __init__(self, connection):
+        """The SqliteStore class is initialized.
+
+        Args:
+            connection: A sqlite3.Connection to a database made by
+                open_database.
+        """
+        self._connection = connection
+        self._tag_ids = dict(
+            (name, tag_id)
+            for tag_id, name in connection.execute("SELECT id, name FROM tags"))
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def ordinals(self):
+        return (
+            row[0] for row in
+            self._connection.execute("SELECT rowid FROM videos ORDER BY rowid"))
+
+    def live_bitmap(self):
+        return from_positions(self.ordinals())
+
+    def ordinals_by_title(self):
+        """Returns the ordinals in title order, read from the title index."""
+        return (
+            row[0] for row in
+            self._connection.execute("SELECT rowid FROM videos ORDER BY title, rowid"))
+
+    def ordinal(self, video_id):
+        row = self._connection.execute(
+            "SELECT rowid FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def video(self, ordinal):
+        video_id, title = self._connection.execute(
+            "SELECT video_id, title FROM videos WHERE rowid = ?",
+            (ordinal,)).fetchone()
+        return Video(title, video_id, self.tags(ordinal))
+
+    def video_id(self, ordinal):
+        return self._connection.execute(
+            "SELECT video_id FROM videos WHERE rowid = ?", (ordinal,)).fetchone()[0]
+
+    def title(self, ordinal):
+        return self._connection.execute(
+            "SELECT title FROM videos WHERE rowid = ?", (ordinal,)).fetchone()[0]
+
+    def tags(self, ordinal):
+        return tuple(
+            row[0] for row in self._connection.execute(
+                "SELECT tags.name FROM video_tags JOIN tags ON tags.id = video_tags.tag"
+                " WHERE video_tags.video = ? ORDER BY video_tags.position",
+                (ordinal,)))
+
+    def _tag_id(self, name):
+        tag_id = self._tag_ids.get(name)
+        if tag_id is None:
+            tag_id = self._connection.execute(
+                "INSERT INTO tags (name) VALUES (?)", (name,)).lastrowid
+            self._tag_ids[name] = tag_id
+        return tag_id
+
+    def _write_tags(self, ordinal, tags):
+        self._connection.executemany(
+            "INSERT INTO video_tags (video, position, tag) VALUES (?, ?, ?)",
+            [(ordinal, position, self._tag_id(tag))
+             for position, tag in enumerate(tags)])
+
+    def _insert(self, row):
+        title, video_id, tags = row
+        ordinal = self._connection.execute(
+            "INSERT INTO videos (video_id, title) VALUES (?, ?)",
+            (video_id, title)).lastrowid
+        self._write_tags(ordinal, tags)
+        return ordinal
+
+    def _update(self, ordinal, row):
+        title, _, tags = row
+        self._connection.execute(
+            "UPDATE videos SET title = ? WHERE rowid = ?", (title, ordinal))
+        self._connection.execute(
+            "DELETE FROM video_tags WHERE video = ?", (ordinal,))
+        self._write_tags(ordinal, tags)
+
+    def upsert(self, row):
+        """Adds or replaces a video without committing, as imports do.
+
+        A video_id seen before keeps its ordinal and takes the new title
+        and tags, the same rule as catalog_snapshot.deduplicate.
+        """
+        ordinal = self.ordinal(row[1])
+        if ordinal is None:
+            return self._insert(row)
+        self._update(ordinal, row)
+        return ordinal
+
+    def insert(self, row):
+        """Adds a video and returns its ordinal.
+
+        Args:
+            row: A (title, video_id, tags) tuple for a new video_id.
+        """
+        with self._connection:
+            return self._insert(row)
+
+    def update(self, ordinal, row):
+        """Replaces the title and tags of the video with ordinal."""
+        with self._connection:
+            self._update(ordinal, row)
+
+    def delete(self, ordinal):
+        """Removes the video with ordinal."""
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM video_tags WHERE video = ?", (ordinal,))
+            self._connection.execute(
+                "DELETE FROM videos WHERE rowid = ?", (ordinal,))
+
+    def title_index(self):
+        """Returns the title index kept by the database."""
+        return SqliteTitleIndex(self._connection)
+
+    def tag_index(self):
+        """Returns the tag index kept by the database."""
+        return SqliteTagIndex(self._connection, self._tag_ids)
+
+    def close(self):
+        """Closes the database connection."""
+        self._connection.close()
+
+
+class SqliteTitleIndex:
+    """A class used to represent title search over the database.
+
+    Matching is the same as TitleIndex: a title matches when its lowercased
+    text contains the lowercased term. FTS5 trigram matches are only used
+    to find candidates for ASCII terms of three characters or more, every
+    candidate is checked in Python. Other terms scan the titles.
+    """
+
+    def __init__(self, connection):
+        """The SqliteTitleIndex class is initialized."""
+        self._connection = connection
+        self._has_fts = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'videos_fts'").fetchone() is not None
+
+    def add(self, ordinal, title):
+        """Does nothing, the database keeps its tables up to date."""
+
+    def remove(self, ordinal):
+        """Does nothing, the database keeps its tables up to date."""
+
+    def search(self, search_term):
+        """Returns the ordinals of all titles containing search_term."""
+        search_term = search_term.lower()
+        if self._has_fts and len(search_term) >= 3 and search_term.isascii():
+            rows = self._connection.execute(
+                "SELECT rowid, title FROM videos_fts WHERE videos_fts MATCH ?"
+                " ORDER BY rowid",
+                ('"' + search_term.replace('"', '""') + '"',))
+        else:
+            rows = self._connection.execute(
+                "SELECT rowid, title FROM videos ORDER BY rowid")
+        return [ordinal for ordinal, title in rows if search_term in title.lower()]
+
+
+class SqliteTagIndex:
+    """A class used to represent tag lookups over the database."""
+
+    def __init__(self, connection, tag_ids):
+        """The SqliteTagIndex class is initialized.
+
+        Args:
+            connection: The database connection.
+            tag_ids: The name to id mapping of the tags, shared with the
+                store so new tags show up here.
+        """
+        self._connection = connection
+        self._tag_ids = tag_ids
+
+    def add(self, ordinal, tags):
+        """Does nothing, the database keeps its tables up to date."""
+
+    def remove(self, ordinal, tags):
+        """Does nothing, the database keeps its tables up to date."""
+
+    def bitmap(self, tag):
+        """Returns the bitmap of the videos carrying tag."""
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            return 0
+        return from_positions(
+            row[0] for row in self._connection.execute(
+                "SELECT video FROM video_tags WHERE tag = ?", (tag_id,)))
+
+    def count(self, tag):
+        """Returns the number of videos carrying tag."""
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            return 0
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM video_tags WHERE tag = ?", (tag_id,)).fetchone()[0]
@@ -0,0 +1,67 @@
+"""A video tag index class."""
+
+from .bitmap import from_positions
+
+
+class TagIndex:
+    """A class used to represent an inverted index from tags to videos.
+
+    Each tag maps to a bitmap over video ordinals. Added ordinals are
+    collected per tag and folded into the bitmaps on the next lookup.
+    """
+
+    def __init__(self):
+        """The TagIndex class is initialized."""
+        self._bitmaps = {}
+        self._counts = {}
+        self._pending = {}
+
+    def add(self, ordinal, tags):
+        """Indexes the tags of the video with the given ordinal.
+
+        Args:
+            ordinal: The dense ordinal of the video.
+            tags: The tags of the video.
+        """
+        for tag in set(tags):
+            self._pending.setdefault(tag, []).append(ordinal)
+            self._counts[tag] = self._counts.get(tag, 0) + 1
+
+    def remove(self, ordinal, tags):
+        """Removes the tags of the video with the given ordinal.
+
+        Args:
+            ordinal: The dense ordinal of the video.
+            tags: The tags the video was indexed with.
+        """
+        if self._pending:
+            self._merge_pending()
+        mask = ~(1 << ordinal)
+        for tag in set(tags):
+            bits = self._bitmaps[tag] & mask
+            if bits:
+                self._bitmaps[tag] = bits
+                self._counts[tag] -= 1
+            else:
+                del self._bitmaps[tag]
+                del self._counts[tag]
+
+    def bitmap(self, tag):
+        """Returns the bitmap of the videos carrying tag, 0 if there are none.
+
+        Args:
+            tag: The tag, matched exactly.
+        """
+        if self._pending:
+            self._merge_pending()
+        return self._bitmaps.get(tag, 0)
+
+    def count(self, tag):
+        """Returns the number of videos carrying tag."""
+        return self._counts.get(tag, 0)
+
+    def _merge_pending(self):
+        """Folds the pending ordinals of every tag into its bitmap."""
+        for tag, ordinals in self._pending.items():
+            self._bitmaps[tag] = self._bitmaps.get(tag, 0) | from_positions(ordinals)
+        self._pending = {}
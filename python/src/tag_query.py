@@ -0,0 +1,139 @@
+"""A boolean tag query parser and evaluator.
+
+Expressions combine tags with AND, OR, NOT and parentheses, e.g.
+``#cat AND #animal NOT #career``. Terms written next to each other are
+ANDed, so a NOT following a term reads as "and not". AND binds tighter
+than OR and keywords are case insensitive.
+"""
+
+import re
+
+_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+_KEYWORDS = ("AND", "OR", "NOT")
+
+
+class TagQueryError(Exception):
+    """A class used to represent a malformed tag query."""
+    pass
+
+
+def parse(expression):
+    """Parses a tag query into a tree of nested tuples.
+
+    Nodes are ("tag", name), ("not", node), ("and", [nodes]) and
+    ("or", [nodes]).
+
+    Args:
+        expression: The query text.
+
+    Raises:
+        TagQueryError: The expression is empty or malformed.
+    """
+    tokens = _TOKEN.findall(expression)
+    if not tokens:
+        raise TagQueryError("Query is empty")
+    parser = _Parser(tokens)
+    node = parser.parse_or()
+    if parser.position != len(tokens):
+        raise TagQueryError(f"Unexpected '{tokens[parser.position]}'")
+    return node
+
+
+class _Parser:
+    """A recursive descent parser over a list of tokens."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            token = self.tokens[self.position]
+            return token.upper() if token.upper() in _KEYWORDS else token
+        return None
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self._peek() == "OR":
+            self.position += 1
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_unary()]
+        while self._peek() not in (None, "OR", ")"):
+            if self._peek() == "AND":
+                self.position += 1
+            nodes.append(self.parse_unary())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_unary(self):
+        token = self._peek()
+        if token is None:
+            raise TagQueryError("Query ends unexpectedly")
+        self.position += 1
+        if token == "NOT":
+            return ("not", self.parse_unary())
+        if token == "(":
+            node = self.parse_or()
+            if self._peek() != ")":
+                raise TagQueryError("Missing ')'")
+            self.position += 1
+            return node
+        if token in _KEYWORDS or token == ")":
+            raise TagQueryError(f"Unexpected '{token}'")
+        return ("tag", token)
+
+
+def evaluate(node, tag_index, universe):
+    """Evaluates a parsed query against a tag index.
+
+    AND operands run from the most selective to the least selective one
+    and stop as soon as the intermediate result is empty. Negated operands
+    are subtracted last, so NOT only needs the universe when a conjunction
+    has no positive operand at all.
+
+    Args:
+        node: A tree returned by parse.
+        tag_index: The TagIndex to read tag bitmaps and counts from.
+        universe: The bitmap of all videos in the library.
+
+    Returns:
+        The bitmap of the matching videos.
+    """
+    kind = node[0]
+    if kind == "tag":
+        return tag_index.bitmap(node[1])
+    if kind == "or":
+        bits = 0
+        for child in node[1]:
+            bits |= evaluate(child, tag_index, universe)
+        return bits
+    if kind == "not":
+        return universe & ~evaluate(node[1], tag_index, universe)
+
+    positives = [child for child in node[1] if child[0] != "not"]
+    negatives = [child[1] for child in node[1] if child[0] == "not"]
+    positives.sort(key=lambda child: _estimate(child, tag_index, universe))
+    bits = evaluate(positives[0], tag_index, universe) if positives else universe
+    for child in positives[1:]:
+        if not bits:
+            return 0
+        bits &= evaluate(child, tag_index, universe)
+    for child in negatives:
+        bits &= ~evaluate(child, tag_index, universe)
+        if not bits:
+            return 0
+    return bits
+
+
+def _estimate(node, tag_index, universe):
+    """Returns an upper bound on the number of videos a node matches."""
+    kind = node[0]
+    if kind == "tag":
+        return tag_index.count(node[1])
+    if kind == "or":
+        return sum(_estimate(child, tag_index, universe) for child in node[1])
+    if kind == "and":
+        return min(_estimate(child, tag_index, universe) for child in node[1])
+    return universe.bit_length()
@@ -0,0 +1,93 @@
+"""A title trigram index class."""
+
+from array import array
+from bisect import bisect_left, insort
+
+# Length of the n-grams kept in the index. Search terms shorter than this
+# cannot be looked up and fall back to a scan over the lowered titles.
+GRAM_SIZE = 3
+
+
+def _grams(text):
+    """Returns the set of distinct n-grams contained in text."""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class TitleIndex:
+    """A class used to represent an inverted trigram index over titles.
+
+    Titles are indexed lowercased, every posting list holds the ordinals of
+    the videos containing that trigram in ascending order.
+    """
+
+    def __init__(self):
+        """The TitleIndex class is initialized."""
+        self._titles = []
+        self._postings = {}
+
+    def add(self, ordinal, title):
+        """Indexes a title under the given video ordinal.
+
+        Adding ordinals in increasing order, as when the index is built,
+        only appends to the posting lists.
+
+        Args:
+            ordinal: The dense ordinal of the video, not indexed yet.
+            title: The title of the video.
+        """
+        title = title.lower()
+        if ordinal >= len(self._titles):
+            self._titles.extend([None] * (ordinal + 1 - len(self._titles)))
+        self._titles[ordinal] = title
+        for gram in _grams(title):
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            if not postings or postings[-1] < ordinal:
+                postings.append(ordinal)
+            else:
+                insort(postings, ordinal)
+
+    def remove(self, ordinal):
+        """Removes the title indexed under the given video ordinal."""
+        title = self._titles[ordinal]
+        self._titles[ordinal] = None
+        for gram in _grams(title):
+            postings = self._postings[gram]
+            del postings[bisect_left(postings, ordinal)]
+            if not postings:
+                del self._postings[gram]
+
+    def search(self, search_term):
+        """Returns the ordinals of all titles containing search_term.
+
+        Args:
+            search_term: The query, matched case-insensitively.
+
+        Returns:
+            A list of ordinals in ascending order.
+        """
+        search_term = search_term.lower()
+        titles = self._titles
+        if len(search_term) < GRAM_SIZE:
+            return [
+                i for i, title in enumerate(titles)
+                if title is not None and search_term in title
+            ]
+
+        postings = []
+        for gram in _grams(search_term):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        # Intersect the rarest lists first, then verify the survivors since
+        # sharing every trigram does not imply containing the whole term.
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return [i for i in sorted(candidates) if search_term in titles[i]]
@@ -0,0 +1,90 @@
+"""A title-ordered index over video ordinals."""
+
+from array import array
+from itertools import islice
+
+from .bitmap import from_positions, iter_bits
+
+
+class TitleOrder:
+    """A class used to represent the videos of a library sorted by title.
+
+    Videos with equal titles keep library order, as a stable sort of the
+    library by title would. Besides the sorted ordinals the index keeps
+    the rank of every ordinal, so a subset of the videos can be put in
+    title order by going through a bitmap over ranks instead of sorting.
+    """
+
+    def __init__(self, ordinals, title, presorted=False, ranks=None):
+        """The TitleOrder class is initialized.
+
+        Args:
+            ordinals: The ordinals of the videos in ascending order.
+            title: A callable returning the title of an ordinal.
+            presorted: Whether ordinals are in title order already.
+            ranks: The rank of every ordinal, for presorted ordinals. Both
+                are then used as given, e.g. columns of a shared buffer,
+                and the order can no longer be changed.
+        """
+        if ranks is not None:
+            self._order = ordinals
+        else:
+            if not presorted:
+                ordinals = sorted(ordinals, key=title)
+            self._order = array("I", ordinals)
+        # Rebuilt on demand after videos are added or removed.
+        self._ranks = ranks
+        # Set last so that the columns go first when the order is dropped,
+        # title may be what keeps the buffer under them alive.
+        self._title = title
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, index):
+        """Returns the ordinal at a title order position, or a slice."""
+        return self._order[index]
+
+    def _position(self, title, ordinal):
+        """Returns where (title, ordinal) belongs in the order."""
+        low, high = 0, len(self._order)
+        while low < high:
+            middle = (low + high) // 2
+            other = self._order[middle]
+            other_title = self._title(other)
+            if other_title < title or (other_title == title and other < ordinal):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def add(self, ordinal, title):
+        """Inserts a video at its place in title order."""
+        self._order.insert(self._position(title, ordinal), ordinal)
+        self._ranks = None
+
+    def remove(self, ordinal, title):
+        """Removes a video, given the title it was added with."""
+        del self._order[self._position(title, ordinal)]
+        self._ranks = None
+
+    def _get_ranks(self):
+        if self._ranks is None:
+            ranks = array("I", bytes(4 * (max(self._order, default=0) + 1)))
+            for rank, ordinal in enumerate(self._order):
+                ranks[ordinal] = rank
+            self._ranks = ranks
+        return self._ranks
+
+    def select(self, bits, start=0, stop=None):
+        """Returns the ordinals set in a bitmap, in title order.
+
+        Args:
+            bits: A bitmap over ordinals of videos in the index.
+            start: How many of the ordinals in title order to skip.
+            stop: Where to stop in title order, the end if None.
+        """
+        ranks = self._get_ranks()
+        order = self._order
+        ranked = from_positions(ranks[o] for o in iter_bits(bits))
+        return [order[rank] for rank in islice(iter_bits(ranked), start, stop)]
@@ -1,11 +1,16 @@
 """A video class."""
 
+import sys
 from typing import Sequence
 
 
 class Video:
     """A class used to represent a Video."""
 
+    # Catalogs hold many videos: slots drop the per-instance __dict__, and
+    # tags are interned since the same few tags repeat across the catalog.
+    __slots__ = ("_title", "_video_id", "_tags")
+
     def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str]):
         """Video constructor."""
         self._title = video_title
@@ -13,7 +18,7 @@ class Video:
 
         # Turn the tags into a tuple here so it's unmodifiable,
         # in case the caller changes the 'video_tags' they passed to us
-        self._tags = tuple(video_tags)
+        self._tags = tuple(sys.intern(tag) for tag in video_tags)
 
     @property
     def title(self) -> str:
@@ -1,8 +1,18 @@
 """A video library class."""
 
-from .video import Video
+from . import catalog_snapshot
+from . import tag_query
+from .bitmap import from_positions, iter_bits
+from .tag_index import TagIndex
+from .title_index import TitleIndex
+from .title_order import TitleOrder
+from .video_store import ColumnarStore, MemoryStore
 from pathlib import Path
 import csv
+import weakref
+
+
+DEFAULT_VIDEOS_PATH = Path(__file__).parent / "videos.txt"
 
 
 # Helper Wrapper around CSV reader to strip whitespace from around
@@ -11,25 +21,167 @@ def _csv_reader_with_strip(reader):
     yield from ((item.strip() for item in line) for line in reader)
 
 
+def parse_text_rows(lines):
+    """Yields the rows parsed from the lines of a text catalog.
+
+    Args:
+        lines: An iterable of videos.txt style lines.
+
+    Yields:
+        (title, video_id, tags) tuples in file order.
+    """
+    reader = _csv_reader_with_strip(csv.reader(lines, delimiter="|"))
+    for video_info in reader:
+        title, url, tags = video_info
+        yield title, url, [tag.strip() for tag in tags.split(",")] if tags else []
+
+
+def read_text_rows(videos_path):
+    """Yields the rows of a text catalog.
+
+    Args:
+        videos_path: The path of a videos.txt style file.
+
+    Yields:
+        (title, video_id, tags) tuples in file order.
+    """
+    with open(videos_path) as video_file:
+        yield from parse_text_rows(video_file)
+
+
+def _read_text(videos_path, workers, pause_gc=False):
+    """Returns the rows of a text catalog, parsed by workers processes.
+
+    The garbage collector is only paused when pause_gc is true, for the
+    first load: reloads run alongside threads serving commands.
+    """
+    if workers == 1:
+        from .bytes_parser import read_rows_fast
+
+        return read_rows_fast(videos_path, pause_gc=pause_gc)
+    from .parallel_loader import read_rows_parallel
+
+    return read_rows_parallel(videos_path, workers, pause_gc=pause_gc)
+
+
+def _load_rows(videos_path, workers, pause_gc=False):
+    """Returns the rows of a catalog, from its snapshot when up to date."""
+    rows = catalog_snapshot.read_rows(videos_path)
+    if rows is None:
+        rows = _read_text(videos_path, workers, pause_gc)
+    return rows
+
+
+class CatalogDelta:
+    """A class used to represent the changes between two catalog versions."""
+
+    __slots__ = ("inserted", "updated", "deleted")
+
+    def __init__(self, inserted=(), updated=(), deleted=()):
+        """The CatalogDelta class is initialized.
+
+        Args:
+            inserted: (title, video_id, tags) rows of the new videos.
+            updated: (title, video_id, tags) rows of the changed videos.
+            deleted: The ids of the removed videos.
+        """
+        self.inserted = list(inserted)
+        self.updated = list(updated)
+        self.deleted = list(deleted)
+
+    def __len__(self):
+        """Returns the number of changed videos."""
+        return len(self.inserted) + len(self.updated) + len(self.deleted)
+
+
 class VideoLibrary:
     """A class used to represent a Video Library."""
 
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
-        self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+    def __init__(self, videos_path=DEFAULT_VIDEOS_PATH, storage="memory",
+                 cache_size=1024, workers=1):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            videos_path: The text catalog to load. Its compiled snapshot is
+                read instead when it is up to date.
+            storage: How the videos are held:
+                "memory" builds a Video object for every row up front.
+                "columnar" keeps titles, ids and tags in flat in-memory
+                columns and builds Video objects on demand.
+                "mmap" is like "columnar" but leaves the columns in the
+                memory-mapped snapshot. It falls back to "memory" when
+                there is no up to date snapshot.
+                "sqlite" reads the videos from a SQLite database next to
+                the catalog, built when missing or stale, and searches
+                through its indexes. Little beyond what a session touches
+                is held in memory.
+                "shared" is like "mmap" but reads the columns from the
+                shared memory a loader published the catalog in, see
+                shared_catalog. It falls back to "memory" when the catalog
+                is not published or the published copy is stale.
+            cache_size: How many Video objects the "columnar", "mmap" and
+                "shared" storages cache.
+            workers: How many processes parse the text catalog when there
+                is no up to date snapshot, None for one per core.
+        """
+        self._store = None
+        if storage == "mmap":
+            snapshot = catalog_snapshot.open_snapshot(videos_path, use_mmap=True)
+            if snapshot is not None:
+                self._store = ColumnarStore(snapshot, cache_size)
+        elif storage == "columnar":
+            snapshot = catalog_snapshot.open_snapshot(videos_path)
+            if snapshot is None:
+                snapshot = catalog_snapshot.Snapshot(
+                    catalog_snapshot.pack(
+                        _read_text(videos_path, workers, pause_gc=True)))
+            self._store = ColumnarStore(snapshot, cache_size)
+        elif storage == "shared":
+            from .shared_catalog import attach
+
+            self._store = attach(videos_path, cache_size)
+        elif storage == "sqlite":
+            from .sqlite_store import SqliteStore, open_database
+
+            self._store = SqliteStore(open_database(
+                videos_path, lambda: read_text_rows(videos_path)))
+        elif storage != "memory":
+            raise ValueError(f"Unknown storage: {storage}")
+        if self._store is None:
+            from .bytes_parser import paused_gc
+
+            # Building the videos allocates as much as parsing them does.
+            with paused_gc():
+                self._store = MemoryStore(_load_rows(videos_path, workers))
+        self._videos_path = videos_path
+        self._workers = workers
+        # Weak reference, or the callback itself -> callable returning the
+        # callback, in registration order.
+        self._listeners = {}
+        self._pending_rows = None
+        self._watcher = None
+
+        # The indexes refer to videos by their ordinals in the store and are
+        # built on first use, a session that never searches never pays
+        # for them. Stores keeping indexes of their own hand those out.
+        self._title_index = None
+        self._tag_index = None
+        self._title_order = None
+
+    def __len__(self):
+        """Returns the number of videos in the library."""
+        return len(self._store)
+
+    def close(self):
+        """Releases the storage of the library, if it holds any."""
+        close = getattr(self._store, "close", None)
+        if close is not None:
+            close()
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
-        return list(self._videos.values())
+        store = self._store
+        return [store.video(ordinal) for ordinal in store.ordinals()]
 
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
@@ -41,4 +193,295 @@ class VideoLibrary:
             The Video object for the requested video_id. None if the video
             does not exist.
         """
-        return self._videos.get(video_id, None)
+        ordinal = self._store.ordinal(video_id)
+        return None if ordinal is None else self._store.video(ordinal)
+
+    def video_ids(self):
+        """Returns the ids of all videos in library order."""
+        store = self._store
+        return [store.video_id(ordinal) for ordinal in store.ordinals()]
+
+    def ordinal(self, video_id):
+        """Returns the dense ordinal of a video, None if it does not exist.
+
+        Args:
+            video_id: The video url.
+        """
+        return self._store.ordinal(video_id)
+
+    def video_id(self, ordinal):
+        """Returns the id of the video with the given ordinal."""
+        return self._store.video_id(ordinal)
+
+    def tag_bitmap(self, video_tag):
+        """Returns the bitmap over ordinals of the videos carrying a tag.
+
+        Args:
+            video_tag: The tag, matched exactly.
+        """
+        return self._get_tag_index().bitmap(video_tag)
+
+    def query_tags(self, expression):
+        """Returns the bitmap of the videos matching a boolean tag query.
+
+        Args:
+            expression: Tags combined with AND, OR, NOT and parentheses,
+                e.g. "#cat AND #animal NOT #career".
+
+        Raises:
+            TagQueryError: The expression is malformed.
+        """
+        return tag_query.evaluate(
+            tag_query.parse(expression), self._get_tag_index(),
+            self._store.live_bitmap()
+        )
+
+    def live_bitmap(self):
+        """Returns the bitmap of the ordinals of all videos in the library."""
+        return self._store.live_bitmap()
+
+    def videos_in(self, bits):
+        """Returns the videos whose ordinals are set in a bitmap.
+
+        Args:
+            bits: A bitmap over video ordinals.
+
+        Returns:
+            A list of Video objects in library order.
+        """
+        return [self._store.video(ordinal) for ordinal in iter_bits(bits)]
+
+    def videos_by_title(self, bits=None, start=0, stop=None):
+        """Returns videos sorted by title, ties kept in library order.
+
+        The title order is computed once and kept up to date, so no call
+        sorts anything, and a page of all videos costs only its own size.
+
+        Args:
+            bits: A bitmap over video ordinals, all videos if None.
+            start: How many videos to skip, for pagination.
+            stop: The position after the last video returned, the end if
+                None.
+
+        Returns:
+            A list of Video objects.
+        """
+        title_order = self._get_title_order()
+        if bits is None:
+            ordinals = title_order[start:stop]
+        else:
+            ordinals = title_order.select(bits, start, stop)
+        return [self._store.video(ordinal) for ordinal in ordinals]
+
+    def search_bitmap(self, search_term):
+        """Returns the bitmap of the videos whose titles contain search_term.
+
+        Args:
+            search_term: The query, matched case-insensitively.
+        """
+        return from_positions(self._get_title_index().search(search_term))
+
+    def search_videos(self, search_term):
+        """Returns all videos whose titles contain the search_term.
+
+        Args:
+            search_term: The query, matched case-insensitively.
+
+        Returns:
+            A list of Video objects in library order.
+        """
+        return [
+            self._store.video(ordinal)
+            for ordinal in self._get_title_index().search(search_term)
+        ]
+
+    def _get_title_index(self):
+        if self._title_index is None and hasattr(self._store, "title_index"):
+            self._title_index = self._store.title_index()
+        if self._title_index is None:
+            title_index = TitleIndex()
+            for ordinal in self._store.ordinals():
+                title_index.add(ordinal, self._store.title(ordinal))
+            self._title_index = title_index
+        return self._title_index
+
+    def _get_title_order(self):
+        if self._title_order is None and hasattr(self._store, "title_order"):
+            self._title_order = self._store.title_order()
+        if self._title_order is None:
+            store = self._store
+            if hasattr(store, "ordinals_by_title"):
+                self._title_order = TitleOrder(
+                    store.ordinals_by_title(), store.title, presorted=True)
+            else:
+                self._title_order = TitleOrder(store.ordinals(), store.title)
+        return self._title_order
+
+    def _get_tag_index(self):
+        if self._tag_index is None and hasattr(self._store, "tag_index"):
+            self._tag_index = self._store.tag_index()
+        if self._tag_index is None:
+            tag_index = TagIndex()
+            for ordinal in self._store.ordinals():
+                tag_index.add(ordinal, self._store.tags(ordinal))
+            self._tag_index = tag_index
+        return self._tag_index
+
+    def add_listener(self, callback):
+        """Registers a callback run with each CatalogDelta applied.
+
+        Bound methods are held weakly, so a listening VideoPlayer can still
+        be garbage collected.
+
+        Args:
+            callback: A callable taking the applied CatalogDelta.
+        """
+        if hasattr(callback, "__self__"):
+            listener = weakref.WeakMethod(callback)
+            self._listeners[listener] = listener
+        else:
+            self._listeners[callback] = lambda: callback
+
+    def remove_listener(self, callback):
+        """Unregisters a callback added with add_listener, if it is there.
+
+        Args:
+            callback: The callable passed to add_listener.
+        """
+        if hasattr(callback, "__self__"):
+            callback = weakref.WeakMethod(callback)
+        self._listeners.pop(callback, None)
+
+    def diff(self, rows):
+        """Returns the changes that turn the library into rows.
+
+        Args:
+            rows: (title, video_id, tags) tuples of the new catalog version.
+        """
+        store = self._store
+        rows = catalog_snapshot.deduplicate(rows)
+        delta = CatalogDelta()
+        for row in rows:
+            ordinal = store.ordinal(row[1])
+            if ordinal is None:
+                delta.inserted.append(row)
+            elif (store.title(ordinal) != row[0]
+                    or tuple(store.tags(ordinal)) != tuple(row[2])):
+                delta.updated.append(row)
+        if len(store) + len(delta.inserted) != len(rows):
+            new_ids = {row[1] for row in rows}
+            delta.deleted = [
+                video_id for video_id in self.video_ids()
+                if video_id not in new_ids
+            ]
+        return delta
+
+    def apply_delta(self, delta):
+        """Applies a CatalogDelta to the library and its indexes.
+
+        The work done is proportional to the number of changed videos.
+        Rows are matched to videos by video_id again, so a delta computed
+        before another one was applied still leaves the library consistent.
+
+        Raises:
+            ValueError: The storage of the library is read-only.
+        """
+        store = self._store
+        if not hasattr(store, "insert"):
+            raise ValueError("Only the memory and sqlite storages can be reloaded")
+        for video_id in delta.deleted:
+            ordinal = store.ordinal(video_id)
+            if ordinal is not None:
+                self._unindex(ordinal)
+                store.delete(ordinal)
+        for row in delta.updated + delta.inserted:
+            ordinal = store.ordinal(row[1])
+            if ordinal is None:
+                ordinal = store.insert(row)
+            else:
+                self._unindex(ordinal)
+                store.update(ordinal, row)
+            if self._title_index is not None:
+                self._title_index.add(ordinal, row[0])
+            if self._title_order is not None:
+                self._title_order.add(ordinal, row[0])
+            if self._tag_index is not None:
+                self._tag_index.add(ordinal, store.tags(ordinal))
+        for key, listener in list(self._listeners.items()):
+            callback = listener()
+            if callback is None:
+                del self._listeners[key]
+            else:
+                callback(delta)
+
+    def _unindex(self, ordinal):
+        if self._title_index is not None:
+            self._title_index.remove(ordinal)
+        if self._tag_index is not None:
+            self._tag_index.remove(ordinal, self._store.tags(ordinal))
+        if self._title_order is not None:
+            self._title_order.remove(ordinal, self._store.title(ordinal))
+
+    def reload(self):
+        """Re-reads the catalog file and applies what changed.
+
+        Returns:
+            The applied CatalogDelta.
+
+        Raises:
+            ValueError: The storage of the library is read-only.
+        """
+        self._pending_rows = None
+        delta = self.diff(_load_rows(self._videos_path, self._workers))
+        self.apply_delta(delta)
+        return delta
+
+    def watch(self, interval=1.0):
+        """Starts watching the catalog file for changes in the background.
+
+        The watcher parses a changed file in its own thread, the changes are
+        applied by the next apply_pending_reload call.
+
+        Args:
+            interval: Seconds between two checks of the file.
+
+        Raises:
+            ValueError: The storage of the library is read-only.
+        """
+        from .catalog_watcher import CatalogWatcher
+
+        if not hasattr(self._store, "insert"):
+            raise ValueError("Only the memory and sqlite storages can be reloaded")
+        if self._watcher is None:
+            self._watcher = CatalogWatcher(
+                self._videos_path,
+                lambda: _load_rows(self._videos_path, self._workers),
+                self._queue_rows, interval)
+            self._watcher.start()
+
+    def stop_watching(self):
+        """Stops the background watcher, if one is running."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _queue_rows(self, rows):
+        # Only the latest version matters, it is diffed when applied.
+        self._pending_rows = rows
+
+    def has_pending_reload(self):
+        """Returns whether the watcher picked up a version to apply."""
+        return self._pending_rows is not None
+
+    def apply_pending_reload(self):
+        """Applies the catalog version the watcher picked up, if any.
+
+        Returns:
+            The applied CatalogDelta, None if there was nothing to apply.
+        """
+        rows, self._pending_rows = self._pending_rows, None
+        if rows is None:
+            return None
+        delta = self.diff(rows)
+        self.apply_delta(delta)
+        return delta
@@ -1,39 +1,171 @@
 """A video player class."""
 
-from .video_library import VideoLibrary
+from . import player_api
+from .catalog_service import CatalogService
+from .output_sink import StreamSink
+from .player_api import PlayerAPI
+
+
+def _reason(reason):
+    return reason if reason else "Not supplied"
 
 
 class VideoPlayer:
-    """A class used to represent a Video Player."""
+    """A class used to represent a Video Player.
+
+    It renders the results of a PlayerAPI as text, the API keeps the state.
+    """
 
-    def __init__(self):
-        self._video_library = VideoLibrary()
-        self.currently_playing = ""
-        self.paused = False
-        self.playlists_dict = {}
-        self.playlists = []
-        self.flagged = {}
+    __slots__ = ("_api", "_output", "_prompt_choice")
+
+    def __init__(self, video_library=None, output=None, api=None,
+                 line_cache_size=100_000, prompt_choice=True):
+        """The VideoPlayer class is initialized.
+
+        Args:
+            video_library: The VideoLibrary to play from, a new one loaded
+                from the default catalog if None.
+            output: The sink lines are written to and answers read from,
+                a StreamSink on stdout if None.
+            api: The PlayerAPI to render, a new one on video_library if
+                None.
+            line_cache_size: How many rendered video lines to cache, when
+                no api is given. Otherwise the lines are cached by its
+                CatalogService.
+            prompt_choice: Whether a search asks right away which result
+                to play. If not, the search returns and the next command
+                may pick a result with PLAY_RESULT, so nothing blocks.
+        """
+        if api is None:
+            api = PlayerAPI(service=CatalogService(
+                video_library, line_cache_size=line_cache_size))
+        self._api = api
+        self._output = StreamSink() if output is None else output
+        self._prompt_choice = prompt_choice
+
+    @property
+    def api(self):
+        """The PlayerAPI the player renders."""
+        return self._api
+
+    @property
+    def output(self):
+        """The output sink of the player."""
+        return self._output
+
+    @property
+    def flagged(self):
+        """The flag reasons of the flagged videos, by video_id."""
+        return self._api.flagged
+
+    def _video_line(self, video):
+        """Returns the listing line of a video, with its flag if any."""
+        service = self._api.service
+        video_id = video._video_id
+        reason = service.flagged.get(video_id)
+        # An entry is only used while the flag state, title and tags of the
+        # video are still the ones it was rendered with. Lines are rendered
+        # outside the catalog lock, so a reload may land in between and a
+        # line of the old video be cached again after the reload dropped it.
+        lines = service.lines
+        title = video._title
+        tags = video._tags
+        entry = lines.get(video_id)
+        if (entry is not None and entry[0] == reason and entry[1] == title
+                and entry[2] == tags):
+            return entry[3]
+        line = f"{title} ({video_id}) [{' '.join(tags)}]"
+        if reason is not None:
+            line += f" - FLAGGED (reason: {_reason(reason)})"
+        # A full cache takes no new lines rather than evicting: a listing
+        # longer than the cache would otherwise evict every line just before
+        # the next listing needs it.
+        if entry is not None or len(lines) < service.line_cache_size:
+            lines[video_id] = (reason, title, tags, line)
+        return line
+
+    def apply_library_updates(self):
+        """Applies catalog changes picked up by the library's watcher."""
+        self._api.apply_library_updates()
+
+    def close(self):
+        """Ends the session of the player."""
+        self._api.close()
+
+    def discard_choice(self):
+        """Forgets the results of the last search."""
+        self._api.discard_choice()
+
+    def reload_library(self):
+        """Re-reads the video catalog and applies what changed."""
+        result = self._api.reload_library()
+        if not result.ok:
+            self._output.write_line(f"Cannot reload library: {result.detail}")
+            return
+        delta = result.delta
+        self._output.write_line(
+            f"Reloaded library: {len(delta.inserted)} added, "
+            f"{len(delta.updated)} updated, {len(delta.deleted)} removed"
+        )
 
     def number_of_videos(self):
-        num_videos = len(self._video_library.get_all_videos())
-        print(f"{num_videos} videos in the library")
-
-    def show_all_videos(self):
-        """Returns all videos."""
-
-        print("Here's a list of all available videos:")
-        videos = self._video_library.get_all_videos()
-        videos = sorted(videos, key=lambda video: video._title)
-        for video in videos:
-            # video: Video object
-            print(
-                f"{video._title} ({video._video_id}) [{' '.join(video._tags)}]"
-                + (
-                    f" - FLAGGED (reason: {self.flagged[video._video_id] if self.flagged[video._video_id] else 'Not supplied'})"
-                    if video._video_id in self.flagged
-                    else ""
-                )
+        num_videos = self._api.number_of_videos()
+        self._output.write_line(f"{num_videos} videos in the library")
+
+    def _show_videos(self, result, numbered=False):
+        """Writes one line per video of a listing page.
+
+        Args:
+            result: A ListResult of Video objects.
+            numbered: Whether to number the lines by position in the whole
+                listing, as search results are.
+        """
+        # Search results never hold flagged videos, so their lines carry
+        # no flag either.
+        video_line = self._video_line
+        write_line = self._output.write_line
+        if numbered:
+            for i, video in enumerate(result.items, result.offset + 1):
+                write_line(f"{i}) {video_line(video)}")
+        else:
+            for video in result.items:
+                write_line(video_line(video))
+
+    def _show_page_footer(self, result):
+        """Tells which part of a paginated listing was shown.
+
+        Args:
+            result: The ListResult of the page.
+        """
+        offset, shown, total = result.offset, len(result.items), result.total
+        if shown == 0:
+            self._output.write_line(
+                f"Nothing to show at OFFSET {offset}, there are only {total}")
+        elif offset + shown < total:
+            self._output.write_line(
+                f"Showing {offset + 1}-{offset + shown} of {total}, "
+                f"use OFFSET {offset + shown} for more"
             )
+        else:
+            self._output.write_line(f"Showing {offset + 1}-{offset + shown} of {total}")
+
+    def show_all_videos(self, offset=0, limit=None):
+        """Returns all videos.
+
+        Args:
+            offset: How many videos to skip, in title order.
+            limit: The most videos to list, all of them if None.
+        """
+
+        self._output.write_line("Here's a list of all available videos:")
+        result = self._api.show_all_videos(offset, limit)
+        self._show_videos(result)
+        if offset or limit is not None:
+            self._show_page_footer(result)
+
+    def _show_stopped(self, result):
+        if result.stopped is not None:
+            self._output.write_line(f"Stopping video: {result.stopped._title}")
 
     def play_video(self, video_id):
         """Plays the respective video.
@@ -41,92 +173,65 @@ class VideoPlayer:
         Args:
             video_id: The video_id to be played.
         """
-        if video_id in self.flagged:
-            print(
+        result = self._api.play_video(video_id)
+        if result.status == player_api.VIDEO_FLAGGED:
+            self._output.write_line(
                 f"Cannot play video: Video is currently flagged "
-                f"(reason: {self.flagged[video_id] if self.flagged[video_id] else 'Not supplied'})"
+                f"(reason: {_reason(result.reason)})"
             )
+        elif result.status == player_api.VIDEO_NOT_FOUND:
+            self._output.write_line("Cannot play video: Video does not exist")
         else:
-            if self.currently_playing and self._video_library.get_video(video_id):
-                self.stop_video()
-                if self.paused:
-                    self.paused = False
-
-            if self._video_library.get_video(video_id):
-                print(
-                    f"Playing video: {self._video_library.get_video(video_id)._title}"
-                )
-                self.currently_playing = video_id
-            else:
-                print("Cannot play video: Video does not exist")
+            self._show_stopped(result)
+            self._output.write_line(f"Playing video: {result.video._title}")
 
     def stop_video(self):
         """Stops the current video."""
-
-        if self.currently_playing == "":
-            print("Cannot stop video: No video is currently playing")
+        result = self._api.stop_video()
+        if result.ok:
+            self._output.write_line(f"Stopping video: {result.video._title}")
         else:
-            print(
-                f"Stopping video: {self._video_library.get_video(self.currently_playing)._title}"
-            )
-            self.currently_playing = ""
+            self._output.write_line("Cannot stop video: No video is currently playing")
 
     def play_random_video(self):
         """Plays a random video from the video library."""
-        import random
-
-        video_ids = list(self._video_library._videos.keys())
-        for i, x in self.flagged.items():
-            video_ids.remove(i)
-
-        if len(video_ids) == 0:
-            print("No videos available")
+        result = self._api.play_random_video()
+        if result.status == player_api.NO_VIDEOS:
+            self._output.write_line("No videos available")
         else:
-            randid = random.choice(video_ids)
-            self.play_video(randid)
+            self._show_stopped(result)
+            self._output.write_line(f"Playing video: {result.video._title}")
 
     def pause_video(self):
         """Pauses the current video."""
-        if self.paused:
-            print(
-                f"Video already paused: {self._video_library.get_video(self.currently_playing)._title}"
-            )
-        elif self.currently_playing:
-            print(
-                f"Pausing video: {self._video_library.get_video(self.currently_playing)._title}"
-            )
-            self.paused = True
+        result = self._api.pause_video()
+        if result.status == player_api.ALREADY_PAUSED:
+            self._output.write_line(f"Video already paused: {result.video._title}")
+        elif result.ok:
+            self._output.write_line(f"Pausing video: {result.video._title}")
         else:
-            print("Cannot pause video: No video is currently playing")
+            self._output.write_line("Cannot pause video: No video is currently playing")
 
     def continue_video(self):
         """Resumes playing the current video."""
-        if self.paused:
-            print(
-                f"Continuing video: {self._video_library.get_video(self.currently_playing)._title}"
-            )
-            self.paused = False
-        elif self.currently_playing:
-            print("Cannot continue video: Video is not paused")
+        result = self._api.continue_video()
+        if result.ok:
+            self._output.write_line(f"Continuing video: {result.video._title}")
+        elif result.status == player_api.NOT_PAUSED:
+            self._output.write_line("Cannot continue video: Video is not paused")
         else:
-            print("Cannot continue video: No video is currently playing")
+            self._output.write_line("Cannot continue video: No video is currently playing")
 
     def show_playing(self):
         """Displays video currently playing."""
-
-        if self.currently_playing:
-            video = self._video_library.get_video(self.currently_playing)
-            if self.paused:
-                print(
-                    f"Currently playing: {video._title} ({video._video_id}) "
-                    f"[{' '.join(video._tags)}] - PAUSED"
-                )
-            else:
-                print(
-                    f"Currently playing: {video._title} ({video._video_id}) [{' '.join(video._tags)}]"
-                )
+        result = self._api.show_playing()
+        if result.ok:
+            self._output.write_line(
+                f"Currently playing: {self._video_line(result.video)}"
+                + (" - PAUSED" if self._api.paused else "")
+            )
         else:
-            print("No video is currently playing")
+            self._output.write_line("No video is currently playing")
 
     def create_playlist(self, playlist_name):
         """Creates a playlist with a given name.
@@ -134,15 +239,12 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        # if self.playlists.get(playlist_name.lower()):
-        if playlist_name.lower() in self.playlists_dict:
-            print(
+        if self._api.create_playlist(playlist_name).ok:
+            self._output.write_line(f"Successfully created new playlist: {playlist_name}")
+        else:
+            self._output.write_line(
                 "Cannot create playlist: A playlist with the same name already exists"
             )
-        else:
-            print(f"Successfully created new playlist: {playlist_name}")
-            self.playlists_dict[playlist_name.lower()] = []
-            self.playlists.append(playlist_name)
 
     def add_to_playlist(self, playlist_name, video_id):
         """Adds a video to a playlist with a given name.
@@ -151,57 +253,51 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be added.
         """
-        if playlist_name.lower() not in self.playlists_dict:
-            print("Cannot add video to another_playlist: Playlist does not exist")
-        elif video_id not in self._video_library._videos:
-            print(f"Cannot add video to {playlist_name}: Video does not exist")
-        elif video_id in self.playlists_dict[playlist_name.lower()]:
-            print(f"Cannot add video to {playlist_name}: Video already added")
-        elif video_id in self.flagged:
-            print(
+        result = self._api.add_to_playlist(playlist_name, video_id)
+        if result.status == player_api.PLAYLIST_NOT_FOUND:
+            self._output.write_line("Cannot add video to another_playlist: Playlist does not exist")
+        elif result.status == player_api.VIDEO_NOT_FOUND:
+            self._output.write_line(f"Cannot add video to {playlist_name}: Video does not exist")
+        elif result.status == player_api.ALREADY_IN_PLAYLIST:
+            self._output.write_line(f"Cannot add video to {playlist_name}: Video already added")
+        elif result.status == player_api.VIDEO_FLAGGED:
+            self._output.write_line(
                 f"Cannot add video to {playlist_name}: Video is currently flagged "
-                f"(reason: {self.flagged[video_id] if self.flagged[video_id] else 'Not supplied'})"
+                f"(reason: {_reason(result.reason)})"
             )
         else:
-            self.playlists_dict[playlist_name.lower()].append(video_id)
-            print(
-                f"Added video to {playlist_name}: {self._video_library.get_video(video_id)._title}"
-            )
+            self._output.write_line(f"Added video to {playlist_name}: {result.video._title}")
 
     def show_all_playlists(self):
         """Display all playlists."""
-        if self.playlists:
-            print("Showing all playlists:")
-            self.playlists.sort()
-            for i in self.playlists:
-                print(i)
+        result = self._api.show_all_playlists()
+        if result.items:
+            self._output.write_line("Showing all playlists:")
+            for i in result.items:
+                self._output.write_line(i)
         else:
-            print("No playlists exist yet")
+            self._output.write_line("No playlists exist yet")
 
-    def show_playlist(self, playlist_name):
+    def show_playlist(self, playlist_name, offset=0, limit=None):
         """Display all videos in a playlist with a given name.
 
         Args:
             playlist_name: The playlist name.
+            offset: How many videos of the playlist to skip.
+            limit: The most videos to list, all of them if None.
         """
-        if playlist_name.lower() in self.playlists_dict:
-            print(f"Showing playlist: {playlist_name}")
-            if self.playlists_dict[playlist_name.lower()]:
-                # self.playlists_dict[playlist_name.lower()].sort()
-                for video_id in self.playlists_dict[playlist_name.lower()]:
-                    video = self._video_library.get_video(video_id)
-                    print(
-                        f"{video._title} ({video._video_id}) [{' '.join(video._tags)}]"
-                        + (
-                            f" - FLAGGED (reason: {self.flagged[video_id] if self.flagged[video_id] else 'Not supplied'})"
-                            if video_id in self.flagged
-                            else ""
-                        )
-                    )
-            else:
-                print("No videos here yet")
+        result = self._api.show_playlist(playlist_name, offset, limit)
+        if not result.ok:
+            self._output.write_line(
+                f"Cannot show playlist {playlist_name}: Playlist does not exist")
+            return
+        self._output.write_line(f"Showing playlist: {playlist_name}")
+        if result.total:
+            self._show_videos(result)
+            if offset or limit is not None:
+                self._show_page_footer(result)
         else:
-            print(f"Cannot show playlist {playlist_name}: Playlist does not exist")
+            self._output.write_line("No videos here yet")
 
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
@@ -210,25 +306,19 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be removed.
         """
-        # playlist exists
-        # if self.playlists_dict.get(playlist_name.lower()):
-        if playlist_name.lower() in self.playlists_dict:
-            # video exists
-            if self._video_library.get_video(video_id):
-                # video in playlist
-                if video_id in self.playlists_dict[playlist_name.lower()]:
-                    self.playlists_dict[playlist_name.lower()].remove(video_id)
-                    print(
-                        f"Removed video from {playlist_name}: {self._video_library.get_video(video_id)._title}"
-                    )
-                else:  # video not in playlist
-                    print(
-                        f"Cannot remove video from {playlist_name}: Video is not in playlist"
-                    )
-            else:  # video does not exist
-                print(f"Cannot remove video from {playlist_name}: Video does not exist")
-        else:  # playlist does not exist
-            print(f"Cannot remove video from {playlist_name}: Playlist does not exist")
+        result = self._api.remove_from_playlist(playlist_name, video_id)
+        if result.status == player_api.PLAYLIST_NOT_FOUND:
+            self._output.write_line(
+                f"Cannot remove video from {playlist_name}: Playlist does not exist")
+        elif result.status == player_api.VIDEO_NOT_FOUND:
+            self._output.write_line(
+                f"Cannot remove video from {playlist_name}: Video does not exist")
+        elif result.status == player_api.NOT_IN_PLAYLIST:
+            self._output.write_line(
+                f"Cannot remove video from {playlist_name}: Video is not in playlist")
+        else:
+            self._output.write_line(
+                f"Removed video from {playlist_name}: {result.video._title}")
 
     def clear_playlist(self, playlist_name):
         """Removes all videos from a playlist with a given name.
@@ -236,11 +326,11 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        if playlist_name.lower() in self.playlists_dict:
-            self.playlists_dict[playlist_name.lower()] = []
-            print(f"Successfully removed all videos from {playlist_name}")
+        if self._api.clear_playlist(playlist_name).ok:
+            self._output.write_line(f"Successfully removed all videos from {playlist_name}")
         else:
-            print(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
+            self._output.write_line(
+                f"Cannot clear playlist {playlist_name}: Playlist does not exist")
 
     def delete_playlist(self, playlist_name):
         """Deletes a playlist with a given name.
@@ -248,80 +338,111 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        if playlist_name.lower() in self.playlists_dict:
-            del self.playlists_dict[playlist_name.lower()]
-            self.playlists.remove(playlist_name)
-            print(f"Deleted playlist: {playlist_name}")
+        if self._api.delete_playlist(playlist_name).ok:
+            self._output.write_line(f"Deleted playlist: {playlist_name}")
         else:
-            print(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
+            self._output.write_line(
+                f"Cannot delete playlist {playlist_name}: Playlist does not exist")
 
-    def search_videos(self, search_term):
+    def search_videos(self, search_term, offset=0, limit=None):
         """Display all the videos whose titles contain the search_term.
 
         Args:
             search_term: The query to be used in search.
+            offset: How many results to skip, in title order.
+            limit: The most results to list, all of them if None.
         """
-        results = []
-        for i, x in self._video_library._videos.items():
-            if search_term.lower() in x._title.lower() and i not in self.flagged:
-                results.append(x)
+        result = self._api.search_videos(search_term, offset, limit)
+        self._show_search_results(search_term, result, limit)
 
-        if len(results) == 0:
-            print(f"No search results for {search_term}")
+    def search_videos_tag(self, video_tag, offset=0, limit=None):
+        """Display all videos whose tags contains the provided tag.
 
-        else:
-            results.sort(key=lambda x: x._title)
+        Args:
+            video_tag: The video tag to be used in search.
+            offset: How many results to skip, in title order.
+            limit: The most results to list, all of them if None.
+        """
+        result = self._api.search_videos_tag(video_tag, offset, limit)
+        self._show_search_results(video_tag, result, limit)
 
-            print(f"Here are the results for {search_term}:")
-            for i in range(len(results)):
-                video = results[i]
-                print(
-                    f"{i+1}) {video._title} ({video._video_id}) [{' '.join(video._tags)}]"
-                )
+    def search_videos_tags(self, expression):
+        """Display all videos matching a boolean tag query.
 
-            print(
-                "Would you like to play any of the above? If yes, "
-                "specify the number of the video.\n"
-                "If your answer is not a valid number, we will assume "
-                "it's a no."
-            )
-            num = input()
-            if num.isnumeric() and (int(num) > 0 and int(num) <= len(results)):
-                self.play_video(results[int(num) - 1]._video_id)
+        Args:
+            expression: Tags combined with AND, OR, NOT and parentheses.
+        """
+        result = self._api.search_videos_tags(expression)
+        if not result.ok:
+            self._output.write_line(f"Cannot search videos: {result.detail}")
+            return
+        self._show_search_results(expression, result)
 
-    def search_videos_tag(self, video_tag):
-        """Display all videos whose tags contains the provided tag.
+    def _show_search_results(self, search_term, result, limit=None):
+        """Lists search results and plays the one the user picks.
+
+        Results are numbered by their position among all results, so the
+        numbers stay the same from one page to the next.
 
         Args:
-            video_tag: The video tag to be used in search.
+            search_term: The query, as displayed to the user.
+            result: The ListResult of the page of results.
+            limit: The page size asked for, None if not paginated.
         """
-        results = []
-        for i, x in self._video_library._videos.items():
-            if video_tag in x._tags and i not in self.flagged:
-                results.append(x)
+        offset, results = result.offset, result.items
+        if result.total == 0:
+            self._output.write_line(f"No search results for {search_term}")
 
-        if len(results) == 0:
-            print(f"No search results for {video_tag}")
+        elif len(results) == 0:
+            self._show_page_footer(result)
 
         else:
-            results.sort(key=lambda x: x._title)
-
-            print(f"Here are the results for {video_tag}:")
-            for i in range(len(results)):
-                video = results[i]
-                print(
-                    f"{i+1}) {video._title} ({video._video_id}) [{' '.join(video._tags)}]"
+            self._output.write_line(f"Here are the results for {search_term}:")
+            self._show_videos(result, numbered=True)
+            if offset or limit is not None:
+                self._show_page_footer(result)
+
+            if not self._prompt_choice:
+                self._output.write_line(
+                    "Would you like to play any of the above? If yes, "
+                    "enter PLAY_RESULT followed by the number of the video."
                 )
-
-            print(
+                return
+            self._output.write_line(
                 "Would you like to play any of the above? If yes, "
                 "specify the number of the video.\n"
                 "If your answer is not a valid number, we will assume "
                 "it's a no."
             )
-            num = input()
-            if num.isnumeric() and (int(num) > 0 and int(num) <= len(results)):
-                self.play_video(results[int(num) - 1]._video_id)
+            num = self._output.ask()
+            if num.isdecimal() and offset < int(num) <= offset + len(results):
+                self._api.discard_choice()
+                self.play_video(results[int(num) - offset - 1]._video_id)
+
+    def play_result(self, number):
+        """Plays one of the results listed by the last search.
+
+        Args:
+            number: The number of the result, as listed.
+        """
+        if not number.isdecimal():
+            self._output.write_line("Cannot play result: Please enter the number of a result")
+            return
+        result = self._api.play_result(int(number))
+        if result.status == player_api.NO_PENDING_CHOICE:
+            self._output.write_line("Cannot play result: No search results to choose from")
+        elif result.status == player_api.INVALID_CHOICE:
+            self._output.write_line(f"Cannot play result: There is no result {number}")
+        elif result.status == player_api.VIDEO_FLAGGED:
+            self._output.write_line(
+                f"Cannot play video: Video is currently flagged "
+                f"(reason: {_reason(result.reason)})"
+            )
+        elif result.status == player_api.VIDEO_NOT_FOUND:
+            self._output.write_line("Cannot play video: Video does not exist")
+        else:
+            self._show_stopped(result)
+            self._output.write_line(f"Playing video: {result.video._title}")
 
     def flag_video(self, video_id, flag_reason=""):
         """Mark a video as flagged.
@@ -330,18 +451,16 @@ class VideoPlayer:
             video_id: The video_id to be flagged.
             flag_reason: Reason for flagging the video.
         """
-
-        if video_id not in self._video_library._videos:
-            print("Cannot flag video: Video does not exist")
-        elif video_id in self.flagged:
-            print("Cannot flag video: Video is already flagged")
+        result = self._api.flag_video(video_id, flag_reason)
+        if result.status == player_api.VIDEO_NOT_FOUND:
+            self._output.write_line("Cannot flag video: Video does not exist")
+        elif result.status == player_api.ALREADY_FLAGGED:
+            self._output.write_line("Cannot flag video: Video is already flagged")
         else:
-            if video_id == self.currently_playing:
-                self.stop_video()
-            self.flagged[video_id] = flag_reason
-            print(
-                f"Successfully flagged video: {self._video_library.get_video(video_id)._title} "
-                f"(reason: {flag_reason if flag_reason else 'Not supplied'})"
+            self._show_stopped(result)
+            self._output.write_line(
+                f"Successfully flagged video: {result.video._title} "
+                f"(reason: {_reason(result.reason)})"
             )
 
     def allow_video(self, video_id):
@@ -350,13 +469,12 @@ class VideoPlayer:
         Args:
             video_id: The video_id to be allowed again.
         """
-        if not self._video_library.get_video(video_id):
-            print("Cannot remove flag from video: Video does not exist")
-        elif video_id in self.flagged:
-            del self.flagged[video_id]
-            print(
-                f"Successfully removed flag from video: {self._video_library.get_video(video_id)._title}"
-            )
+        result = self._api.allow_video(video_id)
+        if result.status == player_api.VIDEO_NOT_FOUND:
+            self._output.write_line("Cannot remove flag from video: Video does not exist")
+        elif result.status == player_api.NOT_FLAGGED:
+            self._output.write_line("Cannot remove flag from video: Video is not flagged")
         else:
-            print("Cannot remove flag from video: Video is not flagged")
-
+            self._output.write_line(
+                f"Successfully removed flag from video: {result.video._title}"
+            )
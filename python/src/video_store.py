@@ -0,0 +1,182 @@
+"""Storage backends holding the videos of a VideoLibrary.
+
+A store numbers its videos with dense ordinals in library order and
+answers:
+
+    len(store)              the number of videos
+    store.ordinals()        the ordinals of all videos, in ascending order
+    store.live_bitmap()     the bitmap of those ordinals
+    store.ordinal(id)       the ordinal of a video_id, None if absent
+    store.video(ordinal)    the Video object
+    store.video_id(ordinal), store.title(ordinal), store.tags(ordinal)
+                            single fields, without building a Video
+
+Stores that maintain indexes of their own, like sqlite_store.SqliteStore,
+also provide title_index() and tag_index(), which VideoLibrary uses instead
+of building TitleIndex and TagIndex in memory, and may provide
+ordinals_by_title() when they can list ordinals in title order cheaply, or
+title_order() when they hold a whole TitleOrder. Hooks returning None leave
+the index to VideoLibrary.
+"""
+
+from collections import OrderedDict
+
+from .catalog_snapshot import deduplicate
+from .title_order import TitleOrder
+from .video import Video
+
+
+class MemoryStore:
+    """A class used to represent a store keeping every Video in memory.
+
+    It is the only mutable store. A deleted video leaves a hole behind, so
+    the ordinals of the other videos, and the indexes and bitmaps built on
+    them, stay valid. Inserted videos get new ordinals at the end.
+    """
+
+    def __init__(self, rows):
+        """The MemoryStore class is initialized.
+
+        Args:
+            rows: An iterable of (title, video_id, tags) tuples in file order.
+        """
+        self._videos = [Video(*row) for row in deduplicate(rows)]
+        self._ordinals = {
+            video.video_id: ordinal for ordinal, video in enumerate(self._videos)
+        }
+        self._deleted = 0
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def ordinals(self):
+        if not self._deleted:
+            return range(len(self._videos))
+        return (o for o, video in enumerate(self._videos) if video is not None)
+
+    def live_bitmap(self):
+        return ((1 << len(self._videos)) - 1) & ~self._deleted
+
+    def ordinal(self, video_id):
+        return self._ordinals.get(video_id, None)
+
+    def video(self, ordinal):
+        return self._videos[ordinal]
+
+    def video_id(self, ordinal):
+        return self._videos[ordinal].video_id
+
+    def title(self, ordinal):
+        return self._videos[ordinal].title
+
+    def tags(self, ordinal):
+        return self._videos[ordinal].tags
+
+    def insert(self, row):
+        """Adds a video and returns its ordinal.
+
+        Args:
+            row: A (title, video_id, tags) tuple for a new video_id.
+        """
+        ordinal = len(self._videos)
+        self._videos.append(Video(*row))
+        self._ordinals[row[1]] = ordinal
+        return ordinal
+
+    def update(self, ordinal, row):
+        """Replaces the title and tags of the video with ordinal."""
+        self._videos[ordinal] = Video(*row)
+
+    def delete(self, ordinal):
+        """Removes the video with ordinal."""
+        del self._ordinals[self._videos[ordinal].video_id]
+        self._videos[ordinal] = None
+        self._deleted |= 1 << ordinal
+
+
+class ColumnarStore:
+    """A class used to represent a store reading a columnar snapshot.
+
+    The snapshot buffer may be in memory or memory-mapped. Titles, ids and
+    tags stay in its flat columns, Videos are built when they are asked for
+    and the most recently used ones are kept in a bounded cache, so memory
+    follows the videos a session touches rather than the catalog size.
+    """
+
+    def __init__(self, snapshot, cache_size=1024, title_index=None):
+        """The ColumnarStore class is initialized.
+
+        Args:
+            snapshot: An opened catalog_snapshot.Snapshot.
+            cache_size: How many Video objects to keep cached.
+            title_index: A packed_title_index.PackedTitleIndex of the same
+                rows, e.g. published along with a shared snapshot, to
+                search and sort titles with instead of indexes built in
+                memory.
+        """
+        self._snapshot = snapshot
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._title_index = title_index
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def ordinals(self):
+        return range(len(self._snapshot))
+
+    def live_bitmap(self):
+        return (1 << len(self._snapshot)) - 1
+
+    def ordinal(self, video_id):
+        return self._snapshot.find(video_id)
+
+    def video(self, ordinal):
+        # Readers on other threads may share the store, so an entry can be
+        # evicted between two steps here. That only costs a cache miss.
+        video = self._cache.get(ordinal)
+        if video is not None:
+            try:
+                self._cache.move_to_end(ordinal)
+            except KeyError:
+                pass
+            return video
+        snapshot = self._snapshot
+        video = Video(
+            snapshot.title(ordinal), snapshot.video_id(ordinal),
+            snapshot.tags(ordinal))
+        if self._cache_size > 0:
+            self._cache[ordinal] = video
+            if len(self._cache) > self._cache_size:
+                try:
+                    self._cache.popitem(last=False)
+                except KeyError:
+                    pass
+        return video
+
+    def video_id(self, ordinal):
+        return self._snapshot.video_id(ordinal)
+
+    def title(self, ordinal):
+        return self._snapshot.title(ordinal)
+
+    def tags(self, ordinal):
+        return tuple(self._snapshot.tags(ordinal))
+
+    def title_index(self):
+        """Returns the packed title index, None if there is none."""
+        return self._title_index
+
+    def title_order(self):
+        """Returns the title order of the packed title index, None if there
+        is none."""
+        index = self._title_index
+        if index is None:
+            return None
+        return TitleOrder(index.order, self.title, presorted=True,
+                          ranks=index.ranks)
+
+    def close(self):
+        """Releases the snapshot."""
+        self._cache.clear()
+        self._snapshot.close()
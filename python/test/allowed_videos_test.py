@@ -0,0 +1,35 @@
+from unittest import mock
+
+from src.allowed_videos import AllowedVideos
+from src.video_player import VideoPlayer
+
+
+def test_swap_remove_keeps_positions_consistent():
+    allowed = AllowedVideos(range(5))
+    allowed.discard(1)
+    allowed.discard(4)
+    allowed.discard(7)
+    allowed.add(1)
+    allowed.add(9)
+    allowed.add(9)
+
+    assert len(allowed) == 5
+    assert sorted(o for o in range(10) if o in allowed) == [0, 1, 2, 3, 9]
+    for o in [0, 1, 2, 3, 9]:
+        allowed.discard(o)
+    assert len(allowed) == 0
+    assert 0 not in allowed
+
+
+def test_play_random_skips_flagged_and_reallowed_videos(capfd):
+    player = VideoPlayer()
+    player.play_random_video()
+    for video_id in player.api.library.video_ids():
+        player.flag_video(video_id)
+    player.allow_video("life_at_google_video_id")
+    capfd.readouterr()
+
+    with mock.patch("random.randrange", lambda n: n - 1):
+        player.play_random_video()
+    out, err = capfd.readouterr()
+    assert out == "Playing video: Life at Google\n"
@@ -0,0 +1,59 @@
+import gc
+import shutil
+from unittest import mock
+
+import pytest
+
+from src.bytes_parser import parse_bytes, read_rows_fast
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary, read_text_rows
+
+
+def _csv_rows(tmp_path, data):
+    path = tmp_path / "videos.txt"
+    path.write_bytes(data)
+    return list(read_text_rows(path))
+
+
+def test_matches_csv_loader_on_default_catalog():
+    assert read_rows_fast(DEFAULT_VIDEOS_PATH) == list(
+        read_text_rows(DEFAULT_VIDEOS_PATH))
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"A | a_id | #x , #y\n",
+    b"A | a_id |\r\nB|b_id|  #z ,\r\n",
+    b" Spaced\t| s_id | , \n\xc3\x9cber | \xc3\xbc_id | #\xc3\xbc",
+    b'Plain | p_id | #p\n"Quoted | title" | q_id | #q\nAfter | after_id |\n',
+    b'"Multi\nline" | m_id | #m\nNext | n_id | #n',
+    b"Carriage | c_id | #c\rReturn | r_id | #r\n",
+])
+def test_matches_csv_loader(tmp_path, data):
+    assert parse_bytes(data, "utf-8") == _csv_rows(tmp_path, data)
+
+
+@pytest.mark.parametrize("data", [b"A | a_id\n", b"A | a_id | #a\n\nB | b_id | #b\n"])
+def test_malformed_lines_fail_like_csv_loader(tmp_path, data):
+    with pytest.raises(ValueError):
+        _csv_rows(tmp_path, data)
+    with pytest.raises(ValueError):
+        parse_bytes(data, "utf-8")
+
+
+def test_crlf_lines_stay_on_fast_path(tmp_path):
+    data = b"A | a_id | #a\r\nB | b_id |\r\n"
+
+    assert parse_bytes(data, "utf-8") == _csv_rows(tmp_path, data)
+
+
+def test_only_the_first_load_pauses_the_collector(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    with mock.patch.object(gc, "disable", wraps=gc.disable) as disable:
+        library = VideoLibrary(videos_path)
+        assert disable.call_count == 1
+        assert gc.isenabled()
+        # Reloads run beside threads serving commands, e.g. in the watcher.
+        videos_path.write_text("Amazing Cats | amazing_cats_video_id | #cat\n")
+        library.reload()
+        assert disable.call_count == 1
@@ -0,0 +1,101 @@
+import gc
+import shutil
+import tracemalloc
+
+from src import player_api
+from src.catalog_service import CatalogService
+from src.command_parser import CommandParser
+from src.output_sink import ListSink
+from src.player_api import PlayerAPI
+from src.player_session import PlayerSession
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary
+from src.video_player import VideoPlayer
+
+SESSIONS = 1000
+# Bytes one session may cost on top of the shared service: its
+# PlayerSession and PlayerAPI, the VideoPlayer and parser rendering it, an
+# output sink, and one playlist holding one video.
+BYTES_PER_SESSION_BUDGET = 1536
+
+
+def test_flags_are_shared_but_player_state_is_not():
+    service = CatalogService()
+    first, second = PlayerAPI(service=service), PlayerAPI(service=service)
+
+    first.play_video("amazing_cats_video_id")
+    first.create_playlist("mine")
+    second.flag_video("funny_dogs_video_id", "dont_like_dogs")
+
+    assert second.currently_playing == ""
+    assert second.create_playlist("mine").ok
+    assert first.play_video("funny_dogs_video_id").reason == "dont_like_dogs"
+    assert first.currently_playing == "amazing_cats_video_id"
+    assert len(service) == 2
+    first.close()
+    assert len(service) == 1
+
+
+def test_flagging_stops_the_video_in_every_session():
+    service = CatalogService()
+    first, second = PlayerAPI(service=service), PlayerAPI(service=service)
+    first.play_video("amazing_cats_video_id")
+    first.pause_video()
+    second.play_video("funny_dogs_video_id")
+
+    assert second.flag_video("amazing_cats_video_id", "bad").stopped is None
+    assert (first.currently_playing, first.paused) == ("", False)
+    assert first.continue_video().status == player_api.NOTHING_PLAYING
+    assert second.currently_playing == "funny_dogs_video_id"
+
+
+def test_reload_updates_every_session(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    service = CatalogService(VideoLibrary(videos_path))
+    sessions = [PlayerAPI(service=service) for _ in range(3)]
+    for api in sessions:
+        api.create_playlist("cats")
+        api.add_to_playlist("cats", "another_cat_video_id")
+        api.play_video("another_cat_video_id")
+
+    videos_path.write_text("Amazing Cats | amazing_cats_video_id | #cat\n")
+    assert sessions[0].reload_library().ok
+
+    for api in sessions:
+        assert api.currently_playing == ""
+        assert api.show_playlist("cats").total == 0
+
+
+def test_service_may_refuse_reloads():
+    api = PlayerAPI(service=CatalogService(reloadable=False))
+
+    assert api.reload_library().status == player_api.RELOAD_FAILED
+
+
+def test_session_has_no_instance_dict():
+    assert not hasattr(PlayerSession(), "__dict__")
+
+
+def test_memory_per_session_within_budget():
+    service = CatalogService()
+
+    def open_session():
+        player = VideoPlayer(output=ListSink(), api=PlayerAPI(service=service),
+                             prompt_choice=False)
+        parser = CommandParser(player)
+        for command in ("PLAY amazing_cats_video_id", "CREATE_PLAYLIST mine",
+                        "ADD_TO_PLAYLIST mine amazing_cats_video_id"):
+            parser.execute_command(command.split())
+        player.output.lines.clear()
+        return parser
+
+    open_session()
+    gc.collect()
+    tracemalloc.start()
+    parsers = [open_session() for _ in range(SESSIONS)]
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(service) == SESSIONS
+    assert held / len(parsers) <= BYTES_PER_SESSION_BUDGET
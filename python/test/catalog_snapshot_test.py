@@ -0,0 +1,89 @@
+import os
+import shutil
+
+from src import catalog_snapshot
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary, read_text_rows
+
+
+def _copy_catalog(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    return videos_path
+
+
+def test_snapshot_round_trips_rows(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    catalog_snapshot.main([str(videos_path)])
+
+    assert catalog_snapshot.snapshot_path(videos_path).exists()
+    assert catalog_snapshot.read_rows(videos_path) == list(
+        read_text_rows(videos_path))
+
+
+def test_library_loads_from_snapshot(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    rows = list(read_text_rows(videos_path))
+    rows[0] = ("Snapshot Dogs", "funny_dogs_video_id", ["#dog"])
+    catalog_snapshot.write_snapshot(videos_path, rows)
+
+    library = VideoLibrary(videos_path)
+    assert library.get_video("funny_dogs_video_id").title == "Snapshot Dogs"
+    assert len(library.get_all_videos()) == 5
+
+
+def test_stale_snapshot_falls_back_to_text(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    catalog_snapshot.write_snapshot(videos_path, [("Old", "old_video_id", [])])
+    with open(videos_path, "a") as video_file:
+        video_file.write("\nNew Video | new_video_id | #new")
+
+    assert catalog_snapshot.read_rows(videos_path) is None
+    library = VideoLibrary(videos_path)
+    assert library.get_video("old_video_id") is None
+    assert library.get_video("new_video_id").tags == ("#new",)
+
+
+def test_corrupt_snapshot_is_ignored(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    path = catalog_snapshot.write_snapshot(videos_path, read_text_rows(videos_path))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    assert catalog_snapshot.read_rows(videos_path) is None
+    os.remove(path)
+    assert catalog_snapshot.read_rows(videos_path) is None
+
+
+def test_mmap_storage_builds_videos_on_demand(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    with open(videos_path, "a") as video_file:
+        video_file.write("\nÜber Cats | über_video_id | #cat\n"
+                         "Funny Dogs 2 | funny_dogs_video_id | #dog")
+    catalog_snapshot.main([str(videos_path)])
+    memory = VideoLibrary(videos_path)
+    library = VideoLibrary(videos_path, storage="mmap", cache_size=2)
+
+    assert len(library) == len(memory) == 6
+    for video_id in memory.video_ids():
+        video = library.get_video(video_id)
+        assert (video.title, video.video_id, video.tags) == (
+            memory.get_video(video_id).title, video_id,
+            memory.get_video(video_id).tags)
+    assert library.get_video("über_video_id").title == "Über Cats"
+    assert library.get_video("funny_dogs_video_id").title == "Funny Dogs 2"
+    assert library.get_video("missing_video_id") is None
+    assert len(library._store._cache) == 2
+    assert [v.video_id for v in library.search_videos("cat")] == [
+        v.video_id for v in memory.search_videos("cat")]
+    assert library.videos_in(library.tag_bitmap("#cat"))[-1].video_id == (
+        "über_video_id")
+    library.close()
+
+
+def test_mmap_storage_without_snapshot_loads_text(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    library = VideoLibrary(videos_path, storage="mmap")
+
+    assert len(library) == 5
+    assert library.get_video("nothing_video_id").tags == ()
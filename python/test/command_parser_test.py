@@ -0,0 +1,39 @@
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.output_sink import ListSink
+from src.video_player import VideoPlayer
+
+
+def _parser():
+    return CommandParser(VideoPlayer(output=ListSink()))
+
+
+def test_commands_are_case_insensitive_and_ignore_extra_words():
+    parser = _parser()
+    parser.execute_command(["number_of_videos", "please"])
+    parser.execute_command(["NOT_A_COMMAND"])
+
+    assert parser.output.lines == [
+        "5 videos in the library",
+        "Please enter a valid command, type HELP for a list of available commands.",
+    ]
+
+
+@pytest.mark.parametrize("command", [["PLAY"], ["PLAY", "a", "b"], ["FLAG_VIDEO"]])
+def test_declared_arity_is_enforced(command):
+    with pytest.raises(CommandException) as error:
+        _parser().execute_command(command)
+    assert str(error.value).startswith(f"Please enter {command[0]} command")
+
+
+def test_plugins_register_commands():
+    parser = _parser()
+    parser.register(
+        "ECHO", lambda parser, *words: parser.output.write_line(" ".join(words)),
+        max_args=None, arguments="<words>", help="Repeats the words.")
+    parser.execute_command(["echo", "hello", "there"])
+    parser.execute_command(["HELP"])
+
+    assert parser.output.lines[0] == "hello there"
+    assert "    ECHO <words> - Repeats the words." in parser.output.lines
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.command_stats import (
+    BUCKETS, CommandStats, bucket_bound_us, bucket_of, merge_snapshots,
+    percentile)
+from src.output_sink import ListSink
+from src.video_player import VideoPlayer
+
+
+def _parser():
+    stats = CommandStats()
+    return CommandParser(VideoPlayer(output=ListSink()), stats=stats), stats
+
+
+def test_latencies_fall_in_log_scale_buckets():
+    assert bucket_of(999) == 0
+    assert bucket_of(1_000) == 1
+    assert bucket_of(1_999) == 1
+    assert bucket_of(2_000) == 2
+    assert bucket_of(10**15) == BUCKETS - 1
+    assert bucket_bound_us(2) == 4
+    assert bucket_bound_us(BUCKETS - 1) is None
+
+    buckets = [0] * BUCKETS
+    buckets[1], buckets[5] = 98, 2
+    assert percentile(buckets, 0.5) == 1
+    assert percentile(buckets, 0.99) == 5
+    assert percentile([0] * BUCKETS, 0.5) is None
+
+
+def test_parser_records_runs_errors_and_unknown_commands():
+    parser, stats = _parser()
+    parser.execute_command(["NUMBER_OF_VIDEOS"])
+    parser.execute_command(["number_of_videos"])
+    with pytest.raises(CommandException):
+        parser.execute_command(["PLAY"])
+    parser.execute_command(["NOT_A_COMMAND"])
+    parser.execute_command(["ALSO_NOT_A_COMMAND"])
+
+    snapshot = stats.snapshot()
+    assert sorted(snapshot) == ["NUMBER_OF_VIDEOS", "PLAY", "UNKNOWN"]
+    assert snapshot["NUMBER_OF_VIDEOS"]["count"] == 2
+    assert snapshot["NUMBER_OF_VIDEOS"]["errors"] == 0
+    assert sum(snapshot["NUMBER_OF_VIDEOS"]["buckets"]) == 2
+    assert (snapshot["PLAY"]["count"], snapshot["PLAY"]["errors"]) == (1, 1)
+    assert (snapshot["UNKNOWN"]["count"], snapshot["UNKNOWN"]["errors"]) == (2, 2)
+
+
+def test_snapshots_merge_across_processes():
+    first, second = CommandStats(), CommandStats()
+    first.record("PLAY", 1_500)
+    second.record("PLAY", 3_000, failed=True)
+    second.record("STOP", 500)
+
+    # Snapshots survive a trip through JSON, e.g. from a worker process.
+    merged = merge_snapshots(
+        json.loads(json.dumps(stats.snapshot())) for stats in (first, second))
+    assert merged["PLAY"]["count"] == 2
+    assert merged["PLAY"]["errors"] == 1
+    assert merged["PLAY"]["total_ns"] == 4_500
+    assert merged["PLAY"]["buckets"][1] == merged["PLAY"]["buckets"][2] == 1
+    assert merged["STOP"]["buckets"][0] == 1
+
+    with pytest.raises(ValueError):
+        first.merge({"PLAY": dict(merged["PLAY"], buckets=[1])})
+
+
+def test_stats_command_shows_each_command():
+    parser, stats = _parser()
+    parser.execute_command(["STATS"])
+    assert parser.output.lines == ["No commands have run yet"]
+
+    stats.record("PLAY", 10**15, failed=True)
+    parser.execute_command(["STATS"])
+    lines = parser.output.lines[-3:]
+    assert lines[0] == "Command statistics:"
+    assert lines[1].startswith("    PLAY: 1 runs, 1 errors, mean ")
+    assert lines[1].endswith(f"p50 >= {1 << (BUCKETS - 2)} us, "
+                             f"p99 >= {1 << (BUCKETS - 2)} us")
+    assert lines[2].startswith("    STATS: 1 runs, 0 errors")
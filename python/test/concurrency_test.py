@@ -0,0 +1,153 @@
+import random
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.bitmap import from_positions, iter_bits
+from src.catalog_service import CatalogService
+from src.player_api import PlayerAPI
+from src.rw_lock import ReadWriteLock
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary
+
+THREADS = 8
+COMMANDS_PER_THREAD = 1500
+VIDEO_IDS = [
+    "amazing_cats_video_id", "another_cat_video_id", "funny_dogs_video_id",
+    "life_at_google_video_id", "nothing_video_id"]
+SHORT_CATALOG = (
+    "Amazing Cats | amazing_cats_video_id | #cat , #animal\n"
+    "Funny Dogs | funny_dogs_video_id | #dog , #animal\n")
+
+
+def test_readers_share_the_lock_and_writers_wait_for_them():
+    lock = ReadWriteLock()
+    inside = threading.Barrier(2, timeout=5)
+    written = []
+
+    def read():
+        with lock.read():
+            inside.wait()  # Both readers get in together.
+            assert not written
+
+    def write():
+        with lock.write():
+            written.append(True)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    writer = threading.Thread(target=write)
+    writer.start()
+    writer.join()
+    assert written == [True]
+
+
+def _hammer(run):
+    """Runs run(seed) on THREADS threads, switching between them often."""
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        with ThreadPoolExecutor(THREADS) as executor:
+            list(executor.map(run, range(THREADS)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def _check_flags(service):
+    library = service.library
+    assert service.flagged_bits == from_positions(
+        library.ordinal(video_id) for video_id in service.flagged)
+    assert sorted(service.allowed()._ordinals) == list(
+        iter_bits(library.live_bitmap() & ~service.flagged_bits))
+
+
+def test_concurrent_writes_are_linearizable():
+    service = CatalogService(thread_safe=True)
+    shared = PlayerAPI(service=service)
+    shared.create_playlist("shared")
+    shared.play_random_video()  # Builds the random-play set early.
+    counts_lock = threading.Lock()
+    counts = {"flag": 0, "allow": 0, "add": 0, "remove": 0}
+
+    def run(seed):
+        generator = random.Random(seed)
+        own = PlayerAPI(service=service)
+        for _ in range(COMMANDS_PER_THREAD):
+            video_id = generator.choice(VIDEO_IDS)
+            kind = generator.choice(("flag", "allow", "add", "remove", "play"))
+            if kind == "flag":
+                result = shared.flag_video(video_id, "stress")
+            elif kind == "allow":
+                result = shared.allow_video(video_id)
+            elif kind == "add":
+                result = shared.add_to_playlist("shared", video_id)
+            elif kind == "remove":
+                result = shared.remove_from_playlist("shared", video_id)
+            else:
+                own.play_video(video_id)
+                own.search_videos_tag("#cat")
+                continue
+            if result.ok:
+                with counts_lock:
+                    counts[kind] += 1
+        own.close()
+
+    _hammer(run)
+
+    # Every flag or add that succeeded was undone by one successful allow
+    # or remove, or is still in effect.
+    assert counts["flag"] - counts["allow"] == len(service.flagged)
+    video_ids = shared.session.playlists_dict["shared"]
+    assert counts["add"] - counts["remove"] == len(video_ids)
+    assert len(video_ids) == len(set(video_ids))
+    _check_flags(service)
+    assert len(service) == 1
+
+
+def test_reads_are_not_torn_by_reloads(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    full_catalog = videos_path.read_text()
+    service = CatalogService(VideoLibrary(videos_path), thread_safe=True)
+    failures = []
+
+    def run(seed):
+        generator = random.Random(seed)
+        own = PlayerAPI(service=service)
+        own.create_playlist("mine")
+        for i in range(COMMANDS_PER_THREAD):
+            video_id = generator.choice(VIDEO_IDS)
+            kind = generator.randrange(6)
+            if seed == 0 and i % 50 == 0:
+                videos_path.write_text(
+                    SHORT_CATALOG if i % 100 == 0 else full_catalog)
+                if not own.reload_library().ok:
+                    failures.append("reload failed")
+            elif kind == 0:
+                own.flag_video(video_id)
+            elif kind == 1:
+                own.allow_video(video_id)
+            elif kind == 2:
+                own.add_to_playlist("mine", video_id)
+                own.play_random_video()
+            elif kind == 3:
+                result = own.search_videos("cat")
+                if result.total != len(result.items):
+                    failures.append("search torn by a reload")
+            else:
+                result = own.show_all_videos()
+                titles = [video.title for video in result.items]
+                if result.total != len(titles) or titles != sorted(titles):
+                    failures.append("listing torn by a reload")
+        playlist = own.show_playlist("mine")
+        if playlist.total != len(playlist.items) or None in playlist.items:
+            failures.append("playlist kept a removed video")
+
+    _hammer(run)
+
+    assert failures == []
+    _check_flags(service)
+    assert all(service.library.get_video(video_id) for video_id in service.flagged)
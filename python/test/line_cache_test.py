@@ -0,0 +1,55 @@
+import shutil
+
+from src.output_sink import ListSink
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def test_cached_lines_follow_flags_and_reloads(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    output = ListSink()
+    player = VideoPlayer(VideoLibrary(videos_path), output)
+
+    player.show_all_videos(limit=1)
+    line = output.lines[1]
+    player.show_all_videos(limit=1)
+    assert output.lines[4] is line
+
+    player.flag_video("amazing_cats_video_id", "dont_like_cats")
+    player.show_all_videos(limit=1)
+    assert output.lines[-2] == (
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal] - FLAGGED (reason: dont_like_cats)")
+    player.allow_video("amazing_cats_video_id")
+    videos_path.write_text("Amazing Cats | amazing_cats_video_id | #cat\n")
+    player.reload_library()
+    player.show_all_videos()
+    assert output.lines[-1] == "Amazing Cats (amazing_cats_video_id) [#cat]"
+
+
+def test_full_cache_keeps_its_lines_for_the_next_listing():
+    output = ListSink()
+    player = VideoPlayer(output=output, line_cache_size=2)
+
+    player.show_all_videos()
+    first = output.lines[1:6]
+    player.show_all_videos()
+    second = output.lines[7:12]
+    assert first == second
+    assert [a is b for a, b in zip(first, second)] == [True, True, False, False, False]
+
+
+def test_line_of_a_video_replaced_by_a_reload_is_not_reused(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    library = VideoLibrary(videos_path)
+    output = ListSink()
+    player = VideoPlayer(library, output)
+    old_video = library.get_video("amazing_cats_video_id")
+
+    videos_path.write_text("Amazing Cats Renamed | amazing_cats_video_id | #cat\n")
+    player.reload_library()
+    # A thread still rendering the listing it got before the reload.
+    player._video_line(old_video)
+    player.show_all_videos()
+    assert output.lines[-1] == "Amazing Cats Renamed (amazing_cats_video_id) [#cat]"
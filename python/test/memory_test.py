@@ -0,0 +1,52 @@
+import sys
+
+from src.video import Video
+from src.video_library import VideoLibrary
+
+ROWS = 1_000_000
+# Bytes a video may cost in the default storage: the Video, its title, id
+# and tag tuple, plus its share of the ordinal list and id dict.
+BYTES_PER_VIDEO_BUDGET = 340
+
+
+def _write_catalog(path, rows):
+    tags = [f"#tag{i}" for i in range(50)]
+    with open(path, "w") as video_file:
+        video_file.writelines(
+            f"Synthetic video number {i} | video_{i:07d}_id | "
+            f"{tags[i % 50]} , {tags[i % 7]} , #animal\n"
+            for i in range(rows))
+
+
+def _retained_bytes(store):
+    """Returns the bytes held by a MemoryStore, shared objects counted once."""
+    total = sys.getsizeof(store._videos) + sys.getsizeof(store._ordinals)
+    seen = set()
+    for video in store._videos:
+        total += (sys.getsizeof(video) + sys.getsizeof(video._title)
+                  + sys.getsizeof(video._video_id))
+        if hasattr(video, "__dict__"):
+            total += sys.getsizeof(video.__dict__)
+        for shared in (video._tags, *video._tags):
+            if id(shared) not in seen:
+                seen.add(id(shared))
+                total += sys.getsizeof(shared)
+    return total
+
+
+def test_video_has_no_instance_dict():
+    video = Video("Amazing Cats", "amazing_cats_video_id", ["#cat", "#animal"])
+
+    assert not hasattr(video, "__dict__")
+
+
+def test_memory_per_video_within_budget(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    _write_catalog(videos_path, ROWS)
+    library = VideoLibrary(videos_path)
+
+    assert len(library) == ROWS
+    first = library.get_video("video_0000000_id")
+    last = library.get_video(f"video_{ROWS - 1:07d}_id")
+    assert first.tags[-1] is last.tags[-1]
+    assert _retained_bytes(library._store) / ROWS <= BYTES_PER_VIDEO_BUDGET
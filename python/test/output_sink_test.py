@@ -0,0 +1,39 @@
+import io
+
+from src.command_parser import CommandParser
+from src.output_sink import ListSink, StreamSink
+from src.video_player import VideoPlayer
+
+
+class _CountingStream(io.StringIO):
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_stream_sink_writes_a_command_at_once():
+    stream = _CountingStream()
+    parser = CommandParser(VideoPlayer(output=StreamSink(stream)))
+    parser.execute_command(["SHOW_ALL_VIDEOS"])
+
+    assert stream.writes == 1
+    assert stream.getvalue().splitlines()[1] == (
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]")
+
+
+def test_list_sink_captures_lines_and_answers():
+    output = ListSink(answers=["1"])
+    player = VideoPlayer(output=output)
+    player.search_videos("dog")
+    player.stop_video()
+
+    assert output.lines == [
+        "Here are the results for dog:",
+        "1) Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "Would you like to play any of the above? If yes, specify the number of the video.",
+        "If your answer is not a valid number, we will assume it's a no.",
+        "Playing video: Funny Dogs",
+        "Stopping video: Funny Dogs",
+    ]
@@ -0,0 +1,35 @@
+import pytest
+
+from src import packed_title_index
+from src.title_index import TitleIndex
+from src.title_order import TitleOrder
+
+TITLES = [
+    "Amazing Cats", "Funny Dogs", "another cat video", "Ünïcode ÇAT",
+    "Line\nBreak cat", "", "ab", "Amazing Cats",
+]
+
+
+@pytest.fixture
+def index():
+    index = packed_title_index.PackedTitleIndex(memoryview(
+        packed_title_index.pack([(title, str(i), []) for i, title in enumerate(TITLES)])))
+    yield index
+    index.close()
+
+
+@pytest.mark.parametrize("term", ["cat", "CAT", "a", "", "ab", "çat", "k c", "\nb", "zzz"])
+def test_search_matches_title_index(index, term):
+    expected = TitleIndex()
+    for ordinal, title in enumerate(TITLES):
+        expected.add(ordinal, title)
+
+    assert index.search(term) == expected.search(term)
+
+
+def test_columns_serve_a_title_order(index):
+    order = TitleOrder(index.order, TITLES.__getitem__, presorted=True, ranks=index.ranks)
+    expected = TitleOrder(range(len(TITLES)), TITLES.__getitem__)
+
+    assert list(order[:]) == list(expected[:])
+    assert order.select(0b10000111, 1) == expected.select(0b10000111, 1)
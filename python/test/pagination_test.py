@@ -0,0 +1,78 @@
+from unittest import mock
+
+import pytest
+
+from src.command_parser import CommandException, CommandParser
+from src.video_player import VideoPlayer
+
+
+def test_show_all_videos_pages(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SHOW_ALL_VIDEOS", "LIMIT", "2", "OFFSET", "1"])
+    parser.execute_command(["SHOW_ALL_VIDEOS", "OFFSET", "4"])
+    parser.execute_command(["SHOW_ALL_VIDEOS", "OFFSET", "9"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Here's a list of all available videos:",
+        "Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "Showing 2-3 of 5, use OFFSET 3 for more",
+        "Here's a list of all available videos:",
+        "Video about nothing (nothing_video_id) []",
+        "Showing 5-5 of 5",
+        "Here's a list of all available videos:",
+        "Nothing to show at OFFSET 9, there are only 5",
+    ]
+
+
+@mock.patch("builtins.input", lambda *args: "2")
+def test_search_result_numbers_span_pages(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#animal", "OFFSET", "1", "LIMIT", "1"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines[:3] == [
+        "Here are the results for #animal:",
+        "2) Another Cat Video (another_cat_video_id) [#cat #animal]",
+        "Showing 2-2 of 3, use OFFSET 2 for more",
+    ]
+    assert lines[-1] == "Playing video: Another Cat Video"
+
+
+def test_show_playlist_pages(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    capfd.readouterr()
+    CommandParser(player).execute_command(["SHOW_PLAYLIST", "my_playlist", "LIMIT", "1"])
+    out, err = capfd.readouterr()
+    assert out.splitlines() == [
+        "Showing playlist: my_playlist",
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]",
+        "Showing 1-1 of 2, use OFFSET 1 for more",
+    ]
+
+
+@pytest.mark.parametrize("options", [["LIMIT", "0"], ["LIMIT", "x"], ["LIMIT", "²"], ["OFFSET", "1", "OFFSET", "2"]])
+def test_invalid_page_options(options):
+    with pytest.raises(CommandException):
+        CommandParser(VideoPlayer()).execute_command(["SEARCH_VIDEOS", "cat"] + options)
+
+
+@pytest.mark.parametrize("command, usage", [
+    (["SHOW_ALL_VIDEOS", "LIMIT", "2", "foo"],
+     "Please enter SHOW_ALL_VIDEOS followed only by the LIMIT <n> and "
+     "OFFSET <n> options."),
+    (["search_videos", "cat", "limit", "1", "offset", "1", "foo"],
+     "Please enter SEARCH_VIDEOS command followed by a search term."),
+])
+def test_page_options_followed_by_other_words(command, usage):
+    with pytest.raises(CommandException, match=usage):
+        CommandParser(VideoPlayer()).execute_command(command)
+
+
+def test_other_extra_words_are_still_ignored(capfd):
+    CommandParser(VideoPlayer()).execute_command(["SHOW_ALL_VIDEOS", "please", "LIMIT", "1"])
+    out, err = capfd.readouterr()
+    assert out.splitlines()[-1] == "Showing 1-1 of 5, use OFFSET 1 for more"
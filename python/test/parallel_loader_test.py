@@ -0,0 +1,41 @@
+from src import parallel_loader
+from src.catalog_snapshot import deduplicate
+from src.video_library import VideoLibrary, read_text_rows
+
+
+def _write_catalog(path, rows):
+    with open(path, "w") as video_file:
+        for i in range(rows):
+            # Every 7th row repeats an earlier id, so duplicates land in
+            # other chunks than their first occurrence.
+            video_id = f"video_{i // 2 if i % 7 == 0 else i}_id"
+            video_file.write(f"Video {i} | {video_id} | #tag{i % 3} , #all\n")
+    return path
+
+
+def test_split_ranges_end_on_newlines(tmp_path):
+    videos_path = _write_catalog(tmp_path / "videos.txt", 100)
+    data = videos_path.read_bytes()
+    ranges = parallel_loader.split_ranges(videos_path, 8)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[end - 1:end] == b"\n"
+
+
+def test_parallel_rows_match_serial_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel_loader, "MIN_PARALLEL_SIZE", 0)
+    videos_path = _write_catalog(tmp_path / "videos.txt", 500)
+
+    rows = parallel_loader.read_rows_parallel(videos_path, workers=2)
+    assert rows == deduplicate(read_text_rows(videos_path))
+
+
+def test_library_loads_with_workers(tmp_path):
+    videos_path = _write_catalog(tmp_path / "videos.txt", 50)
+    library = VideoLibrary(videos_path, workers=2)
+
+    assert len(library) == len(deduplicate(read_text_rows(videos_path)))
+    assert library.get_video("video_0_id").title == "Video 0"
+    assert library.get_video("video_3_id").title == "Video 7"
@@ -160,3 +160,17 @@ def test_search_videos_tag_no_results(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "No search results for #blah" in lines[0]
+
+
+@mock.patch("builtins.input", lambda *args: "No")
+def test_search_videos_with_tags(capfd):
+    player = VideoPlayer()
+    player.flag_video("amazing_cats_video_id")
+    player.search_videos_tags("#animal NOT #dog")
+    player.search_videos_tags("#animal AND")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 6
+    assert "Here are the results for #animal NOT #dog:" in lines[1]
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[2]
+    assert "Cannot search videos: Query ends unexpectedly" in lines[5]
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from src import player_api
+from src.command_parser import CommandParser
+from src.output_sink import ListSink
+from src.player_api import PlayerAPI
+from src.video_player import VideoPlayer
+
+
+def _parser():
+    output = ListSink()
+    return CommandParser(VideoPlayer(output=output, prompt_choice=False)), output
+
+
+@mock.patch("builtins.input", side_effect=AssertionError("input() called"))
+def test_search_leaves_a_choice_for_the_next_command(_input):
+    parser, output = _parser()
+
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    assert output.lines[-1] == (
+        "Would you like to play any of the above? If yes, "
+        "enter PLAY_RESULT followed by the number of the video.")
+    parser.execute_command(["PLAY_RESULT", "2"])
+    assert output.lines[-1] == "Playing video: Another Cat Video"
+    parser.execute_command(["PLAY_RESULT", "1"])
+    assert output.lines[-1] == "Cannot play result: No search results to choose from"
+
+
+def test_any_other_command_discards_the_choice():
+    parser, output = _parser()
+
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["NUMBER_OF_VIDEOS"])
+    parser.execute_command(["PLAY_RESULT", "1"])
+    assert output.lines[-1] == "Cannot play result: No search results to choose from"
+
+
+def test_play_result_numbers_follow_the_page():
+    parser, output = _parser()
+
+    parser.execute_command(["SEARCH_VIDEOS", "cat", "LIMIT", "1", "OFFSET", "1"])
+    parser.execute_command(["PLAY_RESULT", "1"])
+    assert output.lines[-1] == "Cannot play result: There is no result 1"
+    parser.execute_command(["PLAY_RESULT", "2"])
+    assert output.lines[-1] == "Playing video: Another Cat Video"
+
+
+def test_api_choice_statuses():
+    api = PlayerAPI()
+
+    assert api.play_result(1).status == player_api.NO_PENDING_CHOICE
+    api.search_videos("cat")
+    assert api.play_result(3).status == player_api.INVALID_CHOICE
+    assert api.play_result(1).video.video_id == "amazing_cats_video_id"
+    assert api.pending_choice is None
+
+
+def test_play_result_rejects_other_numerals():
+    parser, output = _parser()
+
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["PLAY_RESULT", "²"])
+    assert output.lines[-1] == "Cannot play result: Please enter the number of a result"
@@ -0,0 +1,33 @@
+from src import player_api
+from src.player_api import PlayerAPI
+
+
+def test_commands_return_typed_results():
+    api = PlayerAPI()
+
+    result = api.play_video("amazing_cats_video_id")
+    assert result.ok and result.video.title == "Amazing Cats" and result.stopped is None
+    result = api.flag_video("amazing_cats_video_id", "dont_like_cats")
+    assert result.stopped.video_id == "amazing_cats_video_id"
+    assert result.reason == "dont_like_cats"
+    assert api.play_video("amazing_cats_video_id").status == player_api.VIDEO_FLAGGED
+    assert api.play_video("missing_video_id").status == player_api.VIDEO_NOT_FOUND
+    assert api.pause_video().status == player_api.NOTHING_PLAYING
+
+
+def test_listings_are_pages_of_videos():
+    api = PlayerAPI()
+    api.create_playlist("My_Playlist")
+    api.add_to_playlist("my_playlist", "funny_dogs_video_id")
+    api.flag_video("another_cat_video_id")
+
+    result = api.search_videos_tag("#cat")
+    assert [video.video_id for video in result.items] == ["amazing_cats_video_id"]
+    assert result.total == 1
+    result = api.show_all_videos(offset=1, limit=2)
+    assert (result.offset, result.total, len(result.items)) == (1, 5, 2)
+    assert [v.video_id for v in api.show_playlist("MY_PLAYLIST").items] == [
+        "funny_dogs_video_id"]
+    assert api.show_playlist("missing").status == player_api.PLAYLIST_NOT_FOUND
+    result = api.search_videos_tags("#cat AND")
+    assert result.status == player_api.INVALID_QUERY and result.detail
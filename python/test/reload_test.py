@@ -0,0 +1,92 @@
+import shutil
+
+from src.catalog_watcher import CatalogWatcher
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _copy_catalog(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    return videos_path
+
+
+def _rewrite(videos_path):
+    videos_path.write_text(
+        "Funny Dogs | funny_dogs_video_id |  #dog , #animal\n"
+        "Amazing Cats Reloaded | amazing_cats_video_id |  #cat\n"
+        "Life at Google | life_at_google_video_id |  #google , #career\n"
+        "Video about nothing | nothing_video_id |\n"
+        "Cat Facts | cat_facts_video_id | #cat , #facts\n")
+
+
+def test_reload_applies_delta_to_library_and_indexes(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    library = VideoLibrary(videos_path)
+    assert len(library.search_videos("cat")) == 2
+    assert len(library.videos_in(library.tag_bitmap("#animal"))) == 3
+
+    _rewrite(videos_path)
+    delta = library.reload()
+
+    assert [row[1] for row in delta.inserted] == ["cat_facts_video_id"]
+    assert [row[1] for row in delta.updated] == ["amazing_cats_video_id"]
+    assert delta.deleted == ["another_cat_video_id"]
+    assert len(library) == 5
+    assert library.get_video("another_cat_video_id") is None
+    assert [v.video_id for v in library.search_videos("cat")] == [
+        "amazing_cats_video_id", "cat_facts_video_id"]
+    assert [v.video_id for v in library.search_videos("reloaded")] == [
+        "amazing_cats_video_id"]
+    assert [v.video_id for v in library.videos_in(library.tag_bitmap("#animal"))] == [
+        "funny_dogs_video_id"]
+    assert [v.video_id for v in library.videos_in(library.query_tags("NOT #cat"))] == [
+        "funny_dogs_video_id", "life_at_google_video_id", "nothing_video_id"]
+    assert len(library.reload()) == 0
+
+
+def test_reload_keeps_player_state(tmp_path, capfd):
+    videos_path = _copy_catalog(tmp_path)
+    player = VideoPlayer(VideoLibrary(videos_path))
+    player.create_playlist("cats")
+    player.add_to_playlist("cats", "amazing_cats_video_id")
+    player.add_to_playlist("cats", "another_cat_video_id")
+    player.flag_video("another_cat_video_id")
+    player.play_video("amazing_cats_video_id")
+    capfd.readouterr()
+
+    _rewrite(videos_path)
+    player.reload_library()
+    player.show_playlist("cats")
+    player.show_playing()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert lines == [
+        "Reloaded library: 1 added, 1 updated, 1 removed",
+        "Showing playlist: cats",
+        "Amazing Cats Reloaded (amazing_cats_video_id) [#cat]",
+        "Currently playing: Amazing Cats Reloaded (amazing_cats_video_id) [#cat]",
+    ]
+    assert player.flagged == {}
+
+
+def test_watcher_changes_apply_at_command_boundary(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    library = VideoLibrary(videos_path)
+    watcher = CatalogWatcher(videos_path, lambda: [("New", "new_video_id", [])],
+                             library._queue_rows)
+
+    assert not watcher.check()
+    videos_path.write_text("New | new_video_id |")
+    assert watcher.check()
+    assert len(library) == 5
+    assert len(library.apply_pending_reload()) == 6
+    assert library.video_ids() == ["new_video_id"]
+    assert library.apply_pending_reload() is None
+
+
+def test_read_only_storage_cannot_reload(capfd):
+    player = VideoPlayer(VideoLibrary(storage="columnar"))
+    player.reload_library()
+    out, err = capfd.readouterr()
+    assert out == "Cannot reload library: Only the memory and sqlite storages can be reloaded\n"
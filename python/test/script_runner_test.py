@@ -0,0 +1,61 @@
+import io
+
+from src.command_parser import CommandParser
+from src.script_runner import Script, ScriptSink, run_script
+from src.video_player import VideoPlayer
+
+
+def _run(text, commands_per_write=1024):
+    script = Script(text)
+    stream = io.StringIO()
+    parser = CommandParser(VideoPlayer(output=ScriptSink(script, stream)))
+    count = run_script(script, parser, commands_per_write)
+    return count, stream.getvalue().splitlines()
+
+
+def test_script_answers_searches_and_stops_at_exit():
+    count, lines = _run(
+        "# nightly\n"
+        "SEARCH_VIDEOS cat\n"
+        "ANSWER 2\n"
+        "\n"
+        "SEARCH_VIDEOS dog\n"
+        "PLAY\n"
+        "EXIT\n"
+        "STOP\n", commands_per_write=1)
+
+    assert count == 3
+    assert lines[5] == "Playing video: Another Cat Video"
+    assert lines[-1] == "Please enter PLAY command followed by video_id."
+    assert "Stopping video" not in "\n".join(lines)
+
+
+def test_unanswered_search_does_not_consume_the_next_command():
+    count, lines = _run("SEARCH_VIDEOS dog\nNUMBER_OF_VIDEOS")
+
+    assert count == 2
+    assert lines[-1] == "5 videos in the library"
+    assert "Playing video" not in "\n".join(lines)
+
+
+def test_answers_no_search_asked_for_are_skipped():
+    count, lines = _run("SEARCH_VIDEOS zzzz\nANSWER 1\nNUMBER_OF_VIDEOS")
+
+    assert count == 2
+    assert lines == [
+        "No search results for zzzz", "5 videos in the library"]
+
+
+def test_a_bare_number_answers_a_search():
+    count, lines = _run("SEARCH_VIDEOS cat\n1\nNUMBER_OF_VIDEOS")
+
+    assert count == 2
+    assert lines[-2:] == [
+        "Playing video: Amazing Cats", "5 videos in the library"]
+
+
+def test_script_may_pick_a_result_with_play_result():
+    count, lines = _run("SEARCH_VIDEOS cat\nPLAY_RESULT 1")
+
+    assert count == 2
+    assert lines[-1] == "Playing video: Amazing Cats"
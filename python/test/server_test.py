@@ -0,0 +1,68 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.catalog_service import CatalogService
+from src.server import GOODBYE, serve
+
+
+async def _connect(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await reader.readline()
+    await reader.readline()
+    return reader, writer
+
+
+async def _ask(reader, writer, command, lines=1):
+    writer.write(f"{command}\n".encode())
+    return [(await reader.readline()).decode().rstrip("\n") for _ in range(lines)]
+
+
+def test_sessions_share_the_library_but_not_their_state():
+    async def run():
+        service = CatalogService(reloadable=False)
+        server = await serve(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        first = await _connect(port)
+        second = await _connect(port)
+
+        assert await _ask(*first, "PLAY amazing_cats_video_id") == [
+            "Playing video: Amazing Cats"]
+        assert await _ask(*first, "CREATE_PLAYLIST mine") == [
+            "Successfully created new playlist: mine"]
+        assert await _ask(*second, "SHOW_PLAYING") == [
+            "No video is currently playing"]
+        assert await _ask(*second, "CREATE_PLAYLIST mine") == [
+            "Successfully created new playlist: mine"]
+        assert await _ask(*second, "SEARCH_VIDEOS cat", 4)
+        assert await _ask(*second, "PLAY_RESULT 2") == [
+            "Playing video: Another Cat Video"]
+        assert await _ask(*first, "RELOAD_LIBRARY") == [
+            "Cannot reload library: The library is shared by every session "
+            "of the server"]
+        assert await _ask(*first, "EXIT") == [GOODBYE]
+        assert await first[0].read() == b""
+
+        second[1].close()
+        await second[1].wait_closed()
+        server.close()
+        await server.wait_closed()
+        await asyncio.sleep(0)
+        return service
+
+    service = asyncio.run(run())
+    assert len(service) == 0
+
+
+@pytest.mark.parametrize("storage", ["columnar", "mmap", "shared"])
+def test_watch_is_refused_for_read_only_storage(storage):
+    server = subprocess.run(
+        [sys.executable, "-m", "src.server", "--watch", "--storage", storage],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True,
+        timeout=30)
+
+    assert server.returncode == 2
+    assert "--watch needs a storage that can be reloaded" in server.stderr
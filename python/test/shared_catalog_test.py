@@ -0,0 +1,68 @@
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.packed_title_index import PackedTitleIndex
+from src.shared_catalog import SharedCatalog, attach
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary
+from src.video_store import ColumnarStore, MemoryStore
+
+pytest.importorskip("multiprocessing.shared_memory")
+
+_WORKER = """
+import sys
+from src.video_library import VideoLibrary
+library = VideoLibrary(sys.argv[1], storage="shared")
+print(type(library._store).__name__, library.get_video("funny_dogs_video_id").title)
+library.close()
+"""
+
+
+@pytest.fixture
+def videos_path(tmp_path):
+    path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, path)
+    return path
+
+
+def test_workers_attach_to_the_published_catalog(videos_path):
+    with SharedCatalog(videos_path):
+        library = VideoLibrary(videos_path, storage="shared")
+        expected = VideoLibrary(videos_path)
+        assert isinstance(library._store, ColumnarStore)
+        assert [v.video_id for v in library.get_all_videos()] == [
+            v.video_id for v in expected.get_all_videos()]
+        assert library.get_video("amazing_cats_video_id").tags == ("#cat", "#animal")
+        assert [v.video_id for v in library.search_videos("cat")] == [
+            "amazing_cats_video_id", "another_cat_video_id"]
+        # Searches and listings read the index published with the catalog.
+        assert isinstance(library._title_index, PackedTitleIndex)
+        assert [v.video_id for v in library.videos_by_title(start=1, stop=3)] == [
+            v.video_id for v in expected.videos_by_title(start=1, stop=3)]
+        assert library.search_bitmap("a") == expected.search_bitmap("a")
+        with pytest.raises(ValueError):
+            library.reload()
+        library.close()
+
+        for _ in range(2):
+            # A worker exiting leaves the catalog published for the next.
+            worker = subprocess.run(
+                [sys.executable, "-c", _WORKER, str(videos_path)],
+                cwd=Path(__file__).parent.parent, capture_output=True,
+                text=True, check=True)
+            assert worker.stdout == "ColumnarStore Funny Dogs\n"
+            assert worker.stderr == ""
+
+    assert attach(videos_path) is None
+
+
+def test_stale_or_missing_catalog_falls_back_to_memory(videos_path):
+    assert isinstance(VideoLibrary(videos_path, storage="shared")._store, MemoryStore)
+    with SharedCatalog(videos_path):
+        stat = os.stat(videos_path)
+        os.utime(videos_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        assert attach(videos_path) is None
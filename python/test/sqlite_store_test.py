@@ -0,0 +1,95 @@
+import shutil
+from unittest import mock
+
+from src.catalog_service import CatalogService
+from src.player_api import PlayerAPI
+from src.sqlite_store import database_path
+from src.video_library import DEFAULT_VIDEOS_PATH, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+def _copy_catalog(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEOS_PATH, videos_path)
+    return videos_path
+
+
+def _ids(videos):
+    return [video.video_id for video in videos]
+
+
+def test_sqlite_storage_agrees_with_memory(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    expected = VideoLibrary(videos_path)
+    library = VideoLibrary(videos_path, storage="sqlite")
+
+    assert database_path(videos_path).exists()
+    assert len(library) == 5
+    assert [
+        (video.title, video.video_id, video.tags)
+        for video in library.get_all_videos()
+    ] == [
+        (video.title, video.video_id, video.tags)
+        for video in expected.get_all_videos()
+    ]
+    assert library.get_video("missing_video_id") is None
+    assert _ids(library.videos_by_title()) == _ids(expected.videos_by_title())
+    for term in ["CAT", "g", "cats video", "blah", "video"]:
+        assert _ids(library.search_videos(term)) == _ids(expected.search_videos(term))
+    assert _ids(library.videos_in(library.query_tags("#animal NOT #dog"))) == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    library.close()
+
+
+def test_sqlite_database_is_rebuilt_when_stale(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    VideoLibrary(videos_path, storage="sqlite").close()
+    videos_path.write_text(
+        "Cat Facts | cat_facts_video_id | #cat\n"
+        "Cat Facts Again | cat_facts_video_id | #facts\n")
+
+    library = VideoLibrary(videos_path, storage="sqlite")
+
+    assert len(library) == 1
+    assert library.get_video("cat_facts_video_id").title == "Cat Facts Again"
+    assert library.get_video("cat_facts_video_id").tags == ("#facts",)
+    library.close()
+
+
+@mock.patch("builtins.input", lambda *args: "No")
+def test_player_commands_work_on_sqlite_storage(tmp_path, capfd):
+    videos_path = _copy_catalog(tmp_path)
+    player = VideoPlayer(VideoLibrary(videos_path, storage="sqlite"))
+    player.flag_video("amazing_cats_video_id")
+    player.search_videos_tag("#cat")
+    videos_path.write_text("Video about nothing | nothing_video_id |\n")
+    player.reload_library()
+
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "1) Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[2]
+    assert lines[-1] == "Reloaded library: 0 added, 0 updated, 4 removed"
+    player.number_of_videos()
+    out, err = capfd.readouterr()
+    assert out == "1 videos in the library\n"
+
+
+def test_deleted_ordinals_are_never_reused(tmp_path):
+    videos_path = _copy_catalog(tmp_path)
+    library = VideoLibrary(videos_path, storage="sqlite")
+    service = CatalogService(library)
+    api = PlayerAPI(service=service)
+    # The last video has the highest rowid, the one SQLite would hand out
+    # again without AUTOINCREMENT.
+    deleted = library.ordinal("nothing_video_id")
+    api.flag_video("nothing_video_id", "bad")
+    catalog = videos_path.read_text().splitlines()[:-1]
+    videos_path.write_text(
+        "\n".join(catalog + ["Brand New | brand_new_id | #new"]) + "\n")
+    assert api.reload_library().ok
+
+    assert library.ordinal("brand_new_id") != deleted
+    assert service.flagged == {}
+    assert _ids(api.search_videos("Brand").items) == ["brand_new_id"]
+    assert _ids(api.search_videos_tag("#new").items) == ["brand_new_id"]
+    library.close()
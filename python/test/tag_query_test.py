@@ -0,0 +1,50 @@
+import pytest
+
+from src.tag_query import TagQueryError, parse
+from src.video_library import VideoLibrary
+
+
+def _ids(library, expression):
+    bits = library.query_tags(expression)
+    return [video.video_id for video in library.videos_in(bits)]
+
+
+def test_parse_treats_adjacent_not_as_and_not():
+    assert parse("#cat AND #animal not #career") == (
+        "and",
+        [("tag", "#cat"), ("tag", "#animal"), ("not", ("tag", "#career"))],
+    )
+
+
+def test_parse_precedence_and_parentheses():
+    assert parse("#a OR #b #c") == (
+        "or", [("tag", "#a"), ("and", [("tag", "#b"), ("tag", "#c")])]
+    )
+    assert parse("(#a OR #b) #c") == (
+        "and", [("or", [("tag", "#a"), ("tag", "#b")]), ("tag", "#c")]
+    )
+
+
+@pytest.mark.parametrize("expression", ["", "#a AND", "(#a", "#a )", "OR #a"])
+def test_parse_rejects_malformed_queries(expression):
+    with pytest.raises(TagQueryError):
+        parse(expression)
+
+
+def test_query_tags():
+    library = VideoLibrary()
+
+    assert _ids(library, "#cat AND #animal NOT #career") == [
+        "amazing_cats_video_id",
+        "another_cat_video_id",
+    ]
+    assert _ids(library, "#dog OR #google") == [
+        "funny_dogs_video_id",
+        "life_at_google_video_id",
+    ]
+    assert _ids(library, "NOT #animal") == [
+        "life_at_google_video_id",
+        "nothing_video_id",
+    ]
+    assert _ids(library, "#cat #dog") == []
+    assert _ids(library, "#unknown OR #dog") == ["funny_dogs_video_id"]
@@ -1,3 +1,5 @@
+import pytest
+
 from src.video_library import VideoLibrary
 
 
@@ -24,3 +26,83 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_search_videos_matches_titles_case_insensitively():
+    library = VideoLibrary()
+    results = library.search_videos("CAT")
+
+    assert [video.video_id for video in results] == [
+        "amazing_cats_video_id",
+        "another_cat_video_id",
+    ]
+
+
+def test_search_videos_short_and_missing_terms():
+    library = VideoLibrary()
+
+    assert [video.video_id for video in library.search_videos("g")] == [
+        "funny_dogs_video_id",
+        "amazing_cats_video_id",
+        "life_at_google_video_id",
+        "nothing_video_id",
+    ]
+    assert library.search_videos("blah") == []
+    assert library.search_videos("cats video") == []
+
+
+def test_tag_bitmap_selects_tagged_videos():
+    library = VideoLibrary()
+    results = library.videos_in(library.tag_bitmap("#animal"))
+
+    assert [video.video_id for video in results] == [
+        "funny_dogs_video_id",
+        "amazing_cats_video_id",
+        "another_cat_video_id",
+    ]
+    assert library.tag_bitmap("#nothing") == 0
+    assert library.videos_in(0) == []
+
+
+@pytest.mark.parametrize("storage", ["memory", "columnar", "mmap"])
+def test_storages_agree(storage):
+    expected = VideoLibrary()
+    library = VideoLibrary(storage=storage)
+
+    assert len(library) == 5
+    assert [
+        (video.title, video.video_id, video.tags)
+        for video in library.get_all_videos()
+    ] == [
+        (video.title, video.video_id, video.tags)
+        for video in expected.get_all_videos()
+    ]
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("missing_video_id") is None
+    assert library.videos_in(library.query_tags("#cat")) == library.search_videos("cat")
+
+
+def test_unknown_storage():
+    with pytest.raises(ValueError):
+        VideoLibrary(storage="paper")
+
+
+def test_videos_by_title_follows_reloads(tmp_path):
+    videos_path = tmp_path / "videos.txt"
+    videos_path.write_text(
+        "Beta | b_id | #x\nAlpha | a_id |\nBeta | c_id | #x\nDelta | d_id |\n")
+    library = VideoLibrary(videos_path)
+
+    assert [v.video_id for v in library.videos_by_title()] == [
+        "a_id", "b_id", "c_id", "d_id"]
+    assert [v.video_id for v in library.videos_by_title(library.tag_bitmap("#x"))] == [
+        "b_id", "c_id"]
+
+    videos_path.write_text(
+        "Beta | b_id | #x\nEpsilon | a_id |\nBeta | c_id | #x\nAardvark | e_id |\n")
+    library.reload()
+
+    assert [v.video_id for v in library.videos_by_title()] == [
+        "e_id", "b_id", "c_id", "a_id"]
+    assert [v.video_id for v in library.videos_by_title(library.search_bitmap("e"))] == [
+        "b_id", "c_id", "a_id"]